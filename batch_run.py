@@ -0,0 +1,60 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+from src.ensemble import run_ensemble
+
+# Contoh sweep default: variasi kedatangan & toleransi keramaian
+DEFAULT_SPEC = {
+    "arrival_multiplier": [1.0, 1.5],
+    "crowd_tolerance_shift": [0.0, 0.2],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ensemble Monte Carlo / parameter sweep ParkModel")
+    parser.add_argument("--spec", help="File JSON sweep spec (default: contoh bawaan)")
+    parser.add_argument("--reps", type=int, default=10, help="Replikasi per skenario")
+    parser.add_argument("--steps", type=int, default=600, help="Step (menit) per replikasi")
+    parser.add_argument("--processes", type=int, default=None, help="Jumlah proses (default: semua core)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed dasar")
+    parser.add_argument("--engine", default="object", choices=["object", "vector"])
+    parser.add_argument("--checkpoint", default=None,
+                        help="Mulai semua replikasi dari checkpoint ParkModel.save_checkpoint (.npz)")
+    parser.add_argument("--out", default="ensemble_results.npz", help="File output .npz")
+    parser.add_argument("--kpi", default=None,
+                        help="Folder output KPI streaming gabungan per skenario (CSV + kpi_state.npz)")
+    args = parser.parse_args()
+
+    spec = DEFAULT_SPEC
+    if args.spec:
+        with open(args.spec) as f:
+            spec = json.load(f)
+
+    print(f"🎲 ENSEMBLE: {args.reps} replikasi x {args.steps} step, spec = {spec}")
+    t0 = time.perf_counter()
+    results = run_ensemble(spec, replications=args.reps, steps=args.steps,
+                           processes=args.processes, base_seed=args.seed,
+                           model_kwargs={"engine": args.engine}, checkpoint=args.checkpoint,
+                           kpi=args.kpi is not None)
+    elapsed = time.perf_counter() - t0
+
+    arrays = {}
+    for i, res in enumerate(results):
+        peak_pop = float(res['population_mean'].max())
+        print(f"   [{i}] {res['scenario']} -> puncak populasi rata-rata: {peak_pop:.1f}")
+        for key, value in res.items():
+            if isinstance(value, np.ndarray):
+                arrays[f"s{i}_{key}"] = value
+        if args.kpi:
+            out_dir = os.path.join(args.kpi, f"s{i}")
+            res['kpi'].save_csv(out_dir)
+            res['kpi'].save(os.path.join(out_dir, "kpi_state.npz"))
+    arrays["scenarios"] = np.array([json.dumps(r['scenario']) for r in results])
+    np.savez_compressed(args.out, **arrays)
+    print(f"\n✅ Selesai dalam {elapsed:.1f} detik. Hasil disimpan di {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+import networkx as nx
+from src.loader import DataLoader
+from src.model import ParkModel
+from src.agent import ParkAgent
+from src.routing import RoutingTable, NetworkXRouter
+from src.sharding import ShardedSimulation
+from src.synthetic import generate_park
+
+# --- KONFIGURASI BENCHMARK ---
+POPULATION_LEVELS = [1.0, 5.0, 20.0]   # Pengali arrival (populasi kecil -> festival)
+ENGINES = [                              # (nama, kwargs ParkModel)
+    ("object", {}),
+    ("object+event", {"scheduler": "event"}),
+    ("vector", {"engine": "vector"}),
+]
+GRAPH_SIZES = [10, 20, 40]             # Sisi grid sintetis (100, 400, 1600 node)
+N_AGENTS = 300                         # Jumlah agen uji microbenchmark keputusan
+N_ROUNDS = 5                           # Berapa kali setiap agen mengambil keputusan
+SCALING_TABLE_LIMIT = 5000             # Di atas ini tabel all-pairs terlalu besar -> router networkx
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+# ==========================================
+# 1. THROUGHPUT MODEL (headless)
+# ==========================================
+def bench_model(dataset, engine_kwargs, arrival_multiplier, steps, seed=1):
+    """Steps/detik dan agent-steps/detik untuk satu konfigurasi."""
+    model = ParkModel(dataset=dataset, seed=seed, verbose=0,
+                      arrival_multiplier=arrival_multiplier, **engine_kwargs)
+    agent_steps = 0
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        model.step()
+        agent_steps += model.population_size()
+    elapsed = time.perf_counter() - t0
+    return {
+        "steps_per_sec": steps / elapsed,
+        "agent_steps_per_sec": agent_steps / elapsed,
+        "final_population": model.population_size(),
+        "seconds": elapsed,
+    }
+
+
+def peak_memory(dataset, engine_kwargs, arrival_multiplier, steps, seed=1):
+    """Puncak memori Python (MB) selama run, diukur terpisah karena tracemalloc memperlambat."""
+    tracemalloc.start()
+    model = ParkModel(dataset=dataset, seed=seed, verbose=0,
+                      arrival_multiplier=arrival_multiplier, **engine_kwargs)
+    for _ in range(steps):
+        model.step()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def bench_startup(cache_dir=".cache/bench_startup", repeats=5):
+    """
+    Waktu load dataset: CSV murni, cold (CSV + tulis snapshot), warm (dari snapshot), lalu init model.
+    CSV dan warm diambil waktu terbaik dari beberapa ulangan agar tidak tertutup noise.
+    """
+    csv_s = min(_timed(lambda: DataLoader(verbose=False, use_snapshot=False).load_all())[1]
+                for _ in range(repeats))
+    cold = DataLoader(verbose=False, cache_dir=cache_dir)
+    if os.path.exists(cold.snapshot_path):
+        os.remove(cold.snapshot_path)
+    _, cold_s = _timed(cold.load_all)
+    warm_s = min(_timed(lambda: DataLoader(verbose=False, cache_dir=cache_dir).load_all())[1]
+                 for _ in range(repeats))
+    dataset = DataLoader(verbose=False, cache_dir=cache_dir).load_all()
+    _, init_s = _timed(lambda: ParkModel(dataset=dataset, verbose=0))
+    return {"load_csv_sec": csv_s, "load_cold_sec": cold_s, "load_warm_sec": warm_s,
+            "warm_speedup": csv_s / warm_s, "model_init_sec": init_s}
+
+
+# ==========================================
+# 2. MICROBENCHMARK
+# ==========================================
+def _make_agents(model, n, seed=42):
+    rng = random.Random(seed)
+    pool = model.profile_pool
+    nodes = list(model.G.nodes)
+    agents = []
+    for i in range(n):
+        start = rng.choice(nodes)
+        p_idx = rng.randrange(len(pool))
+        a = ParkAgent(model, start, p_idx, "walking")
+        model.grid.place_agent(a, start)
+        agents.append(a)
+    return agents
+
+
+def bench_decisions(dataset, routing):
+    """make_decision() + go_home() per detik untuk satu jenis router."""
+    model = ParkModel(dataset=dataset, routing=routing, seed=42, verbose=0)
+    agents = _make_agents(model, N_AGENTS)
+
+    def run():
+        for _ in range(N_ROUNDS):
+            for a in agents:
+                a.state = "DECIDING"
+                a.make_decision()
+                a.go_home()
+    _, elapsed = _timed(run)
+    return (N_AGENTS * N_ROUNDS) / elapsed
+
+
+def bench_routing_queries(router, nodes, n_queries=20000, seed=0):
+    rng = random.Random(seed)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(n_queries)]
+    _, elapsed = _timed(lambda: [router.path(a, b) for a, b in pairs])
+    return n_queries / elapsed
+
+
+def bench_spawning(dataset, minutes=200, arrival_multiplier=10.0):
+    """Agen yang di-spawn per detik (hanya spawn_agents, tanpa step agen)."""
+    model = ParkModel(dataset=dataset, seed=3, verbose=0, arrival_multiplier=arrival_multiplier,
+                      rain_schedule=[0])
+    spawned = 0
+    t0 = time.perf_counter()
+    for _ in range(minutes):
+        before = model.population_size()
+        model.spawn_agents()
+        spawned += model.population_size() - before
+    return spawned / (time.perf_counter() - t0)
+
+
+def bench_agent_memory(dataset, n_agents=5000, steps=300, arrival_multiplier=5.0):
+    """
+    Byte per ParkAgent (tracemalloc, termasuk registrasi mesa & grid, setelah satu keputusan)
+    dan tekanan alokasi per step run berputar tinggi (selisih blok teralokasi & koleksi GC,
+    dari StepProfiler). mesa.Agent tidak memakai __slots__, sehingga setiap ParkAgent tetap
+    punya __dict__ (model, unique_id, pos); ukurannya dilaporkan terpisah (dict_bytes_per_agent)
+    di samping bagian slot (slot_bytes_per_agent).
+    """
+    model = ParkModel(dataset=dataset, seed=5, verbose=0)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    agents = _make_agents(model, n_agents)
+    for a in agents:
+        a.make_decision()
+    bytes_per_agent = (tracemalloc.get_traced_memory()[0] - before) / n_agents
+    tracemalloc.stop()
+    slot_bytes = sum(sys.getsizeof(a) for a in agents) / n_agents
+    dict_bytes = sum(sys.getsizeof(a.__dict__) for a in agents) / n_agents
+
+    model = ParkModel(dataset=dataset, seed=5, verbose=0, arrival_multiplier=arrival_multiplier, profile=True)
+    for _ in range(steps):
+        model.step()
+    counters = model.profiler.summary()['counters']
+    return {
+        "bytes_per_agent": bytes_per_agent,
+        "slot_bytes_per_agent": slot_bytes,
+        "dict_bytes_per_agent": dict_bytes,
+        "alloc_blocks_per_step": counters['alloc_blocks']['per_step'],
+        "gc_collections_per_step": counters['gc_collections']['per_step'],
+        "agents_spawned_per_step": counters['agents_spawned']['per_step'],
+    }
+
+
+def grid_park_graph(side):
+    """Graf grid sintetis side x side dengan panjang edge 10 m (untuk uji skala routing)."""
+    G = nx.grid_2d_graph(side, side)
+    G = nx.relabel_nodes(G, {(i, j): f"G{i:03d}_{j:03d}" for i, j in G.nodes})
+    nx.set_edge_attributes(G, 10.0, 'length')
+    return G
+
+
+def bench_graph_sizes(sizes):
+    results = {}
+    for side in sizes:
+        G = grid_park_graph(side)
+        nodes = list(G.nodes)
+        table, build_s = _timed(lambda: RoutingTable(G, cache_dir="", verbose=False))
+        RoutingTable._memory_cache.pop(table.signature, None)
+        results[str(len(nodes))] = {
+            "table_build_sec": build_s,
+            "table_queries_per_sec": bench_routing_queries(table, nodes, 5000),
+            "networkx_queries_per_sec": bench_routing_queries(NetworkXRouter(G), nodes, 300),
+            "table_bytes": int(table.next_hop.nbytes + table.dist.nbytes),
+        }
+    return results
+
+
+def bench_scaling(sizes, steps, engine="vector"):
+    """
+    Dataset sintetis berukuran n node dengan kedatangan x(n/1000): waktu generate,
+    load, init model (termasuk build rute), dan throughput step. Untuk mencari
+    komponen yang berhenti skala (routing, keputusan, okupansi).
+    """
+    results = {}
+    for n in sizes:
+        out = os.path.join(".cache", "synthetic", f"n{n}")
+        info, gen_s = _timed(lambda: generate_park(out, n_nodes=n, n_profiles=max(1000, n),
+                                                   arrival_scale=max(1.0, n / 1000), seed=n))
+        dataset, load_s = _timed(lambda: DataLoader(out, verbose=False).load_all())
+        routing = "table" if n <= SCALING_TABLE_LIMIT else "networkx"
+        kwargs = {"routing": routing, "engine": engine if routing == "table" else "object"}
+        model, init_s = _timed(lambda: ParkModel(dataset=dataset, seed=1, verbose=0, **kwargs))
+        agent_steps = 0
+        t0 = time.perf_counter()
+        for _ in range(steps):
+            model.step()
+            agent_steps += model.population_size()
+        elapsed = time.perf_counter() - t0
+        results[str(n)] = {**info, **kwargs, "generate_sec": gen_s, "load_sec": load_s, "init_sec": init_s,
+                           "steps_per_sec": steps / elapsed, "agent_steps_per_sec": agent_steps / elapsed,
+                           "final_population": model.population_size()}
+    return results
+
+
+def bench_sharding(n, region_counts, steps, seed=1):
+    """
+    ShardedSimulation di dataset sintetis n node untuk tiap jumlah region (processes =
+    region, 0 = tanpa proses): init, throughput, dan kecocokan populasi per step dengan
+    acuan satu proses ParkModel(engine='vector', agent_rng=True), atau regions=1 tanpa
+    proses jika graf terlalu besar untuk tabel all-pairs.
+    """
+    out = os.path.join(".cache", "synthetic", f"n{n}")
+    generate_park(out, n_nodes=n, n_profiles=max(1000, n), arrival_scale=max(1.0, n / 1000), seed=n)
+    dataset = DataLoader(out, verbose=False).load_all()
+    results = {}
+    if n <= SCALING_TABLE_LIMIT:
+        model, init_s = _timed(lambda: ParkModel(dataset=dataset, seed=seed, verbose=0, engine="vector",
+                                                 agent_rng=True))
+        _, elapsed = _timed(lambda: model.advance(steps))
+        reference = model.datacollector.get_model_vars_dataframe()["Populasi"].tolist()
+        results["vector"] = {"init_sec": init_s, "steps_per_sec": steps / elapsed,
+                             "final_population": model.population_size()}
+    else:
+        reference = None
+    for regions in region_counts:
+        processes = 0 if regions == 1 else regions
+        sim, init_s = _timed(lambda: ShardedSimulation(regions, processes, seed=seed, dataset=dataset))
+        with sim:
+            _, elapsed = _timed(lambda: sim.advance(steps))
+            population = sim.model.datacollector.get_model_vars_dataframe()["Populasi"].tolist()
+        if reference is None:
+            reference = population
+        results[f"regions{regions}"] = {"processes": processes, "init_sec": init_s,
+                                        "steps_per_sec": steps / elapsed, "handoffs": sim.handoffs,
+                                        "final_population": population[-1], "matches_reference": population == reference}
+    return results
+
+
+# ==========================================
+# 3. MAIN
+# ==========================================
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_comparison(current, previous, prefix=""):
+    """Bandingkan angka *_per_sec dengan hasil JSON sebelumnya (rasio > 1 = lebih cepat)."""
+    for key, value in current.items():
+        old = previous.get(key) if isinstance(previous, dict) else None
+        if isinstance(value, dict):
+            print_comparison(value, old or {}, f"{prefix}{key}.")
+        elif key.endswith("_per_sec") and isinstance(old, (int, float)) and old > 0:
+            ratio = value / old
+            flag = "⚠️ " if ratio < 0.9 else "  "
+            print(f"   {flag}{prefix}{key}: {ratio:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite ParkModel (headless)")
+    parser.add_argument("--steps", type=int, default=300, help="Step per run throughput")
+    parser.add_argument("--quick", action="store_true", help="Mode cepat (populasi & graf kecil saja)")
+    parser.add_argument("--out", default=None, help="File JSON hasil (default: bench_results/<rev>.json)")
+    parser.add_argument("--scaling", default=None,
+                        help="Uji skala dataset sintetis, daftar jumlah node dipisah koma (misal 1000,10000)")
+    parser.add_argument("--sharding", default=None,
+                        help="Uji skala ShardedSimulation, daftar jumlah region dipisah koma (misal 1,2,4,8)")
+    parser.add_argument("--sharding-nodes", type=int, default=10000, help="Jumlah node dataset sintetis --sharding")
+    parser.add_argument("--compare", default=None, help="File JSON lama untuk deteksi regresi")
+    args = parser.parse_args()
+
+    levels = POPULATION_LEVELS[:1] if args.quick else POPULATION_LEVELS
+    sizes = GRAPH_SIZES[:1] if args.quick else GRAPH_SIZES
+    steps = min(args.steps, 100) if args.quick else args.steps
+
+    print("⏱️  BENCHMARK SUITE ParkModel")
+    startup = bench_startup()
+    dataset = DataLoader(verbose=False).load_all()
+    results = {
+        "meta": {"revision": git_revision(), "python": platform.python_version(),
+                 "time": time.strftime("%Y-%m-%d %H:%M:%S"), "steps": steps},
+        "startup": startup,
+        "model": {}, "micro": {}, "graph_sizes": {},
+    }
+
+    print(f"   startup: csv {startup['load_csv_sec'] * 1000:.1f} ms | "
+          f"cold {startup['load_cold_sec'] * 1000:.1f} ms | warm {startup['load_warm_sec'] * 1000:.1f} ms "
+          f"({startup['warm_speedup']:.1f}x) | "
+          f"model init {startup['model_init_sec'] * 1000:.1f} ms")
+
+    print("\n[1] Throughput model")
+    for name, kwargs in ENGINES:
+        for level in levels:
+            res = bench_model(dataset, kwargs, level, steps)
+            res["peak_mem_mb"] = peak_memory(dataset, kwargs, level, min(steps, 100))
+            results["model"][f"{name}@x{level:g}"] = res
+            print(f"   {name:13s} x{level:<4g}: {res['steps_per_sec']:8.1f} step/s | "
+                  f"{res['agent_steps_per_sec']:10.0f} agent-step/s | pop {res['final_population']:6d} | "
+                  f"{res['peak_mem_mb']:6.1f} MB")
+
+    print("\n[2] Microbenchmark")
+    micro = results["micro"]
+    micro["decisions_networkx_per_sec"] = bench_decisions(dataset, "networkx")
+    micro["decisions_table_per_sec"] = bench_decisions(dataset, "table")
+    model = ParkModel(dataset=dataset, verbose=0)
+    nodes = list(model.G.nodes)
+    micro["routing_table_per_sec"] = bench_routing_queries(model.router, nodes)
+    micro["routing_networkx_per_sec"] = bench_routing_queries(NetworkXRouter(model.G), nodes, 2000)
+    micro["spawn_agents_per_sec"] = bench_spawning(dataset)
+    for key, value in micro.items():
+        print(f"   {key:30s}: {value:12.0f}")
+    results["memory"] = bench_agent_memory(dataset, steps=steps)
+    for key, value in results["memory"].items():
+        print(f"   {key:30s}: {value:12.2f}")
+
+    print("\n[3] Skala graf (routing)")
+    results["graph_sizes"] = bench_graph_sizes(sizes)
+    for n, res in results["graph_sizes"].items():
+        print(f"   {n:>5s} node: build {res['table_build_sec']:6.2f}s | "
+              f"table {res['table_queries_per_sec']:9.0f} q/s | nx {res['networkx_queries_per_sec']:7.0f} q/s")
+
+    if args.scaling:
+        print("\n[4] Skala dataset sintetis")
+        results["scaling"] = bench_scaling([int(x) for x in args.scaling.split(",")], steps)
+        for n, res in results["scaling"].items():
+            print(f"   {n:>6s} node ({res['routing']}/{res['engine']}): init {res['init_sec']:6.2f}s | "
+                  f"{res['steps_per_sec']:8.1f} step/s | {res['agent_steps_per_sec']:10.0f} agent-step/s | "
+                  f"pop {res['final_population']}")
+
+    if args.sharding:
+        print(f"\n[5] Simulasi multi-proses ({args.sharding_nodes} node sintetis, {os.cpu_count()} CPU)")
+        results["sharding"] = bench_sharding(args.sharding_nodes, [int(x) for x in args.sharding.split(",")], steps)
+        for name, res in results["sharding"].items():
+            match = "" if "matches_reference" not in res else f" | cocok acuan: {res['matches_reference']}"
+            print(f"   {name:10s}: init {res['init_sec']:6.2f}s | {res['steps_per_sec']:8.1f} step/s | "
+                  f"pop {res['final_population']}{match}")
+
+    out = args.out or os.path.join("bench_results", f"{results['meta']['revision']}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Hasil disimpan di {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print(f"\n📈 Perbandingan dengan {args.compare} (rev {previous.get('meta', {}).get('revision')}):")
+        print_comparison(results, previous)
+
+
+if __name__ == "__main__":
+    main()
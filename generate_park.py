@@ -0,0 +1,23 @@
+import argparse
+import json
+import os
+from src.synthetic import generate_park
+
+parser = argparse.ArgumentParser(description="Generator dataset taman & populasi sintetis (skema sama dengan data/)")
+parser.add_argument("--out", required=True, help="Folder output (dipakai sebagai ParkModel(data_dir=...))")
+parser.add_argument("--nodes", type=int, default=1000, help="Jumlah node jalur")
+parser.add_argument("--gates", type=int, default=5, help="Jumlah gate")
+parser.add_argument("--profiles", type=int, default=1000, help="Jumlah responden survei sintetis")
+parser.add_argument("--arrival-scale", type=float, default=1.0, help="Pengali avg_arrivals")
+parser.add_argument("--rain-prob", type=float, default=None, help="Peluang hujan per slot (default: jadwal asli)")
+parser.add_argument("--zone-mix", default=None, help='JSON {zone_type: jumlah per 100 node}')
+parser.add_argument("--age-weights", default=None, help='JSON {age_group: bobot}')
+parser.add_argument("--seed", type=int, default=0)
+args = parser.parse_args()
+
+info = generate_park(os.path.abspath(args.out), n_nodes=args.nodes, n_gates=args.gates,
+                     zone_mix=json.loads(args.zone_mix) if args.zone_mix else None,
+                     n_profiles=args.profiles,
+                     age_group_weights=json.loads(args.age_weights) if args.age_weights else None,
+                     arrival_scale=args.arrival_scale, rain_prob=args.rain_prob, seed=args.seed)
+print(f"🌳 Dataset sintetis di {args.out}: {info}")
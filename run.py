@@ -1,19 +1,68 @@
+import argparse
+import os
 from src.model import ParkModel
+from src.kpi import KPIAggregator
+from src.recorder import TrajectoryRecorder
+
+parser = argparse.ArgumentParser(description="Jalankan simulasi ABM taman (headless/log mode)")
+parser.add_argument("--steps", type=int, default=100, help="Jumlah step (menit)")
+parser.add_argument("--verbose", type=int, default=2, choices=[0, 1, 2],
+                    help="0 = headless tanpa log, 1 = status saja, 2 = status + debug")
+parser.add_argument("--log-interval", type=int, default=1, help="Cetak status tiap N step")
+parser.add_argument("--engine", default="object", choices=["object", "vector"])
+parser.add_argument("--scheduler", default="step", choices=["step", "event"])
+parser.add_argument("--seed", type=int, default=None)
+parser.add_argument("--profile", default=None, nargs="?", const="",
+                    help="Aktifkan profiling per fase; opsional path CSV tabel per step")
+parser.add_argument("--schedule", default=None,
+                    help="Urutan jenis hari dipisah koma, misal weekday,weekday,weekend (env_schedule_<nama>.csv)")
+parser.add_argument("--repeat", action="store_true",
+                    help="Ulangi jadwal terus-menerus (default: taman tutup & run berhenti setelah hari terakhir)")
+parser.add_argument("--fast-forward", action="store_true",
+                    help="Lompati step tanpa kejadian (taman kosong, semua agen diam); hasil identik")
+parser.add_argument("--kpi", default=None,
+                    help="Folder output KPI streaming (okupansi, durasi, eliminasi filter, arus gate) dalam CSV")
+parser.add_argument("--record", default=None,
+                    help="Folder rekaman trajektori agen (TrajectoryRecorder) untuk visualizer.py --replay")
+parser.add_argument("--interpolate", action="store_true", help="Interpolasi linear suhu/cahaya/kedatangan antar slot 10 menit")
+args = parser.parse_args()
 
 print("🌳 MEMULAI SIMULASI ABM (DESIGN 2.0) 🌳")
 print("   - Evaluasi Perilaku: Filter-Based Decision")
 print("   - Kondisi: Hujan, Panas, Keramaian")
 
+recorder = None
 try:
-    model = ParkModel()
-    
-    print("\n[TEST RUN] Simulasi 100 Menit...")
-    for i in range(100):
-        model.step()
-        
+    model = ParkModel(engine=args.engine, scheduler=args.scheduler, seed=args.seed,
+                      verbose=args.verbose, log_interval=args.log_interval,
+                      profile=args.profile is not None,
+                      schedule=args.schedule.split(",") if args.schedule else None,
+                      repeat_schedule=args.repeat, interpolate_schedule=args.interpolate,
+                      fast_forward=args.fast_forward)
+    kpi = KPIAggregator().attach(model) if args.kpi else None
+    recorder = TrajectoryRecorder(args.record).attach(model) if args.record else None
+
+    print(f"\n[TEST RUN] Simulasi {args.steps} Menit...")
+    model.advance(args.steps) # Berhenti lebih awal jika jadwal habis (taman tutup, kecuali --repeat)
+    if args.verbose == 0:
+        model.log_status() # Ringkasan akhir
+    if kpi is not None:
+        kpi.detach().save_csv(args.kpi)
+        kpi.save(os.path.join(args.kpi, "kpi_state.npz"))
+        print(kpi.tables()['dwell'].round(1).to_string(index=False))
+    if model.profiler is not None:
+        model.profiler.report()
+        if args.profile:
+            model.profiler.save(args.profile)
+
     print("\n✅ Simulasi Selesai Tanpa Error.")
 
 except Exception as e:
     print(f"\n❌ Error Terdeteksi: {e}")
     import traceback
-    traceback.print_exc()
\ No newline at end of file
+    traceback.print_exc()
+
+finally:
+    if recorder is not None:
+        recorder.close() # Flush buffer terakhir + index.json, juga saat run gagal
+        print(f"🎞️ Rekaman disimpan di {args.record} (putar: python visualizer.py --replay {args.record})")
\ No newline at end of file
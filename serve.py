@@ -0,0 +1,23 @@
+import argparse
+from src.model import ParkModel
+from src.server import LiveServer
+
+parser = argparse.ArgumentParser(description="Server live simulasi ABM taman (WebSocket / HTTP streaming)")
+parser.add_argument("--host", default="127.0.0.1")
+parser.add_argument("--port", type=int, default=8765)
+parser.add_argument("--engine", default="object", choices=["object", "vector"])
+parser.add_argument("--scheduler", default="step", choices=["step", "event"])
+parser.add_argument("--seed", type=int, default=None)
+parser.add_argument("--steps", type=int, default=None, help="Berhenti setelah N step (default: sampai model berhenti)")
+parser.add_argument("--speed", type=float, default=10.0, help="Batas step per detik (0 = secepatnya)")
+parser.add_argument("--linger", action="store_true",
+                    help="Tetap melayani setelah simulasi selesai (default: server berhenti setelah frame akhir)")
+parser.add_argument("--schedule", default=None, help="Urutan jenis hari dipisah koma, misal weekday,weekend")
+args = parser.parse_args()
+
+model = ParkModel(engine=args.engine, scheduler=args.scheduler, seed=args.seed, verbose=0,
+                  schedule=args.schedule.split(",") if args.schedule else None)
+server = LiveServer(model, host=args.host, port=args.port, steps=args.steps, steps_per_sec=args.speed or None,
+                    linger=args.linger)
+print(f"📡 Live viewer: http://{args.host}:{args.port}/  (WebSocket /ws, HTTP stream /stream)")
+server.run()
@@ -1,30 +1,109 @@
 import mesa
-import networkx as nx
-import random
+
+EMPTY_ROUTE = ()
+
 
 class ParkAgent(mesa.Agent):
-    def __init__(self, unique_id, model, start_node, profile, initial_interest=None):
+    # Atribut ParkAgent sendiri disimpan di slot ini. mesa.Agent tidak mendeklarasikan
+    # __slots__, jadi setiap instance tetap punya __dict__ untuk model/unique_id/pos;
+    # penghematan slot hanya untuk atribut di bawah (lihat benchmark dict_bytes_per_agent).
+    # unique_id = integer dari counter model.agent_ids; profil = indeks ke ProfilePool bersama;
+    # rute = tuple read-only dari RouteStore/GateField + kursor (tanpa salinan list & pop(0)).
+    __slots__ = ('start_node', 'profile_idx', '_state', '_target_zone_id', '_occupied_zone',
+                 '_route', '_route_pos', 'target_node', 'current_activity', 'activity_duration',
+                 '_sleep_from', '_activity_from')
+
+    def __init__(self, model, start_node, profile_idx, initial_interest=None):
         super().__init__(model)
-        self.unique_id = unique_id
+        self.unique_id = next(model.agent_ids)
         self.start_node = start_node
-        self.profile = profile
+        self.profile_idx = profile_idx
         
         # Atribut Dinamis
-        self.state = "DECIDING" # DECIDING, WALKING, ACTIVITY, LEAVING, FINISHED
-        self.path = []
-        self.target_zone_id = None
+        self._state = "DECIDING" # DECIDING, WALKING, ACTIVITY, LEAVING, FINISHED
+        self._target_zone_id = None
+        self._occupied_zone = None # Zona yang sedang dihitung di model.occupancy
+        self._route = EMPTY_ROUTE
+        self._route_pos = 0
         self.target_node = None
         self.current_activity = initial_interest if initial_interest else "walking"
         self.activity_duration = 0
-        
-        # Normalisasi profil (jika data string/kotor)
-        self.crowd_dislike = float(profile.get('crowd_dislike', 3)) / 5.0 # Skala 0-1
-        self.heat_dislike = float(profile.get('heat_dislike', 3)) / 5.0   # Skala 0-1
+        self._sleep_from = None # Step saat agen mulai tidur (mode scheduler event)
+        self._activity_from = None # Step saat agen masuk state ACTIVITY (durasi untuk KPI)
+
+    # --- Profil (tabel bersama ProfilePool, read-only) ---
+    @property
+    def profile(self):
+        return self.model.profile_pool.records[self.profile_idx]
+
+    @property
+    def crowd_dislike(self):
+        return self.model.profile_pool.crowd_values[self.profile_idx] # Skala 0-1
+
+    @property
+    def heat_dislike(self):
+        return self.model.profile_pool.heat_values[self.profile_idx] # Skala 0-1
+
+    # --- Rute (referensi + kursor) ---
+    @property
+    def path(self):
+        """Sisa rute (salinan list, untuk checkpoint/inspeksi)."""
+        return list(self._route[self._route_pos:])
+
+    @path.setter
+    def path(self, nodes):
+        self._route = tuple(nodes)
+        self._route_pos = 0
+
+    def _follow(self, route):
+        """Ikuti rute bersama [posisi sekarang, ..., tujuan] mulai hop pertama."""
+        self._route = route
+        self._route_pos = 1
+
+    # --- Okupansi Zona (Inkremental) ---
+    # Agen dihitung di zona tujuan selama state WALKING/ACTIVITY. Setiap kali
+    # state atau target_zone_id berubah, counter zona di model ikut diperbarui.
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        self._state = value
+        self._sync_occupancy()
+
+    @property
+    def target_zone_id(self):
+        return self._target_zone_id
+
+    @target_zone_id.setter
+    def target_zone_id(self, value):
+        self._target_zone_id = value
+        self._sync_occupancy()
+
+    def _sync_occupancy(self):
+        zone = self._target_zone_id
+        if not zone or self._state not in ("WALKING", "ACTIVITY") or zone not in self.model.zone_map:
+            zone = None
+        if zone != self._occupied_zone:
+            self.model.occupancy.move(self._occupied_zone, zone)
+            self._occupied_zone = zone
+
+    def remove(self):
+        # Lepas dari counter zona & scheduler sebelum dihapus dari model
+        self.model.occupancy.move(self._occupied_zone, None)
+        self._occupied_zone = None
+        if self.model.scheduler is not None:
+            self.model.scheduler.remove(self)
+        super().remove()
 
     def make_decision(self):
         """
         METODE PENGAMBILAN KEPUTUSAN BERBASIS FILTER (4 TAHAP)
         """
+        prof = self.model.profiler
+        if prof is not None: prof.counts[f'decisions_{self.state.lower()}'] += 1
+
         # --- 1. Identifikasi Kebutuhan ---
         # Jika baru spawn, pakai current_activity. Jika selesai, pilih baru.
         # (Sederhana: Pilih random based on interest profile)
@@ -38,105 +117,103 @@ class ParkAgent(mesa.Agent):
                 'relax': self.profile['interest_relax']
             }
             # Pilih aktivitas dengan bobot tertinggi + sedikit random
-            self.current_activity = max(interests, key=lambda k: interests[k] + random.uniform(0, 2))
+            self.current_activity = max(interests, key=lambda k: interests[k] + self.random.uniform(0, 2))
 
         # --- CEK TRIGER LINGKUNGAN (Override) ---
-        is_raining = self.model.current_env['rain_flag']
+        is_raining = self.model.is_raining
         if is_raining:
             # Override: Cari Shelter atau Pulang
             self.current_activity = 'shelter_seeking'
         
         # --- 2. Filter Kandidat Zona ---
-        candidates = []
-        
-        if self.current_activity == 'shelter_seeking':
-            # Cari zona bertipe 'gazebo', 'public_toilet', atau 'gate' (pulang)
-            candidates = [z for z in self.model.zone_map.values() 
-                          if z['zone_type'] in ['gazebo', 'public_toilet', 'gate']]
-        else:
-            # Cari zona yang mendukung aktivitas
-            for z in self.model.zone_map.values():
-                if self.current_activity in z.get('supported_activities', []):
-                    candidates.append(z)
+        # Indeks aktivitas -> zona sudah disiapkan model (ZoneTable), tanpa scan zone_map
+        zones = self.model.zone_table
+        closed = self.model.closed_gates
+        candidates = zones.candidates(self.current_activity, closed)
 
         # Jika tidak ada kandidat (misal mau lari tapi gak ada track), fallback ke walking
-        if not candidates and self.current_activity != 'shelter_seeking':
+        if len(candidates) == 0 and self.current_activity != 'shelter_seeking':
             self.current_activity = 'walking'
-            candidates = [z for z in self.model.zone_map.values() if 'walking' in z.get('supported_activities', [])]
+            candidates = zones.candidates('walking')
+            if prof is not None: prof.counts['fallback_walking'] += 1
 
         # --- 3. Filter Penalti (Eliminasi Kritis) ---
-        final_candidates = []
-        
-        current_temp = self.model.current_env['temperature_index']
-        
-        for z in candidates:
-            # A. Penalti Keramaian
-            capacity = float(z.get('zone_max_capacity', 20))
-            current_pop = z.get('current_agents', 0)
-            crowd_ratio = min(current_pop / capacity, 1.0)
-            
-            # Logika: Jika rasio keramaian > toleransi ketidaksukaan agen, eliminasi
-            # (Kecuali hujan/shelter, darurat abaikan keramaian)
-            if not is_raining and crowd_ratio > (1.0 - self.crowd_dislike):
-                continue # Skip zona ini, terlalu ramai buat saya
-
-            # B. Penalti Panas
-            # Jika panas tinggi (>0.7) DAN saya benci panas, hindari zona terbuka
-            if not is_raining and current_temp > 0.7 and self.heat_dislike > 0.6:
-                if z['zone_type'] in ['track', 'plaza', 'playground']: # Asumsi ini zona panas
-                    continue 
-
-            final_candidates.append(z)
-
-        # Kalau semua kena eliminasi, paksa ambil 1 dari kandidat awal (terpaksa)
-        if not final_candidates:
-            final_candidates = candidates
+        # A. Keramaian > toleransi agen -> eliminasi. B. Panas tinggi & benci panas -> hindari zona terbuka.
+        # (Kecuali hujan/shelter, darurat abaikan keramaian). Kalau semua tereliminasi, pakai kandidat awal.
+        current_temp = self.model.temperature
+        final_candidates = zones.filter(self.current_activity, candidates, self.model.occupancy,
+                                        self.crowd_dislike, self.heat_dislike,
+                                        is_raining, current_temp, closed)
+        kpi = self.model.kpi
+        if prof is not None or kpi is not None:
+            crowd_mask, heat_mask = zones.elimination_masks(candidates, self.model.occupancy.counts, self.crowd_dislike,
+                                                            self.heat_dislike, is_raining, current_temp)
+        if prof is not None:
+            crowd, heat = int(crowd_mask.sum()), int(heat_mask.sum())
+            prof.counts['candidate_scans'] += 1
+            prof.counts['candidates'] += len(candidates)
+            prof.counts['eliminated_crowd'] += crowd
+            prof.counts['eliminated_heat'] += heat
+            if len(final_candidates) and len(final_candidates) == len(candidates) and (crowd or heat):
+                prof.counts['fallback_all_eliminated'] += 1
 
         # --- 4. Keputusan Akhir ---
-        if final_candidates:
-            # Pilih yang amenities_score tertinggi atau paling dekat
+        if len(final_candidates):
             # Kita pakai random choice weighted by amenities untuk variasi
-            best_zone = max(final_candidates, key=lambda z: z.get('amenities_score', 0.5) + random.random())
+            best = zones.pick(final_candidates, self.model.rng)
+            if kpi is not None: kpi.decisions(candidates, 1, crowd_mask, heat_mask, best)
             
-            self.target_zone_id = best_zone['zone_id']
-            self.target_node = best_zone['nav_node']
+            self.target_zone_id = zones.zone_ids[best]
+            self.target_node = zones.nav_node[best]
             
             # Rencanakan jalan
             self.plan_path(self.pos, self.target_node)
             self.state = "WALKING"
         else:
             # Bingung total -> Pulang
+            if prof is not None: prof.counts['fallback_go_home'] += 1
             self.go_home()
 
     def plan_path(self, start, end):
-        try:
-            self.path = nx.shortest_path(self.model.G, start, end, weight='length')
-            if self.path: self.path.pop(0)
-        except:
+        # Rute diambil dari tabel precompute model (tanpa Dijkstra per agen)
+        route = self.model.routes.path(start, end)
+        prof = self.model.profiler
+        if prof is not None:
+            prof.counts['route_calls'] += 1
+            if route is None: prof.counts['route_failed'] += 1
+        if route is None:
             self.state = "FINISHED"
+            return
+        self._follow(route)
 
     def move(self):
-        if self.path:
-            next_node = self.path.pop(0)
-            self.model.grid.move_agent(self, next_node)
+        route, i = self._route, self._route_pos
+        if i < len(route):
+            self._route_pos = i + 1
+            self.model.grid.move_agent(self, route[i])
         else:
             # Sampai tujuan
             if self.target_zone_id:
                 self.state = "ACTIVITY"
+                self._activity_from = self.model.steps
                 # Set durasi berdasarkan Activity Profile
                 rules = self.model.activity_rules.get(self.current_activity, {})
                 base_dwell = int(rules.get('base_dwell_min', 15))
-                self.activity_duration = base_dwell + random.randint(-5, 5)
+                self.activity_duration = base_dwell + self.random.randint(-5, 5)
             else:
                 self.state = "FINISHED" # Sampai di gate pulang
+                if self.model.kpi is not None: self.model.kpi.exits(self.model.node_id_index[self.pos])
 
     def do_activity(self):
         # Cek kondisi darurat (Hujan Tiba-tiba)
-        if self.model.current_env['rain_flag'] and self.current_activity != 'shelter_seeking':
+        if self.model.is_raining and self.current_activity != 'shelter_seeking':
              # Cek apakah zona sekarang aman (shelter)?
              current_zone = self.model.zone_map.get(self.target_zone_id)
              if current_zone and current_zone['zone_type'] not in ['gazebo', 'public_toilet']:
                  # Panik! Cari shelter baru
+                 if self.model.kpi is not None:
+                     self._end_activity()
+                     self.model.kpi.displaced(self.model.occupancy.index[self.target_zone_id])
                  self.make_decision()
                  return
 
@@ -148,37 +225,55 @@ class ParkAgent(mesa.Agent):
                  curr = self.model.track_nodes.index(self.pos)
                  nxt = self.model.track_nodes[(curr+1)%len(self.model.track_nodes)]
                  self.model.grid.move_agent(self, nxt)
+            elif self.model.scheduler is not None and self.model.running and self.activity_duration > 0:
+                # Mode event: tidak perlu di-step sampai durasi habis (setelah taman tutup semua tetap aktif)
+                self._sleep_from = self.model.steps
+                self.model.scheduler.sleep(self, self.model.steps + self.activity_duration + 1)
         else:
             # Selesai aktivitas
             # Jika tadi shelter seeking dan hujan reda, atau aktivitas biasa selesai
-            if self.current_activity == 'shelter_seeking' and self.model.current_env['rain_flag']:
+            if self.current_activity == 'shelter_seeking' and self.model.is_raining:
+                if self.model.scheduler is not None and self.model.running:
+                    # Tidur sampai event cuaca berikutnya (hujan reda); setelah taman tutup tidak ada event lagi
+                    self._sleep_from = self.model.steps
+                    self.model.scheduler.sleep(self, None)
                 return # Tetap berteduh
             
+            if self.model.kpi is not None: self._end_activity()
             # Decide next move (Activity lain atau Pulang)
             # Simple logic: Chance pulang meningkat seiring waktu
-            if random.random() < 0.3: 
+            if self.random.random() < 0.3: 
                 self.go_home()
             else:
                 self.state = "DECIDING" # Memicu make_decision() di step berikutnya
 
+    def _end_activity(self):
+        # Catat durasi aktivitas yang berakhir, sekali saja (_activity_from di-reset setelah dicatat)
+        if self._activity_from is not None:
+            self.model.kpi.dwell_time(self.current_activity, self.model.steps - self._activity_from)
+            self._activity_from = None
+
     def go_home(self):
         self.current_activity = 'leaving'
-        # Cari gate terdekat
-        closest_gate = None; min_d = float('inf')
-        for g in self.model.gate_nodes:
-            try:
-                d = nx.shortest_path_length(self.model.G, self.pos, g, weight='length')
-                if d < min_d: min_d = d; closest_gate = g
-            except: continue
-            
-        if closest_gate:
+        # Gate terdekat dari medan jarak multi-sumber (lookup O(1), tanpa Dijkstra per gate)
+        route = self.model.gate_field.path(self.pos)
+        if self.model.profiler is not None: self.model.profiler.counts['gate_route_calls'] += 1
+
+        if route:
             self.target_zone_id = None # Penanda mau keluar
-            self.target_node = closest_gate
-            self.plan_path(self.pos, closest_gate)
+            self.target_node = route[-1]
+            self._follow(route)
             self.state = "LEAVING"
         else:
             self.state = "FINISHED"
 
+    def wake_up(self, step):
+        """Dipanggil EventScheduler saat agen bangun: kurangi durasi sesuai menit yang dilewati."""
+        if self._sleep_from is not None:
+            skipped = step - self._sleep_from - 1
+            self.activity_duration = max(0, self.activity_duration - skipped)
+            self._sleep_from = None
+
     def step(self):
         if self.state == "DECIDING":
             self.make_decision()
@@ -0,0 +1,279 @@
+import heapq
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .agent import ParkAgent
+from .engine import STATE_NAMES, agent_seed_key
+from .ensemble import _init_worker, run_replication
+from .model import ParkModel
+
+CHECKPOINT_VERSION = 3
+STATE_CODE = {name: i for i, name in enumerate(STATE_NAMES)}
+
+# Parameter ParkModel yang boleh diubah saat restore/fork (skenario what-if)
+SCENARIO_KEYS = ('arrival_multiplier', 'capacity_overrides', 'rain_schedule', 'crowd_tolerance_shift')
+VECTOR_FIELDS = ('uid', 'state', 'node', 'target_node', 'target_zone', 'dwell', 'activity', 'profile')
+
+
+def _opt(value, index=None):
+    """Kode integer untuk nilai opsional (-1 = None), lewat dict index jika diberikan."""
+    if value is None:
+        return -1
+    return index[value] if index is not None else value
+
+
+# ==========================================
+# SIMPAN
+# ==========================================
+def save_checkpoint(model, path):
+    """
+    Simpan seluruh state dinamis model ke satu file .npz terkompresi:
+    agen (posisi, state, rute tersisa, sisa durasi, status scheduler), okupansi zona
+    beserta riwayatnya, kursor jadwal, data collector, dan state RNG (model.random &
+    model.rng). Data statis (graf, tabel rute, CSV) tidak ikut disimpan; dibangun
+    ulang dari dataset saat restore. Return path file.
+    """
+    occ = model.occupancy
+    steps_hist, history = occ.history()
+    arrays = {
+        'occ_counts': occ.counts, 'occ_peak': occ.peak, 'occ_peak_step': occ.peak_step,
+        'occ_history': history, 'occ_history_steps': np.asarray(steps_hist, dtype=np.int64),
+    }
+    for name, values in model.grid.get_state().items():
+        arrays[f'grid/{name}'] = values
+    version, py_state, gauss_next = model.random.getstate()
+    arrays['py_random'] = np.asarray(py_state, dtype=np.uint64)
+    for key, values in model.datacollector.model_vars.items():
+        arrays[f'dc/{key}'] = np.asarray(values)
+
+    meta = {
+        'version': CHECKPOINT_VERSION,
+        'config': model.config,
+        'node_ids': [str(n) for n in model.node_ids],
+        'zone_ids': list(occ.zone_ids),
+        'steps': int(model.steps),
+        'running': bool(model.running),
+        'closed_gates': sorted(model.closed_gates),
+        'occ_version': int(occ.version), 'occ_band_version': int(occ.band_version),
+        'occ_current_step': int(occ.current_step),
+        'grid_current_step': int(model.grid.current_step),
+        'py_random_version': version, 'py_random_gauss': gauss_next,
+        'np_random': model.rng.bit_generator.state,
+        'datacollector': list(model.datacollector.model_vars.keys()),
+    }
+
+    if model.population is not None:
+        pop = model.population
+        for name in VECTOR_FIELDS:
+            arrays[f'pop/{name}'] = getattr(pop, name)[:pop.size]
+        meta['population'] = {'next_uid': int(pop.next_uid), 'activity_names': list(pop.activity_names),
+                              'seed_key': None if pop.seed_key is None else int(pop.seed_key)}
+    else:
+        _save_agents(model, arrays, meta)
+
+    path = path if path.endswith('.npz') else path + '.npz'
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    arrays['__meta__'] = np.array(json.dumps(meta))
+    np.savez_compressed(path, **arrays)
+    return path
+
+
+def _save_agents(model, arrays, meta):
+    agents = list(model.agents) # Urutan AgentSet = urutan shuffle_do
+    node_index = model.node_id_index
+    zone_index = model.occupancy.index
+    activities = {}
+    paths = [[node_index[n] for n in a.path] for a in agents]
+
+    arrays['agent_uid'] = np.array([a.unique_id for a in agents], dtype=np.int64)
+    arrays['agent_node'] = np.array([node_index[a.pos] for a in agents], dtype=np.int32)
+    arrays['agent_start'] = np.array([node_index[a.start_node] for a in agents], dtype=np.int32)
+    arrays['agent_profile'] = np.array([_opt(a.profile_idx) for a in agents], dtype=np.int32)
+    arrays['agent_state'] = np.array([STATE_CODE[a.state] for a in agents], dtype=np.int8)
+    arrays['agent_target_zone'] = np.array([_opt(a.target_zone_id, zone_index) for a in agents], dtype=np.int32)
+    arrays['agent_target_node'] = np.array([_opt(a.target_node, node_index) for a in agents], dtype=np.int32)
+    arrays['agent_activity'] = np.array([activities.setdefault(a.current_activity, len(activities))
+                                         for a in agents], dtype=np.int16)
+    arrays['agent_duration'] = np.array([a.activity_duration for a in agents], dtype=np.int32)
+    arrays['agent_sleep_from'] = np.array([_opt(a._sleep_from) for a in agents], dtype=np.int64)
+    arrays['agent_activity_from'] = np.array([_opt(a._activity_from) for a in agents], dtype=np.int64)
+    arrays['path_offsets'] = np.cumsum([0] + [len(p) for p in paths], dtype=np.int64)
+    arrays['path_nodes'] = np.array([n for p in paths for n in p], dtype=np.int32)
+    meta['activity_names'] = sorted(activities, key=activities.get)
+
+    sched = model.scheduler
+    if sched is not None:
+        position = {a: i for i, a in enumerate(agents)}
+        heap = [(w, t, position[a]) for w, t, a in sched._heap if sched.sleeping.get(a) == t]
+        arrays['sched_active'] = np.array([position[a] for a in sched.active], dtype=np.int32)
+        arrays['sched_sleeping'] = np.array([position[a] for a in sched.sleeping], dtype=np.int32)
+        arrays['sched_token'] = np.array(list(sched.sleeping.values()), dtype=np.int64)
+        arrays['sched_heap'] = np.array(heap, dtype=np.int64).reshape(-1, 3)
+        # Token baru harus lebih besar dari semua token lama (urutan tie-break heap tetap)
+        meta['sched_next_token'] = int(max(sched.sleeping.values(), default=-1)) + 1
+
+
+# ==========================================
+# RESTORE
+# ==========================================
+def load_checkpoint(path, dataset=None, verbose=0, seed=None, closed_gates=None, **overrides):
+    """
+    Bangun ParkModel dari checkpoint. Tanpa override, lanjutan run identik bit-demi-bit
+    dengan model asal. overrides (lihat SCENARIO_KEYS) mengganti parameter skenario,
+    closed_gates mengganti daftar gate tertutup, seed mengganti state RNG (untuk
+    replikasi dari checkpoint yang sama).
+    """
+    unknown = set(overrides) - set(SCENARIO_KEYS)
+    if unknown:
+        raise ValueError(f"Override tidak dikenal: {sorted(unknown)} (boleh: {SCENARIO_KEYS})")
+
+    with np.load(path, allow_pickle=False) as data:
+        arrays = dict(data)
+    meta = json.loads(str(arrays.pop('__meta__')))
+    if meta.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Versi checkpoint tidak didukung: {meta.get('version')}")
+
+    config = dict(meta['config'])
+    config.update(overrides)
+    model = ParkModel(dataset=dataset, verbose=verbose, **config)
+    if [str(n) for n in model.node_ids] != meta['node_ids'] or list(model.occupancy.zone_ids) != meta['zone_ids']:
+        raise ValueError("Checkpoint dibuat dari dataset (node/zona) yang berbeda")
+
+    # --- Kursor jadwal & lingkungan ---
+    model.steps = meta['steps']
+    model.running = meta['running']
+    model.set_minute(max(model.steps - 1, 0))
+    model.closed_gates = set(meta['closed_gates'] if closed_gates is None else closed_gates)
+
+    # --- RNG ---
+    model.random.setstate((meta['py_random_version'], tuple(int(x) for x in arrays['py_random']),
+                           meta['py_random_gauss']))
+    model.rng.bit_generator.state = meta['np_random']
+
+    # --- Data collector ---
+    for key in meta['datacollector']:
+        model.datacollector.model_vars[key] = arrays[f'dc/{key}'].tolist()
+
+    # --- Agen ---
+    if model.population is not None:
+        pop = model.population
+        for name in meta['population']['activity_names']:
+            pop.code_of(name)
+        if pop.activity_names != meta['population']['activity_names']:
+            raise ValueError("Urutan kode aktivitas checkpoint tidak cocok")
+        n = len(arrays['pop/uid'])
+        if n > pop.capacity:
+            pop._alloc(max(pop.capacity * 2, n))
+        for name in VECTOR_FIELDS:
+            getattr(pop, name)[:n] = arrays[f'pop/{name}']
+        pop.size = n
+        pop.next_uid = meta['population']['next_uid']
+        if pop.seed_key is not None:
+            pop.seed_key = np.uint64(meta['population']['seed_key'])
+    else:
+        _restore_agents(model, arrays, meta)
+
+    # --- Okupansi (band dihitung ulang dari counter: kapasitas bisa di-override) ---
+    occ = model.occupancy
+    occ.set_counts(arrays['occ_counts'])
+    occ.peak[:] = arrays['occ_peak']
+    occ.peak_step[:] = arrays['occ_peak_step']
+    occ._history = arrays['occ_history'].astype(np.int32)
+    occ._history_steps = arrays['occ_history_steps'].tolist()
+    occ._history_len = len(occ._history_steps)
+    occ.version = meta['occ_version']
+    occ.band_version = meta['occ_band_version']
+    occ.current_step = meta['occ_current_step']
+
+    # --- Counter grid node/edge & heatmap ---
+    model.grid.set_state({name: arrays[f'grid/{name}'] for name in model.grid.STATE_FIELDS},
+                         meta['grid_current_step'])
+
+    if seed is not None:
+        model.random.seed(seed)
+        model.rng.bit_generator.state = np.random.default_rng(seed).bit_generator.state
+        if model.population is not None and model.population.seed_key is not None:
+            model.population.seed_key = agent_seed_key(seed)
+    return model
+
+
+def _restore_agents(model, arrays, meta):
+    node_ids = model.node_ids
+    zone_ids = model.occupancy.zone_ids
+    activities = meta['activity_names']
+    offsets = arrays['path_offsets']
+    path_nodes = arrays['path_nodes']
+
+    agents = []
+    uids = arrays['agent_uid'].tolist()
+    for i, uid in enumerate(uids):
+        a = ParkAgent(model, node_ids[arrays['agent_start'][i]], int(arrays['agent_profile'][i]))
+        a.unique_id = uid
+        model.grid.place_agent(a, node_ids[arrays['agent_node'][i]])
+
+        # Atribut di-set langsung (tanpa setter): counter okupansi dipulihkan utuh setelahnya
+        a._state = STATE_NAMES[arrays['agent_state'][i]]
+        tz = int(arrays['agent_target_zone'][i])
+        a._target_zone_id = zone_ids[tz] if tz >= 0 else None
+        if a._target_zone_id is not None and a._state in ("WALKING", "ACTIVITY"):
+            a._occupied_zone = a._target_zone_id
+        tn = int(arrays['agent_target_node'][i])
+        a.target_node = node_ids[tn] if tn >= 0 else None
+        a.path = [node_ids[n] for n in path_nodes[offsets[i]:offsets[i + 1]]]
+        a.current_activity = activities[arrays['agent_activity'][i]]
+        a.activity_duration = int(arrays['agent_duration'][i])
+        sleep_from = int(arrays['agent_sleep_from'][i])
+        a._sleep_from = sleep_from if sleep_from >= 0 else None
+        activity_from = int(arrays['agent_activity_from'][i])
+        a._activity_from = activity_from if activity_from >= 0 else None
+        agents.append(a)
+    # Agen baru melanjutkan nomor unique_id model asal
+    model.agent_ids = itertools.count(max(uids, default=0) + 1)
+
+    sched = model.scheduler
+    if sched is not None and 'sched_active' in arrays:
+        sched.active = {agents[i]: None for i in arrays['sched_active'].tolist()}
+        sched.sleeping = {agents[i]: t for i, t in zip(arrays['sched_sleeping'].tolist(),
+                                                        arrays['sched_token'].tolist())}
+        sched._heap = [(w, t, agents[i]) for w, t, i in arrays['sched_heap'].tolist()]
+        heapq.heapify(sched._heap)
+        sched._counter = itertools.count(meta['sched_next_token'])
+    elif sched is not None:
+        for a in agents:
+            sched.add(a)
+
+
+# ==========================================
+# FORK (what-if paralel)
+# ==========================================
+def _run_fork(task):
+    idx, path, variant, steps, data_dir = task
+    seed = variant.pop('seed', None)
+    return idx, run_replication(variant, seed, steps, data_dir, checkpoint=path)
+
+
+def fork_checkpoint(path, variants, steps, processes=None, data_dir="data"):
+    """
+    Jalankan banyak varian skenario dari satu checkpoint (misal kondisi jam 12:00),
+    sehingga pemanasan pagi hanya disimulasikan sekali. Setiap varian adalah dict
+    override untuk load_checkpoint (rain_schedule, capacity_overrides, closed_gates,
+    seed, ...). Return list {'variant': ..., occupancy/population/peak/minutes}
+    dengan format yang sama seperti ensemble.run_replication.
+    """
+    tasks = [(i, path, dict(v), steps, data_dir) for i, v in enumerate(variants)]
+    results = [None] * len(tasks)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        outputs = map(_run_fork, tasks)
+    else:
+        pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(data_dir,))
+        outputs = pool.map(_run_fork, tasks)
+    try:
+        for idx, summary in outputs:
+            results[idx] = {'variant': variants[idx], **summary}
+    finally:
+        if processes != 1:
+            pool.shutdown()
+    return results
@@ -0,0 +1,386 @@
+import numpy as np
+from .zones import crowd_allowed
+
+# Kode state (urutan sama dengan string state di ParkAgent)
+STATE_NAMES = ["DECIDING", "WALKING", "ACTIVITY", "LEAVING", "FINISHED"]
+DECIDING, WALKING, ACTIVITY, LEAVING, FINISHED = range(5)
+
+# Tujuan pemakaian angka acak per agen per step (kunci hash terpisah, lihat agent_uniform)
+DRAW_DWELL, DRAW_GO_HOME, DRAW_PICK = 1, 2, 3
+
+# --- Angka Acak Per Agen ---
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(x):
+    """Finalizer splitmix64 (array uint64, overflow = wrap)."""
+    x = (x ^ (x >> np.uint64(30))) * _MIX1
+    x = (x ^ (x >> np.uint64(27))) * _MIX2
+    return x ^ (x >> np.uint64(31))
+
+
+def agent_seed_key(seed=None):
+    """Kunci hash agent_uniform dari seed model (None = entropi OS)."""
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    return _mix(np.full(1, int(seed) & 0xFFFFFFFFFFFFFFFF, dtype=np.uint64))[0]
+
+
+def agent_uniform(seed_key, uid, step, purpose, j=None):
+    """
+    Uniform [0, 1) yang hanya bergantung pada (seed, uid agen, step, tujuan, j).
+    Pengganti rng.random bersama: hasilnya sama dalam urutan pemrosesan apa pun,
+    sehingga engine vektor (agent_rng=True) dan ShardedSimulation dengan partisi
+    berapa pun menghasilkan run yang identik.
+    j (opsional, di-broadcast) membedakan beberapa angka dalam satu keputusan.
+    """
+    key = _mix(np.asarray(uid, dtype=np.uint64) * _GOLDEN ^ seed_key)
+    key = _mix(key ^ np.uint64((int(step) << 8) | purpose))
+    if j is not None:
+        key = _mix(key + np.asarray(j, dtype=np.uint64) * _GOLDEN)
+    return (key >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+
+class VectorPopulation:
+    """
+    Engine populasi struct-of-arrays (alternatif dari ParkAgent per objek).
+
+    Semua pengunjung disimpan sebagai array NumPy: state, node saat ini,
+    node & zona tujuan, sisa durasi aktivitas, aktivitas, dan indeks profil.
+    Tiap step, satu kohort diproses sekaligus dengan operasi mask:
+    semua agen WALKING maju satu hop (lewat tabel next-hop RoutingTable),
+    semua agen ACTIVITY menghitung mundur bersama. Hanya agen yang perlu
+    keputusan baru yang diproses per grup aktivitas.
+
+    Logika keputusan mengikuti ParkAgent.make_decision (filter kandidat ->
+    penalti crowd/heat -> pilih amenities + random), sehingga hasilnya setara
+    secara statistik dengan engine objek. Loop visual lintasan track diabaikan.
+
+    seed_key (opsional, lihat agent_seed_key): keacakan agen diambil dari
+    agent_uniform per (uid, step) alih-alih aliran model.rng bersama. Hasilnya
+    identik dengan ShardedSimulation berseed sama; kedatangan tetap dari model.rng.
+    """
+
+    def __init__(self, model, capacity=1024, seed_key=None):
+        self.model = model
+        self.rng = model.rng
+        self.seed_key = seed_key
+        self.router = model.router
+        self.next_hop = model.router.next_hop
+        self.node_ids = model.router.nodes
+        self.node_index = model.router.index
+
+        # --- Tabel zona (array, dipakai bersama dengan ParkAgent) ---
+        self.zones = model.zone_table
+        self.zone_ids = self.zones.zone_ids
+
+        # --- Kode aktivitas ---
+        self.activity_names = []
+        self.activity_code = {}
+        for name in ['walking', 'shelter_seeking', 'leaving', *model.activity_rules.keys()]:
+            self.code_of(name)
+
+        # --- Tabel profil (array precompute dari ProfilePool) ---
+        self.profile_crowd = model.profile_pool.crowd_dislike
+        self.profile_heat = model.profile_pool.heat_dislike
+
+        # --- Array populasi ---
+        self.size = 0
+        self.next_uid = 1
+        self._alloc(capacity)
+
+    # --- Helper kode aktivitas & kandidat zona ---
+    def code_of(self, name):
+        code = self.activity_code.get(name)
+        if code is None:
+            code = len(self.activity_names)
+            self.activity_names.append(name)
+            self.activity_code[name] = code
+            rules = self.model.activity_rules.get(name, {})
+            dwell = int(rules.get('base_dwell_min', 15))
+            self._base_dwell = np.append(getattr(self, '_base_dwell', np.empty(0, dtype=np.int32)), dwell)
+        return code
+
+    def _alloc(self, capacity):
+        def grow(name, dtype, fill):
+            new = np.full(capacity, fill, dtype=dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+        grow('uid', np.int64, 0)
+        grow('state', np.int8, FINISHED)
+        grow('node', np.int32, -1)
+        grow('target_node', np.int32, -1)
+        grow('target_zone', np.int32, -1)
+        grow('dwell', np.int32, 0)
+        grow('activity', np.int16, 0)
+        grow('profile', np.int32, 0)
+        grow('since', np.int32, -1) # Step masuk ACTIVITY (durasi untuk KPI)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.size
+
+    # --- Spawn & Hapus ---
+    def spawn(self, gate_nodes, profile_idx, activity_name):
+        """Tambah sejumlah agen sekaligus (state DECIDING di node gate)."""
+        n = len(profile_idx)
+        if n == 0:
+            return
+        if self.size + n > self.capacity:
+            self._alloc(max(self.capacity * 2, self.size + n))
+        s = slice(self.size, self.size + n)
+        self.uid[s] = np.arange(self.next_uid, self.next_uid + n)
+        self.state[s] = DECIDING
+        self.node[s] = [self.node_index[g] for g in gate_nodes]
+        self.target_node[s] = -1
+        self.target_zone[s] = -1
+        self.dwell[s] = 0
+        self.activity[s] = self.code_of(activity_name)
+        self.profile[s] = profile_idx
+        self.since[s] = -1
+        self.next_uid += n
+        self.size += n
+
+    def compact(self):
+        """Buang agen FINISHED (geser array, urutan tetap)."""
+        n = self.size
+        keep = self.state[:n] != FINISHED
+        if keep.all():
+            return 0
+        k = int(keep.sum())
+        for name in ('uid', 'state', 'node', 'target_node', 'target_zone', 'dwell', 'activity', 'profile', 'since'):
+            arr = getattr(self, name)
+            arr[:k] = arr[:n][keep]
+        self.size = k
+        return n - k
+
+    # --- Statistik ---
+    def zone_counts(self):
+        """Jumlah agen WALKING/ACTIVITY per zona tujuan (sama seperti update_environment)."""
+        n = self.size
+        st = self.state[:n]
+        tz = self.target_zone[:n]
+        mask = ((st == WALKING) | (st == ACTIVITY)) & (tz >= 0)
+        return np.bincount(tz[mask], minlength=len(self.zone_ids))
+
+    def positions(self):
+        """Node id tiap agen hidup (untuk visualisasi / analisis)."""
+        return [self.node_ids[i] for i in self.node[:self.size]]
+
+    # --- Fast-forward ---
+    def idle_steps(self, is_raining):
+        """
+        Jumlah step ke depan yang hanya menghitung mundur durasi ACTIVITY (tanpa gerak,
+        keputusan, maupun RNG) jika kondisi hujan tetap. 0 = step berikutnya ada kejadian,
+        None = tidak dibatasi populasi (kosong, atau semua menunggu hujan reda).
+        """
+        n = self.size
+        if n == 0:
+            return None
+        st = self.state[:n]
+        if np.any(st != ACTIVITY):
+            return 0
+        dwell = self.dwell[:n]
+        bound = np.ones(n, dtype=bool) # Agen yang selesai aktivitas saat dwell habis
+        if is_raining:
+            act = self.activity[:n]
+            tz = self.target_zone[:n]
+            bound = act != self.activity_code['shelter_seeking']
+            has_zone = tz >= 0
+            open_zone = np.ones(n, dtype=bool)
+            open_zone[has_zone] = ~self.zones.is_shelter[tz[has_zone]]
+            if np.any(bound & has_zone & open_zone):
+                return 0 # Ada yang panik cari shelter
+        if not bound.any():
+            return None
+        return max(0, int(dwell[bound].min()))
+
+    def skip(self, k):
+        """Majukan k step idle sekaligus (lihat idle_steps): durasi positif berkurang k, minimal 0."""
+        dwell = self.dwell[:self.size]
+        busy = dwell > 0
+        dwell[busy] = np.maximum(dwell[busy] - k, 0)
+
+    # --- Step ---
+    def step(self, is_raining, temperature, zone_counts):
+        n = self.size
+        if n == 0:
+            return
+        st = self.state[:n]
+        node = self.node[:n]
+        target = self.target_node[:n]
+        tz = self.target_zone[:n]
+        dwell = self.dwell[:n]
+        act = self.activity[:n]
+
+        deciding = st == DECIDING
+        moving = (st == WALKING) | (st == LEAVING)
+        in_activity = st == ACTIVITY
+
+        # 1. Kohort WALKING/LEAVING: maju satu hop, atau sampai tujuan
+        arrived = moving & (node == target)
+        step_mask = moving & ~arrived
+        idx = np.flatnonzero(step_mask)
+        node[idx] = self.next_hop[target[idx], node[idx]]
+
+        arrive_zone = np.flatnonzero(arrived & (tz >= 0))
+        st[arrive_zone] = ACTIVITY
+        dwell[arrive_zone] = self._base_dwell[act[arrive_zone]] + self._dwell_offset(arrive_zone)
+        self.since[arrive_zone] = self.model.steps
+        exit_mask = arrived & (tz < 0)
+        st[exit_mask] = FINISHED
+        kpi = self.model.kpi
+        if kpi is not None and exit_mask.any():
+            kpi.exits(node[exit_mask])
+
+        # 2. Kohort ACTIVITY
+        shelter_code = self.activity_code['shelter_seeking']
+        panic = np.zeros(n, dtype=bool)
+        if is_raining:
+            # Hujan: agen di zona terbuka yang bukan shelter_seeking langsung cari shelter
+            open_zone = np.ones(n, dtype=bool)
+            has_zone = tz >= 0
+            open_zone[has_zone] = ~self.zones.is_shelter[tz[has_zone]]
+            panic = in_activity & (act != shelter_code) & has_zone & open_zone
+        ticking = in_activity & ~panic
+        busy = ticking & (dwell > 0)
+        dwell[busy] -= 1
+
+        done = np.flatnonzero(ticking & ~busy)
+        if is_raining:
+            done = done[act[done] != shelter_code] # Tetap berteduh selama hujan
+        if kpi is not None:
+            ended = done
+            if is_raining:
+                displaced = np.flatnonzero(panic)
+                kpi.displaced(tz[displaced])
+                ended = np.concatenate([done, displaced])
+            self._record_dwell(kpi, ended)
+        if len(done):
+            go = self._uniform(done, DRAW_GO_HOME) < 0.3
+            self._go_home(done[go])
+            st[done[~go]] = DECIDING
+
+        # 3. Agen yang butuh keputusan (DECIDING di awal step + panik karena hujan)
+        need = np.flatnonzero(deciding | panic)
+        prof = self.model.profiler
+        if prof is not None:
+            prof.counts['decisions_deciding'] += int(np.count_nonzero(deciding))
+            prof.counts['decisions_activity'] += int(np.count_nonzero(panic))
+        if len(need):
+            self._decide(need, is_raining, temperature, zone_counts)
+
+    # --- Sumber angka acak (model.rng bersama atau per agen) ---
+    def _uniform(self, idx, purpose):
+        if self.seed_key is None:
+            return self.rng.random(len(idx))
+        return agent_uniform(self.seed_key, self.uid[idx], self.model.steps, purpose)
+
+    def _dwell_offset(self, idx):
+        """Variasi durasi aktivitas -5..5 menit."""
+        if self.seed_key is None:
+            return self.rng.integers(-5, 6, size=len(idx))
+        return np.floor(self._uniform(idx, DRAW_DWELL) * 11).astype(np.int32) - 5
+
+    def _pick_noise(self, group, cand):
+        """Noise acak skor zona, matriks (agen grup x kandidat)."""
+        if self.seed_key is None:
+            return self.rng.random((len(group), len(cand)))
+        return agent_uniform(self.seed_key, self.uid[group][:, None], self.model.steps, DRAW_PICK, cand[None, :])
+
+    def _record_dwell(self, kpi, idx):
+        """Durasi aktivitas agen `idx` yang berakhir di step ini (sebelum aktivitas diganti)."""
+        idx = idx[self.since[idx] >= 0]
+        if len(idx) == 0:
+            return
+        minutes = self.model.steps - self.since[idx]
+        codes = self.activity[idx]
+        for code in np.unique(codes):
+            kpi.dwell_time(self.activity_names[code], minutes[codes == code])
+        self.since[idx] = -1
+
+    def _go_home(self, idx):
+        if len(idx) == 0:
+            return
+        if self.model.profiler is not None: self.model.profiler.counts['gate_route_calls'] += len(idx)
+        field = self.model.gate_field
+        gate = field.nearest_gate[self.node[idx]]
+        ok = gate >= 0
+        self.activity[idx] = self.activity_code['leaving']
+        self.target_zone[idx] = -1
+        self.target_node[idx[ok]] = gate[ok]
+        self.state[idx[ok]] = LEAVING
+        self.state[idx[~ok]] = FINISHED
+
+    def _decide(self, idx, is_raining, temperature, zone_counts):
+        act = self.activity
+        if is_raining:
+            act[idx] = self.activity_code['shelter_seeking']
+
+        zones = self.zones
+        closed = self.model.closed_gates
+        prof = self.model.profiler
+        kpi = self.model.kpi
+        walking = self.activity_code['walking']
+        shelter = self.activity_code['shelter_seeking']
+
+        # Kandidat kosong (misal tidak ada track) -> fallback walking
+        for code in np.unique(act[idx]):
+            if code != shelter and len(zones.candidates(self.activity_names[code])) == 0:
+                fallback = idx[act[idx] == code]
+                act[fallback] = walking
+                if prof is not None: prof.counts['fallback_walking'] += len(fallback)
+
+        for code in np.unique(act[idx]):
+            group = idx[act[idx] == code]
+            cand = zones.candidates(self.activity_names[code], closed)
+            if len(cand) == 0:
+                if prof is not None: prof.counts['fallback_go_home'] += len(group)
+                self._go_home(group)
+                continue
+
+            ok = np.ones((len(group), len(cand)), dtype=bool)
+            crowd_ok = heat_ok = True
+            if not is_raining:
+                # A. Penalti keramaian
+                crowd_ok = crowd_allowed(zone_counts[cand][None, :], zones.capacity[cand][None, :],
+                                         self.profile_crowd[self.profile[group]][:, None])
+                ok &= crowd_ok
+                # B. Penalti panas
+                if temperature > 0.7:
+                    hates_heat = self.profile_heat[self.profile[group]] > 0.6
+                    heat_ok = ~(hates_heat[:, None] & zones.is_hot[cand][None, :])
+                    ok &= heat_ok
+                if prof is not None:
+                    prof.counts['eliminated_crowd'] += int(crowd_ok.size - np.count_nonzero(crowd_ok))
+                    if heat_ok is not True:
+                        prof.counts['eliminated_heat'] += int(heat_ok.size - np.count_nonzero(heat_ok))
+            # Semua tereliminasi -> terpaksa ambil dari kandidat awal
+            none_ok = ~ok.any(axis=1)
+            ok[none_ok] = True
+            if prof is not None:
+                prof.counts['candidate_scans'] += len(group)
+                prof.counts['candidates'] += ok.size
+                prof.counts['fallback_all_eliminated'] += int(np.count_nonzero(none_ok))
+                prof.counts['route_calls'] += len(group)
+
+            score = zones.amenities[cand][None, :] + self._pick_noise(group, cand)
+            score[~ok] = -np.inf
+            pick = cand[np.argmax(score, axis=1)]
+            if kpi is not None:
+                kpi.decisions(cand, len(group),
+                              None if crowd_ok is True else len(group) - crowd_ok.sum(axis=0),
+                              None if heat_ok is True else len(group) - heat_ok.sum(axis=0), pick)
+
+            self.target_zone[group] = pick
+            self.target_node[group] = zones.nav_idx[pick]
+            # Sama seperti ParkAgent: jika rute gagal, agen tetap WALKING tanpa
+            # path sehingga "sampai" di node saat ini pada step berikutnya
+            unreachable = group[self.next_hop[self.target_node[group], self.node[group]] < 0]
+            self.target_node[unreachable] = self.node[unreachable]
+            self.state[group] = WALKING
@@ -0,0 +1,169 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .kpi import KPIAggregator
+from .loader import DataLoader
+from .model import ParkModel
+
+# Dataset yang sudah di-parse per data_dir, dimuat sekali per proses worker
+_DATASETS = {}
+
+
+def _init_worker(data_dir):
+    _DATASETS[os.path.abspath(data_dir)] = DataLoader(data_dir, verbose=False).load_all()
+
+
+def _get_dataset(data_dir):
+    key = os.path.abspath(data_dir)
+    if key not in _DATASETS:
+        _init_worker(data_dir)
+    return _DATASETS[key]
+
+
+# Parameter ParkModel yang nilainya sendiri sudah berupa list: satu list = satu nilai
+# konstan, sweep ditulis sebagai list of list (misal 'rain_schedule': [[0, 1], [1, 1]])
+LIST_VALUED_KEYS = ('rain_schedule', 'schedule')
+
+
+def expand_sweep(spec):
+    """
+    Ubah sweep spec menjadi daftar skenario (produk kartesius).
+    Contoh: {'arrival_multiplier': [1.0, 1.5], 'crowd_tolerance_shift': [0, 0.2]} -> 4 skenario.
+    Nilai yang bukan list dianggap konstan. Untuk LIST_VALUED_KEYS, list biasa adalah
+    satu nilai konstan dan hanya list of list yang menjadi sumbu sweep.
+    Spec yang ambigu (list kosong, campuran list & skalar) ditolak dengan ValueError.
+    """
+    keys = list(spec.keys())
+    values = []
+    for key, value in spec.items():
+        if not isinstance(value, list):
+            values.append([value])
+            continue
+        if not value:
+            raise ValueError(f"Sweep '{key}' kosong: tidak ada skenario yang bisa dibuat")
+        nested = [isinstance(v, list) for v in value]
+        if key in LIST_VALUED_KEYS:
+            if all(nested):
+                values.append(value)
+            elif not any(nested):
+                values.append([value])
+            else:
+                raise ValueError(f"Sweep '{key}' ambigu: campuran list dan skalar; "
+                                 f"tulis satu nilai sebagai [..] atau sweep sebagai [[..], [..]]")
+        elif any(nested):
+            raise ValueError(f"Sweep '{key}' berisi list, padahal '{key}' bukan parameter bernilai list")
+        else:
+            values.append(value)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def run_replication(scenario, seed, steps, data_dir="data", model_kwargs=None, checkpoint=None, kpi=False):
+    """
+    Jalankan satu replikasi dan kembalikan statistik ringkas (array, bukan DataFrame):
+    - occupancy: rata-rata okupansi per [slot waktu x zona]
+    - population: rata-rata populasi per slot waktu
+    - peak: puncak okupansi per zona
+    Jika `checkpoint` diberikan, replikasi dimulai dari state checkpoint (skenario = override).
+    kpi=True menambahkan 'kpi': KPIAggregator replikasi ini (sudah dilepas dari model).
+    """
+    dataset = _get_dataset(data_dir)
+    if checkpoint is not None:
+        from .checkpoint import load_checkpoint
+        model = load_checkpoint(checkpoint, dataset=dataset, seed=seed, **scenario)
+    else:
+        model = ParkModel(dataset=dataset, seed=seed, verbose=0, **(model_kwargs or {}), **scenario)
+    aggregator = KPIAggregator().attach(model) if kpi else None
+    result = summarize_run(model, steps)
+    if aggregator is not None:
+        result['kpi'] = aggregator.detach()
+    return result
+
+
+def summarize_run(model, steps):
+    """
+    Majukan model `steps` step sambil mengumpulkan statistik ringkas (lihat run_replication).
+    Berhenti lebih awal jika running=False, seperti ParkModel.advance.
+    """
+    n_slots = model.timeline.max_slots() # Statistik per slot jam (hari-hari dirata-rata)
+    n_zones = len(model.occupancy.zone_ids)
+    occ_sum = np.zeros((n_slots, n_zones), dtype=np.float64)
+    pop_sum = np.zeros(n_slots, dtype=np.float64)
+    minutes = np.zeros(n_slots, dtype=np.int64)
+
+    done = 0
+    while done < steps and model.running:
+        # Rentang idle (fast_forward) tidak melewati pergantian slot: okupansi & populasi konstan
+        k = model.idle_steps(steps - done) if model.fast_forward else 0
+        if k:
+            model.skip(k)
+        else:
+            model.step()
+            k = 1
+        if not model.running:
+            break # Timeline habis: taman tutup (close_park), menit di luar jadwal tidak dijalankan
+        done += k
+        slot = model.current_time_idx
+        occ_sum[slot] += k * model.occupancy.counts
+        pop_sum[slot] += k * model.population_size()
+        minutes[slot] += k
+
+    div = np.maximum(minutes, 1)
+    return {
+        'occupancy': (occ_sum / div[:, None]).astype(np.float32),
+        'population': (pop_sum / div).astype(np.float32),
+        'peak': model.occupancy.peak.astype(np.int32),
+        'minutes': minutes.astype(np.int32),
+    }
+
+
+def _run_task(task):
+    scenario_idx, scenario, seed, steps, data_dir, model_kwargs, checkpoint, kpi = task
+    return scenario_idx, run_replication(scenario, seed, steps, data_dir, model_kwargs, checkpoint, kpi)
+
+
+def run_ensemble(spec, replications=10, steps=600, processes=None, base_seed=0,
+                 data_dir="data", model_kwargs=None, checkpoint=None, kpi=False):
+    """
+    Monte Carlo / parameter sweep paralel.
+
+    Setiap replikasi mendapat seed sendiri dari SeedSequence(base_seed), sehingga
+    hasil bisa diulang dan tidak bergantung pada jumlah proses. CSV hanya di-parse
+    sekali per worker. Hasil per skenario diagregasi menjadi mean & std array.
+    Dengan `checkpoint`, semua replikasi bercabang dari state checkpoint (misal jam 12:00)
+    sehingga pemanasan pagi tidak disimulasikan ulang; model_kwargs diabaikan.
+    kpi=True: KPIAggregator semua replikasi skenario digabung ke summary['kpi'].
+    """
+    scenarios = expand_sweep(spec or {})
+    seeds = np.random.SeedSequence(base_seed).generate_state(len(scenarios) * replications)
+
+    tasks = []
+    for s_idx, scenario in enumerate(scenarios):
+        for r in range(replications):
+            seed = int(seeds[s_idx * replications + r])
+            tasks.append((s_idx, scenario, seed, steps, data_dir, model_kwargs, checkpoint, kpi))
+
+    per_scenario = [[] for _ in scenarios]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        for task in tasks:
+            s_idx, res = _run_task(task)
+            per_scenario[s_idx].append(res)
+    else:
+        _get_dataset(data_dir) # Snapshot ditulis sekali di proses induk sebelum worker start
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(data_dir,)) as pool:
+            for s_idx, res in pool.map(_run_task, tasks, chunksize=max(1, len(tasks) // (4 * processes))):
+                per_scenario[s_idx].append(res)
+
+    results = []
+    for scenario, reps in zip(scenarios, per_scenario):
+        summary = {'scenario': scenario, 'replications': len(reps)}
+        for key in ('occupancy', 'population', 'peak'):
+            stacked = np.stack([r[key] for r in reps])
+            summary[f'{key}_mean'] = stacked.mean(axis=0)
+            summary[f'{key}_std'] = stacked.std(axis=0)
+        if kpi:
+            summary['kpi'] = KPIAggregator.merged(r['kpi'] for r in reps)
+        results.append(summary)
+    return results
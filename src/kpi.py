@@ -0,0 +1,343 @@
+import json
+import math
+import os
+import numpy as np
+import pandas as pd
+
+
+class QuantileSketch:
+    """
+    Sketch kuantil berbobot log (gaya DDSketch) untuk nilai >= 1 (misal durasi menit).
+
+    Bucket i menampung nilai di (gamma^(i-1), gamma^i] dengan gamma = (1+a)/(1-a),
+    sehingga setiap kuantil diperkirakan dengan galat relatif <= a. Jumlah bucket
+    tetap (ditentukan max_value), tidak bergantung pada jumlah sampel; dua sketch
+    dengan parameter sama digabung cukup dengan menjumlahkan bucket.
+    """
+
+    def __init__(self, relative_accuracy=0.01, max_value=1e5):
+        self.relative_accuracy = float(relative_accuracy)
+        self.max_value = float(max_value)
+        self.gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = np.zeros(int(math.ceil(math.log(self.max_value) / self._log_gamma)) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return
+        idx = np.minimum(np.ceil(np.log(np.maximum(values, 1.0)) / self._log_gamma), len(self.buckets) - 1)
+        np.add.at(self.buckets, idx.astype(np.intp), 1)
+        lo, hi = values.min(), values.max()
+        self.count += len(values)
+        self.total += float(values.sum())
+        if lo < self.min: self.min = float(lo)
+        if hi > self.max: self.max = float(hi)
+
+    def add_value(self, value):
+        """Satu nilai skalar (jalur cepat untuk hook per agen)."""
+        i = math.ceil(math.log(value) / self._log_gamma) if value > 1.0 else 0
+        self.buckets[min(i, len(self.buckets) - 1)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min: self.min = float(value)
+        if value > self.max: self.max = float(value)
+
+    def merge(self, other):
+        if (other.relative_accuracy, other.max_value) != (self.relative_accuracy, self.max_value):
+            raise ValueError("QuantileSketch hanya bisa digabung dengan parameter yang sama")
+        self.buckets += other.buckets
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Perkiraan kuantil q (0-1), NaN jika sketch kosong."""
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        i = int(np.searchsorted(np.cumsum(self.buckets), rank, side='right'))
+        value = 1.0 if i == 0 else 2 * self.gamma ** i / (self.gamma + 1)
+        return min(max(value, self.min), self.max)
+
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+
+class KPIAggregator:
+    """
+    Agregasi KPI streaming (memori tetap) yang dipasang ke ParkModel.
+
+    Diisi lewat hook transisi state (engine objek: ParkAgent, engine vektor:
+    VectorPopulation) dan satu record_step per menit, tanpa menyimpan agen per step:
+    - histogram okupansi per [slot waktu x zona x band rasio okupansi/kapasitas],
+      plus rata-rata okupansi per slot dan puncak okupansi (nilai, step, hari, slot)
+    - sketch kuantil durasi aktivitas (menit di state ACTIVITY) per aktivitas
+    - per zona: berapa kali jadi kandidat make_decision, tereliminasi filter crowd /
+      heat, terpilih, dan jumlah agen yang tergusur hujan dari zona itu
+    - arus masuk & keluar per gate per slot waktu
+    Ukuran semua array hanya bergantung pada jumlah zona, gate, slot, dan aktivitas.
+    Hasil beberapa replikasi digabung dengan merge() / merged(); ekspor via tables(),
+    save_csv() atau save()/load() (.npz).
+    """
+
+    def __init__(self, occupancy_bins=10, relative_accuracy=0.01):
+        self.occupancy_bins = int(occupancy_bins)
+        self.relative_accuracy = relative_accuracy
+        self.replications = 0
+        self.dwell = {} # aktivitas -> QuantileSketch
+        self._pending = [] # Keputusan per agen (engine objek) sejak record_step terakhir
+        self._model = None
+
+    # --- Pasang ke Model ---
+    def attach(self, model):
+        """Alokasikan array sesuai zona/gate/slot model, lalu pasang sebagai model.kpi."""
+        n_slots = model.timeline.max_slots()
+        n_zones = len(model.occupancy.zone_ids)
+        if self.replications == 0:
+            self.zone_ids = list(model.occupancy.zone_ids)
+            self.gate_nodes = [str(g) for g in dict.fromkeys(model.gate_nodes)]
+            longest = max((model.timeline.day(k) for k in dict.fromkeys(model.timeline.days)),
+                          key=lambda d: d.n_slots)
+            self.time_slots = list(longest.time_slots)
+            self.histogram = np.zeros((n_slots, n_zones, self.occupancy_bins + 1), dtype=np.int64)
+            self.occupancy_sum = np.zeros((n_slots, n_zones), dtype=np.float64)
+            self.minutes = np.zeros(n_slots, dtype=np.int64)
+            self.peak = np.zeros(n_zones, dtype=np.int64)
+            self.peak_step = np.full(n_zones, -1, dtype=np.int64)
+            self.peak_day = np.full(n_zones, -1, dtype=np.int64)
+            self.peak_slot = np.full(n_zones, -1, dtype=np.int64)
+            self.considered = np.zeros(n_zones, dtype=np.int64)
+            self.eliminated_crowd = np.zeros(n_zones, dtype=np.int64)
+            self.eliminated_heat = np.zeros(n_zones, dtype=np.int64)
+            self.chosen = np.zeros(n_zones, dtype=np.int64)
+            self.rain_displaced = np.zeros(n_zones, dtype=np.int64)
+            self.gate_entries = np.zeros((n_slots, len(self.gate_nodes)), dtype=np.int64)
+            self.gate_exits = np.zeros((n_slots, len(self.gate_nodes)), dtype=np.int64)
+        elif list(model.occupancy.zone_ids) != self.zone_ids or n_slots != len(self.minutes):
+            raise ValueError("KPIAggregator dipakai ulang untuk model dengan zona/jadwal berbeda")
+        gate_col = {g: i for i, g in enumerate(self.gate_nodes)}
+        self._gate_of = np.array([gate_col.get(str(n), -1) for n in model.node_ids], dtype=np.int64)
+        self._capacity = model.zone_table.capacity
+        self.replications += 1
+        self._model = model
+        model.kpi = self
+        return self
+
+    def detach(self):
+        """Lepas dari model (agar bisa di-pickle / digabung). Return self."""
+        self._flush()
+        if self._model is not None and self._model.kpi is self:
+            self._model.kpi = None
+        self._model = None
+        self._gate_of = self._capacity = None
+        return self
+
+    # --- Hook ---
+    def record_step(self, model):
+        """Dipanggil sekali per menit (step penuh maupun skip) setelah okupansi final."""
+        self._flush()
+        slot = model.current_time_idx
+        counts = model.occupancy.counts
+        band = np.minimum(self.occupancy_bins, (counts * self.occupancy_bins // self._capacity).astype(np.int64))
+        self.histogram[slot, np.arange(len(counts)), band] += 1
+        self.occupancy_sum[slot] += counts
+        self.minutes[slot] += 1
+        higher = counts > self.peak
+        if higher.any():
+            self.peak[higher] = counts[higher]
+            self.peak_step[higher] = model.steps
+            self.peak_day[higher] = model.current_day
+            self.peak_slot[higher] = slot
+
+    def entries(self, node_idx):
+        """Agen baru masuk lewat gate di node (indeks node)."""
+        np.add.at(self.gate_entries[self._model.current_time_idx], self._gate_of[node_idx], 1)
+
+    def exits(self, node_idx):
+        """Agen LEAVING sampai di node gate dan keluar."""
+        exits = self.gate_exits[self._model.current_time_idx]
+        if isinstance(node_idx, int):
+            gate = self._gate_of[node_idx]
+            if gate >= 0:
+                exits[gate] += 1
+            return
+        gate = self._gate_of[node_idx]
+        np.add.at(exits, gate[gate >= 0], 1)
+
+    def dwell_time(self, activity, minutes):
+        sketch = self.dwell.get(activity)
+        if sketch is None:
+            sketch = self.dwell[activity] = QuantileSketch(self.relative_accuracy)
+        if isinstance(minutes, int):
+            sketch.add_value(minutes)
+        else:
+            sketch.add(minutes)
+
+    def decisions(self, cand, n, crowd=None, heat=None, picks=None):
+        """
+        n keputusan atas kandidat `cand` (indeks zona). crowd/heat = jumlah eliminasi
+        per kandidat (mask bool atau hitungan), picks = zona terpilih.
+        Keputusan tunggal (pick int, engine objek) ditampung dan dijumlah sekali per step.
+        """
+        if isinstance(picks, int):
+            self._pending.append((cand, crowd, heat))
+            self.chosen[picks] += 1
+            return
+        self.considered[cand] += n
+        if crowd is not None and crowd.any():
+            self.eliminated_crowd[cand] += crowd
+        if heat is not None and heat.any():
+            self.eliminated_heat[cand] += heat
+        if picks is not None:
+            np.add.at(self.chosen, picks, 1)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        cand, crowd, heat = (np.concatenate(parts) for parts in zip(*self._pending))
+        self._pending.clear()
+        n = len(self.considered)
+        self.considered += np.bincount(cand, minlength=n)
+        self.eliminated_crowd += np.bincount(cand[crowd], minlength=n)
+        self.eliminated_heat += np.bincount(cand[heat], minlength=n)
+
+    def displaced(self, zone_idx):
+        """Agen di zona terbuka yang panik mencari shelter karena hujan."""
+        np.add.at(self.rain_displaced, zone_idx, 1)
+
+    # --- Gabung Replikasi ---
+    _SUM_FIELDS = ('histogram', 'occupancy_sum', 'minutes', 'considered', 'eliminated_crowd',
+                   'eliminated_heat', 'chosen', 'rain_displaced', 'gate_entries', 'gate_exits')
+    _PEAK_FIELDS = ('peak', 'peak_step', 'peak_day', 'peak_slot')
+
+    def merge(self, other):
+        """Tambahkan statistik replikasi lain (zona & slot harus sama). Puncak = maksimum."""
+        if other.zone_ids != self.zone_ids or other.histogram.shape != self.histogram.shape:
+            raise ValueError("KPIAggregator hanya bisa digabung untuk zona/jadwal yang sama")
+        for name in self._SUM_FIELDS:
+            getattr(self, name)[...] += getattr(other, name)
+        higher = other.peak > self.peak
+        for name in self._PEAK_FIELDS:
+            getattr(self, name)[higher] = getattr(other, name)[higher]
+        for activity, sketch in other.dwell.items():
+            if activity in self.dwell:
+                self.dwell[activity].merge(sketch)
+            else:
+                self.dwell[activity] = QuantileSketch(sketch.relative_accuracy, sketch.max_value).merge(sketch)
+        self.replications += other.replications
+        return self
+
+    @classmethod
+    def merged(cls, aggregators):
+        """Agregator baru hasil gabungan beberapa replikasi."""
+        aggregators = list(aggregators)
+        if not aggregators:
+            return None
+        first = aggregators[0]
+        result = cls(first.occupancy_bins, first.relative_accuracy)
+        for name in ('zone_ids', 'gate_nodes', 'time_slots'):
+            setattr(result, name, list(getattr(first, name)))
+        for name in cls._SUM_FIELDS + cls._PEAK_FIELDS:
+            setattr(result, name, getattr(first, name).copy())
+        for activity, sketch in first.dwell.items():
+            result.dwell[activity] = QuantileSketch(sketch.relative_accuracy, sketch.max_value).merge(sketch)
+        result.replications = first.replications
+        for other in aggregators[1:]:
+            result.merge(other)
+        return result
+
+    # --- Ekspor ---
+    def _slot_label(self, slot):
+        return self.time_slots[slot] if 0 <= slot < len(self.time_slots) else ""
+
+    def tables(self):
+        """Dict DataFrame: 'zones', 'occupancy', 'histogram', 'dwell', 'gates'."""
+        considered = np.maximum(self.considered, 1)
+        zones = pd.DataFrame({
+            'zone_id': self.zone_ids,
+            'peak': self.peak, 'peak_step': self.peak_step, 'peak_day': self.peak_day,
+            'peak_time_slot': [self._slot_label(s) for s in self.peak_slot],
+            'considered': self.considered, 'chosen': self.chosen,
+            'eliminated_crowd': self.eliminated_crowd, 'eliminated_heat': self.eliminated_heat,
+            'crowd_rejection_rate': self.eliminated_crowd / considered,
+            'heat_rejection_rate': self.eliminated_heat / considered,
+            'rain_displaced': self.rain_displaced,
+        })
+
+        n_slots, n_zones, n_bins = self.histogram.shape
+        mean = self.occupancy_sum / np.maximum(self.minutes, 1)[:, None]
+        occupancy = pd.DataFrame({
+            'slot': np.repeat(np.arange(n_slots), n_zones),
+            'time_slot': np.repeat([self._slot_label(s) for s in range(n_slots)], n_zones),
+            'zone_id': np.tile(self.zone_ids, n_slots),
+            'minutes': np.repeat(self.minutes, n_zones),
+            'mean_occupancy': mean.ravel(),
+        })
+
+        width = 100 // self.occupancy_bins if 100 % self.occupancy_bins == 0 else 100 / self.occupancy_bins
+        labels = [f"{b * width:g}-{(b + 1) * width:g}%" for b in range(self.occupancy_bins)] + ["100%+"]
+        histogram = occupancy[['slot', 'time_slot', 'zone_id']].loc[np.repeat(occupancy.index, n_bins)]
+        histogram = histogram.reset_index(drop=True)
+        histogram['band'] = np.tile(labels, n_slots * n_zones)
+        histogram['minutes'] = self.histogram.ravel()
+
+        dwell = pd.DataFrame([
+            {'activity': name, 'count': s.count, 'mean': s.mean(),
+             'min': s.min if s.count else math.nan, 'p25': s.quantile(0.25), 'p50': s.quantile(0.5),
+             'p75': s.quantile(0.75), 'p90': s.quantile(0.9), 'p99': s.quantile(0.99),
+             'max': s.max if s.count else math.nan}
+            for name, s in sorted(self.dwell.items())
+        ], columns=['activity', 'count', 'mean', 'min', 'p25', 'p50', 'p75', 'p90', 'p99', 'max'])
+
+        n_gates = len(self.gate_nodes)
+        gates = pd.DataFrame({
+            'slot': np.repeat(np.arange(n_slots), n_gates),
+            'time_slot': np.repeat([self._slot_label(s) for s in range(n_slots)], n_gates),
+            'gate_node': np.tile(self.gate_nodes, n_slots),
+            'entries': self.gate_entries.ravel(),
+            'exits': self.gate_exits.ravel(),
+        })
+        return {'zones': zones, 'occupancy': occupancy, 'histogram': histogram, 'dwell': dwell, 'gates': gates}
+
+    def save_csv(self, out_dir):
+        """Tulis setiap tabel ke <out_dir>/kpi_<nama>.csv."""
+        os.makedirs(out_dir, exist_ok=True)
+        for name, df in self.tables().items():
+            df.to_csv(os.path.join(out_dir, f"kpi_{name}.csv"), index=False)
+
+    def save(self, path):
+        """Simpan state mentah (.npz) agar bisa digabung dengan replikasi lain nanti."""
+        arrays = {name: getattr(self, name) for name in self._SUM_FIELDS + self._PEAK_FIELDS}
+        names = sorted(self.dwell)
+        sketches = [self.dwell[n] for n in names]
+        arrays['dwell_buckets'] = np.array([s.buckets for s in sketches]).reshape(len(names), -1)
+        arrays['dwell_stats'] = np.array([(s.count, s.total, s.min, s.max) for s in sketches]).reshape(len(names), 4)
+        meta = {'occupancy_bins': self.occupancy_bins, 'relative_accuracy': self.relative_accuracy,
+                'replications': self.replications, 'zone_ids': self.zone_ids, 'gate_nodes': self.gate_nodes,
+                'time_slots': self.time_slots, 'dwell_activities': names,
+                'dwell_max_value': sketches[0].max_value if sketches else 1e5}
+        np.savez_compressed(path, __meta__=np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['__meta__']))
+            agg = cls(meta['occupancy_bins'], meta['relative_accuracy'])
+            for name in ('zone_ids', 'gate_nodes', 'time_slots', 'replications'):
+                setattr(agg, name, meta[name])
+            for name in cls._SUM_FIELDS + cls._PEAK_FIELDS:
+                setattr(agg, name, data[name].copy())
+            for i, name in enumerate(meta['dwell_activities']):
+                sketch = QuantileSketch(meta['relative_accuracy'], meta['dwell_max_value'])
+                sketch.buckets[:] = data['dwell_buckets'][i]
+                count, total, lo, hi = data['dwell_stats'][i]
+                sketch.count, sketch.total, sketch.min, sketch.max = int(count), float(total), float(lo), float(hi)
+                agg.dwell[name] = sketch
+        return agg
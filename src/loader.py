@@ -1,79 +1,116 @@
-import pandas as pd
+import hashlib
+import json
 import os
+import tempfile
+import time
+import zipfile
+import numpy as np
+import pandas as pd
+
+# Sumber data CSV yang dibaca DataLoader
+SOURCE_FILES = [
+    "path_nodes.csv", "path_edges.csv", "zone_config.csv", "park_facilities.csv",
+    "general_facilities.csv", "survey_preferences_1000.csv", "activity_usage_profile.csv",
+    "arrival_profile_weekend_counts.csv", "env_schedule_weekend.csv",
+]
+
+# Supported Activities berdasarkan Tipe Zona (Sesuai dokumen Activity Usage Profile)
+SUPPORTED_ACTIVITIES = {
+    'track': ['running', 'walking', 'cycling'],
+    'garden': ['walking', 'relax', 'photo', 'eating', 'reading'],
+    'playground': ['playing', 'photo', 'walking'],
+    'fitness_zone': ['exercise', 'stretching'],
+    'picnic_area': ['eating', 'relax', 'socializing'],
+    'gazebo': ['relax', 'reading', 'socializing', 'eating'],
+    'bench_zone': ['resting', 'reading', 'eating'],
+    'gate': ['leaving'], # Khusus Gate
+}
+
+DEFAULT_SCHEDULE = "weekend" # Jadwal bawaan dataset (env_schedule_<nama>.csv + arrival_profile_<nama>_counts.csv)
+FRAME_KEYS = ("arrival_data", "env_data", "agent_profiles") # Bagian dataset yang tetap berupa DataFrame
+SNAPSHOT_VERSION = 2
+
 
 class DataLoader:
-    def __init__(self, data_dir="data"):
+    """
+    Pembaca data CSV taman.
+
+    Hasil load_all() bisa disimpan sekali sebagai snapshot biner (.npz) di
+    folder .cache/: struktur yang langsung dipakai model (node, edge, record
+    zona/fasilitas, aturan aktivitas) disimpan apa adanya dalam metadata JSON,
+    sedangkan kolom numerik DataFrame disimpan sebagai satu blok array per
+    dtype. Snapshot divalidasi terhadap ukuran & mtime file sumber (dengan
+    fallback hash isi), sehingga load berikutnya tidak perlu mem-parse CSV,
+    merge zona, maupun konversi to_dict lagi.
+    """
+
+    def __init__(self, data_dir="data", verbose=True, cache_dir=None, use_snapshot=True):
         current_script_path = os.path.abspath(__file__)
         src_directory = os.path.dirname(current_script_path)
         project_root = os.path.dirname(src_directory)
         self.data_path = os.path.join(project_root, data_dir)
-        print(f"[DEBUG] DataLoader path: {self.data_path}")
+        self.verbose = verbose
+        if verbose:
+            print(f"[DEBUG] DataLoader path: {self.data_path}")
+
+        self.use_snapshot = use_snapshot
+        cache_dir = cache_dir if cache_dir is not None else os.path.join(project_root, ".cache")
+        path_key = hashlib.sha1(os.path.abspath(self.data_path).encode()).hexdigest()[:12]
+        self.snapshot_path = os.path.join(cache_dir, f"dataset_{path_key}.npz")
+        self.last_load_info = None  # {'source': 'snapshot'|'csv', 'seconds': ...}
 
     def _read_csv(self, filename):
         full_path = os.path.join(self.data_path, filename)
         if not os.path.exists(full_path):
              # Fallback logic untuk nama file yang mungkin beda
-             return pd.DataFrame() 
+             return pd.DataFrame()
         return pd.read_csv(full_path)
 
     def load_network_data(self):
         """Memuat Nodes dan Edges untuk navigasi fisik."""
         nodes_df = self._read_csv("path_nodes.csv")
         edges_df = self._read_csv("path_edges.csv")
-        
+
         nodes_dict = nodes_df.set_index('node_id')[['x_m', 'y_m']].to_dict('index')
-        
-        edges_list = []
-        for _, row in edges_df.iterrows():
-            attr = {'length': row['length_m'], 'edge_id': row['edge_id']}
-            edges_list.append((row['from_node'], row['to_node'], attr))
-            
+
+        edges_list = [(u, v, {'length': float(length), 'edge_id': e_id})
+                      for u, v, length, e_id in zip(edges_df['from_node'].tolist(), edges_df['to_node'].tolist(),
+                                                    edges_df['length_m'].tolist(), edges_df['edge_id'].tolist())]
+
         return nodes_dict, edges_list
 
-    def load_zones_combined(self):
-        """
-        Menggabungkan zone_config (spasial) dengan park_facilities (kapasitas/atribut).
-        Sesuai desain: Zona harus punya kapasitas, amenities_score, dll.
-        """
+    def _compile_zones(self):
+        """Merge zone_config + park_facilities (satu baris per zona)."""
         zone_config = self._read_csv("zone_config.csv")
         park_facilities = self._read_csv("park_facilities.csv")
-        
-        # 1. Agregasi data fasilitas per zona untuk mendapatkan total kapasitas & amenities score
-        # Kita asumsikan amenities_score dihitung dari rata-rata kualitas fasilitas atau random jika tidak ada
-        
+
         # Gabungkan data
         merged = pd.merge(zone_config, park_facilities, on=['zone_id', 'zone_type'], how='left')
-        
+
         # Isi nilai kosong
         merged['zone_max_capacity'] = merged['zone_max_capacity'].fillna(20) # Default kapasitas kecil
         merged['total_capacity'] = merged['total_capacity'].fillna(20)
-        
-        # Convert ke dictionary dengan zone_id sebagai key
-        zones_dict = {}
-        for _, row in merged.iterrows():
-            z_id = row['zone_id']
-            if z_id not in zones_dict:
-                zones_dict[z_id] = row.to_dict()
-                # Tambahkan field dinamis untuk simulasi
-                zones_dict[z_id]['current_agents'] = 0
-                zones_dict[z_id]['amenities_score'] = 0.8 # Placeholder score (0-1)
-                
-                # Tentukan Supported Activities berdasarkan Tipe Zona
-                # (Sesuai dokumen Activity Usage Profile)
-                z_type = row['zone_type']
-                supported = []
-                if z_type == 'track': supported = ['running', 'walking', 'cycling']
-                elif z_type == 'garden': supported = ['walking', 'relax', 'photo', 'eating', 'reading']
-                elif z_type == 'playground': supported = ['playing', 'photo', 'walking']
-                elif z_type == 'fitness_zone': supported = ['exercise', 'stretching']
-                elif z_type == 'picnic_area': supported = ['eating', 'relax', 'socializing']
-                elif z_type == 'gazebo': supported = ['relax', 'reading', 'socializing', 'eating']
-                elif z_type == 'bench_zone': supported = ['resting', 'reading', 'eating']
-                elif z_type == 'gate': supported = ['leaving'] # Khusus Gate
-                
-                zones_dict[z_id]['supported_activities'] = supported
-            
-        return list(zones_dict.values())
+
+        # Satu zona = baris pertama hasil merge
+        return merged.drop_duplicates('zone_id', keep='first').reset_index(drop=True)
+
+    def load_zones_combined(self):
+        """
+        Menggabungkan zone_config (spasial) dengan park_facilities (kapasitas/atribut).
+        Sesuai desain: Zona harus punya kapasitas, amenities_score, dll.
+        """
+        zones = self._compile_zones().to_dict('records')
+        for z in zones:
+            # Tambahkan field dinamis untuk simulasi
+            z['current_agents'] = 0
+            z['amenities_score'] = 0.8 # Placeholder score (0-1)
+            z['supported_activities'] = list(SUPPORTED_ACTIVITIES.get(z['zone_type'], []))
+        return zones
+
+    def load_general_facilities(self):
+        """Objek kecil (lampu, pohon, tong sampah) sebagai list of dict."""
+        df = self._read_csv("general_facilities.csv")
+        return df.to_dict('records')
 
     def load_profiles(self):
         return self._read_csv("survey_preferences_1000.csv")
@@ -85,6 +122,155 @@ class DataLoader:
         return df.set_index('activity_name').to_dict('index')
 
     def load_schedules(self):
-        arrival = self._read_csv("arrival_profile_weekend_counts.csv")
-        env = self._read_csv("env_schedule_weekend.csv")
-        return arrival, env
\ No newline at end of file
+        return self.load_schedule(DEFAULT_SCHEDULE)
+
+    def load_schedule(self, name):
+        """Jadwal satu jenis hari (misal 'weekday', 'weekend', 'holiday') -> (arrival, env)."""
+        arrival = self._read_csv(f"arrival_profile_{name}_counts.csv")
+        env = self._read_csv(f"env_schedule_{name}.csv")
+        if arrival.empty or env.empty:
+            raise FileNotFoundError(f"Jadwal '{name}' tidak ditemukan di {self.data_path}")
+        return arrival, env
+
+    def load_all(self):
+        """
+        Muat semua input sekaligus sebagai satu dict dataset.
+        Dipakai ulang oleh banyak ParkModel (ensemble) tanpa membaca CSV lagi.
+        Jika use_snapshot aktif, dataset diambil dari snapshot biner yang masih valid.
+        """
+        t0 = time.perf_counter()
+        source = "csv"
+        dataset = self._load_snapshot() if self.use_snapshot else None
+        if dataset is not None:
+            source = "snapshot"
+        else:
+            nodes_data, edges_data = self.load_network_data()
+            arrival, env = self.load_schedules()
+            dataset = {
+                'nodes_data': nodes_data,
+                'edges_data': edges_data,
+                'zones_list': self.load_zones_combined(),
+                'arrival_data': arrival,
+                'env_data': env,
+                'agent_profiles': self.load_profiles(),
+                'activity_rules': self.load_activity_profile(),
+                'facilities': self.load_general_facilities(),
+            }
+            if self.use_snapshot:
+                self._save_snapshot(dataset)
+        self.last_load_info = {'source': source, 'seconds': time.perf_counter() - t0}
+        if self.verbose:
+            print(f"[DEBUG] Dataset dimuat dari {source} ({self.last_load_info['seconds'] * 1000:.1f} ms)")
+        return dataset
+
+    # --- Snapshot Biner ---
+    def _source_stats(self):
+        stats = {}
+        for name in SOURCE_FILES:
+            path = os.path.join(self.data_path, name)
+            if os.path.exists(path):
+                st = os.stat(path)
+                stats[name] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        return stats
+
+    def _file_hash(self, name):
+        with open(os.path.join(self.data_path, name), 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def _snapshot_valid(self, meta):
+        if meta.get('version') != SNAPSHOT_VERSION:
+            return False
+        current = self._source_stats()
+        if set(current) != set(meta['sources']):
+            return False
+        for name, st in current.items():
+            old = meta['sources'][name]
+            if st['size'] == old['size'] and st['mtime_ns'] == old['mtime_ns']:
+                continue
+            # mtime berubah (misal git checkout) -> cek isi file
+            if st['size'] != old['size'] or self._file_hash(name) != old['sha1']:
+                return False
+        return True
+
+    def _load_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            with np.load(self.snapshot_path, allow_pickle=False) as data:
+                meta = json.loads(str(data['__meta__']))
+                if not self._snapshot_valid(meta):
+                    return None
+                dataset = meta['dataset']
+                # JSON tidak punya tuple: edge dikembalikan ke bentuk (u, v, attr)
+                dataset['edges_data'] = [tuple(e) for e in dataset['edges_data']]
+                for key in FRAME_KEYS:
+                    dataset[key] = _frame_from_arrays(data, key, meta['frames'][key])
+                return dataset
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            # Snapshot rusak/terpotong: hapus agar dibangun ulang dari CSV
+            try:
+                os.remove(self.snapshot_path)
+            except OSError:
+                pass
+            return None
+
+    def _save_snapshot(self, dataset):
+        sources = self._source_stats()
+        for name in sources:
+            sources[name]['sha1'] = self._file_hash(name)
+
+        arrays = {}
+        meta = {'version': SNAPSHOT_VERSION, 'sources': sources, 'frames': {},
+                'dataset': {k: v for k, v in dataset.items() if k not in FRAME_KEYS}}
+        for key in FRAME_KEYS:
+            meta['frames'][key] = _frame_to_arrays(dataset[key], key, arrays)
+        arrays['__meta__'] = np.array(json.dumps(meta, default=_json_scalar))
+
+        tmp_path = None
+        try:
+            directory = os.path.dirname(self.snapshot_path)
+            os.makedirs(directory, exist_ok=True)
+            # File sementara unik per penulis: worker paralel tidak menimpa file yang sama
+            with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp.npz", delete=False) as f:
+                tmp_path = f.name
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            # Snapshot bersifat opsional
+
+
+def _json_scalar(value):
+    """Skalar numpy yang lolos dari to_dict -> tipe Python biasa."""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Tipe {type(value).__name__} tidak bisa disimpan di snapshot")
+
+
+def _frame_to_arrays(df, key, arrays):
+    """
+    Kolom numerik/bool dikelompokkan per dtype menjadi satu array 2D (satu entri
+    npz per dtype, bukan per kolom); kolom teks disimpan sebagai list JSON.
+    """
+    info = {'columns': [str(c) for c in df.columns], 'blocks': {}, 'text': {}}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            info['blocks'].setdefault(series.dtype.str, []).append(str(col))
+        else:
+            info['text'][str(col)] = [None if pd.isna(v) else str(v) for v in series.tolist()]
+    for i, (dtype, cols) in enumerate(info['blocks'].items()):
+        arrays[f"{key}/{i}"] = np.column_stack([df[c].to_numpy() for c in cols]).astype(dtype)
+    return info
+
+
+def _frame_from_arrays(data, key, info):
+    columns = {}
+    for i, cols in enumerate(info['blocks'].values()):
+        block = data[f"{key}/{i}"]
+        for j, col in enumerate(cols):
+            columns[col] = block[:, j]
+    # List teks (None = kosong) diinferensi pandas ke dtype yang sama seperti read_csv
+    columns.update(info['text'])
+    return pd.DataFrame(columns, columns=info['columns'])
@@ -1,31 +1,88 @@
+import itertools
 import mesa
-from mesa.space import NetworkGrid
 from mesa.datacollection import DataCollector
 import networkx as nx
-import random
-import math
-from .loader import DataLoader
+from .loader import DataLoader, DEFAULT_SCHEDULE
 from .agent import ParkAgent
+from .space import SpatialIndex, OccupancyGrid
+from .routing import RoutingTable, NetworkXRouter, GateField, RouteStore
+from .engine import VectorPopulation, FINISHED, agent_seed_key
+from .occupancy import ZoneOccupancy
+from .zones import ZoneTable
+from .profiles import ProfilePool, period_of
+from .scheduler import EventScheduler
+from .profiling import StepProfiler
+from .timeline import Timeline, MINUTES_PER_SLOT
 
 class ParkModel(mesa.Model):
-    def __init__(self, data_dir="data"):
-        super().__init__()
+    def __init__(self, data_dir="data", routing="table", engine="object", debug_occupancy=False,
+                 stratify_profiles=False, age_group_weights=None, scheduler="step",
+                 seed=None, dataset=None, verbose=2, log_interval=1, arrival_multiplier=1.0,
+                 capacity_overrides=None, rain_schedule=None, crowd_tolerance_shift=0.0, profile=False,
+                 schedule=None, repeat_schedule=False, interpolate_schedule=False, fast_forward=False, agent_rng=False):
+        # seed -> model.random & model.rng (semua keacakan agen/model lewat sini, bukan modul global)
+        super().__init__(seed=seed)
+        # Counter unique_id ParkAgent milik model sendiri (bukan counter internal mesa),
+        # sehingga restore checkpoint bisa melanjutkan penomoran lewat atribut publik
+        self.agent_ids = itertools.count(1)
+        # Log: 0 = headless (tanpa print), 1 = status tiap `log_interval` step, 2 = + pesan [DEBUG]
+        self.verbose = int(verbose)
+        self.log_interval = max(1, int(log_interval))
+        # Parameter konstruksi (disimpan di checkpoint agar model bisa dibangun ulang)
+        self.config = {
+            'data_dir': data_dir, 'routing': routing, 'engine': engine, 'scheduler': scheduler,
+            'stratify_profiles': stratify_profiles, 'age_group_weights': age_group_weights,
+            'arrival_multiplier': arrival_multiplier, 'capacity_overrides': capacity_overrides,
+            'rain_schedule': rain_schedule, 'crowd_tolerance_shift': crowd_tolerance_shift,
+            'schedule': list(schedule) if schedule is not None else None,
+            'repeat_schedule': repeat_schedule, 'interpolate_schedule': interpolate_schedule,
+            'fast_forward': fast_forward, 'agent_rng': agent_rng,
+        }
         
-        # 1. Load Data
-        self.loader = DataLoader(data_dir)
-        self.nodes_data, self.edges_data = self.loader.load_network_data()
-        self.zones_list = self.loader.load_zones_combined()
-        self.arrival_data, self.env_data = self.loader.load_schedules()
-        self.agent_profiles = self.loader.load_profiles()
-        self.activity_rules = self.loader.load_activity_profile()
+        # 1. Load Data (atau pakai dataset yang sudah dimuat, misal di worker ensemble)
+        if dataset is None:
+            self.loader = DataLoader(data_dir, verbose=self.verbose >= 2)
+            dataset = self.loader.load_all()
+        else:
+            self.loader = None
+        self.nodes_data = dataset['nodes_data']
+        self.edges_data = dataset['edges_data']
+        self.zones_list = [dict(z) for z in dataset['zones_list']] # Zona punya state dinamis -> copy
+        self.arrival_data = dataset['arrival_data']
+        self.env_data = dataset['env_data']
+        self.agent_profiles = dataset['agent_profiles']
+        self.activity_rules = dataset['activity_rules']
+        self.facilities = dataset['facilities']
+
+        # Parameter skenario (sweep kapasitas / kedatangan / hujan)
+        self.apply_scenario(arrival_multiplier, capacity_overrides, rain_schedule)
+
+        # Profil dikonversi sekali ke array + record bersama (tanpa df.sample per agen)
+        self.profile_pool = ProfilePool(self.agent_profiles, age_group_weights, crowd_tolerance_shift)
+        self.stratify_profiles = stratify_profiles
         
         # 2. Setup Spasial (Graph)
         self.G = nx.Graph()
         for node_id, attr in self.nodes_data.items():
             self.G.add_node(node_id, pos=(attr['x_m'], attr['y_m']))
         self.G.add_edges_from(self.edges_data)
-        self.grid = NetworkGrid(self.G)
+        self.grid = OccupancyGrid(self.G) # NetworkGrid + counter okupansi node/edge
+        self.node_ids = list(self.G.nodes) # Urutan indeks node (sama dengan RoutingTable)
+        self.node_id_index = {n: i for i, n in enumerate(self.node_ids)}
+
+        # Tabel rute all-pairs (di-cache ke disk). 'networkx' = Dijkstra per agen (lama)
+        if routing == "networkx":
+            self.router = NetworkXRouter(self.G)
+        else:
+            self.router = RoutingTable(self.G, verbose=self.verbose >= 2)
+        self.routes = RouteStore(self.router) # Rute tuple bersama antar agen
         
+        # Indeks spasial (grid hash) untuk query node / zona / fasilitas terdekat
+        self.node_index = SpatialIndex.from_points(
+            (n, attr['x_m'], attr['y_m']) for n, attr in self.nodes_data.items())
+        self.facility_index = SpatialIndex.from_points(
+            (i, f['x_center_m'], f['y_center_m'], f['facility_type']) for i, f in enumerate(self.facilities))
+
         # 3. Mapping Zona ke Node
         # Kita butuh tahu setiap zona itu "pintu masuknya" di node mana
         self.zone_map = {} # Key: zone_id, Value: data lengkap + node terdekat
@@ -39,85 +96,415 @@ class ParkModel(mesa.Model):
             
             if zone['zone_type'] == 'gate':
                 self.gate_nodes.append(closest_node)
+
+        self.zone_index = SpatialIndex.from_points(
+            (z['zone_id'], z['x_center_m'], z['y_center_m'], z['zone_type']) for z in self.zones_list)
         
+        # Atribut zona dalam array + indeks aktivitas -> zona (untuk make_decision)
+        self.zone_table = ZoneTable(self.zone_map, getattr(self.router, 'index', None))
+
+        # Counter okupansi zona (inkremental) + riwayat & puncak
+        self.occupancy = ZoneOccupancy(self.zone_map, capacity=self.zone_table.capacity)
+        self.debug_occupancy = debug_occupancy
+        self.zone_table.verify_cache = debug_occupancy # Hit cache filter zona dibandingkan hitung ulang
+
+        # Medan jarak ke gate (dibangun ulang otomatis jika gate berubah atau invalidate_routing dipanggil)
+        self.closed_gates = set()
+        self._gate_field = None
+        self._gate_field_key = None
+        self.graph_version = 0 # Dinaikkan invalidate_routing() setiap kali edge/bobot diubah
+
         self.track_nodes = ["N116", "N117", "N118", "N119", "N120", "N121", "N122", "N123"]
 
         # 4. State Lingkungan Dinamis
-        self.current_time_idx = 0
-        self.current_env = self.env_data.iloc[0] # Baris data cuaca saat ini
-        self.current_arrival = self.arrival_data.iloc[0]
-        self.step_minute_counter = 0 # 1 Step = 1 Menit
+        # Jadwal dikompilasi ke array per menit (src/timeline.py). schedule = daftar jenis hari
+        # untuk run multi-hari (misal ['weekday'] * 5 + ['weekend'] * 2), dimuat malas per hari.
+        # Taman tutup setelah hari terakhir; repeat_schedule=True mengulang daftar hari terus-menerus.
+        self.timeline = Timeline(schedule or [DEFAULT_SCHEDULE], self._schedule_source,
+                                 interpolate=interpolate_schedule, repeat=repeat_schedule)
+        self.set_minute(0) # 1 Step = 1 Menit
         
+        # 5. Engine Populasi
+        # 'object' = ParkAgent per pengunjung (mesa), 'vector' = struct-of-arrays NumPy.
+        # agent_rng=True: keacakan agen vektor per (agen, step) -> identik dengan ShardedSimulation
+        self.engine = engine
+        self.population = None
+        if agent_rng and engine != "vector":
+            raise ValueError("agent_rng=True membutuhkan engine='vector'")
+        if engine == "vector":
+            if not isinstance(self.router, RoutingTable):
+                raise ValueError("engine='vector' membutuhkan routing='table'")
+            self.population = VectorPopulation(self, seed_key=agent_seed_key(seed) if agent_rng else None)
+
+        # 6. Scheduler: 'step' = semua agen di-step tiap menit (shuffle_do),
+        # 'event' = hanya agen yang jatuh tempo (agen diam ditidurkan sampai event berikutnya)
+        self.scheduler = EventScheduler() if scheduler == "event" and self.population is None else None
+
+        # advance() melompati step tanpa kejadian (lihat idle_steps)
+        self.fast_forward = fast_forward
+
+        # Perekam trajektori streaming (opsional, lihat TrajectoryRecorder.attach)
+        self.recorder = None
+        # Agregasi KPI streaming memori tetap (opsional, lihat KPIAggregator.attach)
+        self.kpi = None
+        # Instrumentasi per fase step & counter jalur kode agen (opsional)
+        self.profiler = StepProfiler().attach(self) if profile else None
+
         self.datacollector = DataCollector(
             model_reporters={
-                "Populasi": lambda m: len(m.agents),
-                "Hujan": lambda m: 1 if m.current_env['rain_flag'] else 0,
-                "Suhu": lambda m: m.current_env['temperature_index']
+                "Populasi": lambda m: m.population_size(),
+                "Hujan": lambda m: 1 if m.is_raining else 0,
+                "Suhu": lambda m: m.temperature
             }
         )
 
+    def apply_scenario(self, arrival_multiplier=1.0, capacity_overrides=None, rain_schedule=None):
+        """
+        Ubah input sesuai skenario tanpa menyentuh dataset asli (yang mungkin dipakai bersama).
+        - arrival_multiplier: pengali avg_arrivals
+        - capacity_overrides: {zone_id: kapasitas maksimum baru}
+        - rain_schedule: list rain_flag per slot 10 menit (dipotong/diulang sepanjang jadwal)
+        """
+        self._arrival_multiplier = arrival_multiplier
+        self._rain_schedule = rain_schedule
+        self.arrival_data, self.env_data = self._scenario_schedule(self.arrival_data, self.env_data)
+        for zone in self.zones_list:
+            if capacity_overrides and zone['zone_id'] in capacity_overrides:
+                zone['zone_max_capacity'] = float(capacity_overrides[zone['zone_id']])
+
+    def _scenario_schedule(self, arrival, env):
+        """Terapkan arrival_multiplier & rain_schedule ke jadwal satu hari (salinan, bukan in-place)."""
+        if self._arrival_multiplier != 1.0:
+            arrival = arrival.copy()
+            arrival['avg_arrivals'] = arrival['avg_arrivals'] * self._arrival_multiplier
+        if self._rain_schedule is not None:
+            env = env.copy()
+            flags = [bool(self._rain_schedule[i % len(self._rain_schedule)]) for i in range(len(env))]
+            env['rain_flag'] = flags
+        return arrival, env
+
+    def _schedule_source(self, name):
+        """Sumber jadwal Timeline: jadwal bawaan dari dataset, jenis hari lain dari CSV data_dir."""
+        if name == DEFAULT_SCHEDULE:
+            return self.env_data, self.arrival_data
+        if self.loader is None:
+            self.loader = DataLoader(self.config['data_dir'], verbose=False, use_snapshot=False)
+        arrival, env = self._scenario_schedule(*self.loader.load_schedule(name))
+        return env, arrival
+
+    # --- Waktu & Lingkungan ---
+    def set_minute(self, minute):
+        """
+        Pasang kondisi lingkungan menit ke-`minute` sejak awal run sebagai skalar biasa
+        (is_raining, temperature, light, arrival_rate, dominant_activity, time_slot).
+        current_env / current_arrival tetap tersedia sebagai dict untuk pembaca lama.
+        Jika timeline habis (tanpa repeat_schedule), taman tutup: tanpa kedatangan & running=False
+        (step() sendiri tidak menjalankan menit di luar timeline, lihat close_park).
+        """
+        found = self.timeline.seek(minute)
+        if found is None:
+            self.arrival_rate = 0.0
+            self.running = False
+            return
+        self.current_day, day, m = found
+        self.current_time_idx = int(day.slot[m])
+        self.is_raining = bool(day.rain[m])
+        self.temperature = float(day.temperature[m])
+        self.light = float(day.light[m])
+        self.arrival_rate = day.arrival_rate[m]
+        self.dominant_activity = self.timeline.activity_names[day.activity[m]]
+        self.time_slot = day.time_slots[self.current_time_idx]
+        self.current_env = {'time_slot': self.time_slot, 'temperature_index': self.temperature,
+                            'light_index': self.light, 'rain_flag': self.is_raining}
+        self.current_arrival = {'time_slot': self.time_slot, 'dominant_activity': self.dominant_activity,
+                                'avg_arrivals': day.avg_arrivals[self.current_time_idx]}
+
     def get_closest_node(self, x, y):
-        closest = None; min_d = float('inf')
-        for n in self.G.nodes(data=True):
-            pos = n[1]['pos']
-            d = math.sqrt((pos[0]-x)**2 + (pos[1]-y)**2)
-            if d < min_d: min_d = d; closest = n[0]
-        return closest
+        return self.node_index.nearest_key(x, y)
+
+    # --- Query Spasial ---
+    def node_xy(self, node):
+        return self.G.nodes[node]['pos']
+
+    def nearest_facility(self, node, facility_type=None, k=1):
+        """k fasilitas umum terdekat dari sebuah node -> list (dict fasilitas, jarak)."""
+        x, y = self.node_xy(node)
+        return [(self.facilities[i], d) for i, d in self.facility_index.nearest(x, y, k, facility_type)]
+
+    def nearest_zone(self, node, zone_type=None, k=1):
+        """k zona terdekat (misal zone_type='public_toilet') -> list (dict zona, jarak)."""
+        x, y = self.node_xy(node)
+        return [(self.zone_map[z], d) for z, d in self.zone_index.nearest(x, y, k, zone_type)]
+
+    def agents_near(self, node, radius):
+        """Agen yang berada di node-node dalam radius (meter) dari sebuah node."""
+        x, y = self.node_xy(node)
+        result = []
+        for n, _ in self.node_index.within_radius(x, y, radius):
+            result.extend(self.G.nodes[n]['agent'])
+        return result
+
+    # --- Gate & Medan Jarak Pulang ---
+    @property
+    def gate_field(self):
+        """GateField aktif. Dibangun ulang jika daftar gate, penutupan gate, atau graph_version berubah."""
+        key = (tuple(self.gate_nodes), frozenset(self.closed_gates), self.graph_version)
+        if self._gate_field is None or key != self._gate_field_key:
+            self._gate_field = GateField(self.G, self.gate_nodes, self.closed_gates)
+            self._gate_field_key = key
+        return self._gate_field
+
+    def invalidate_routing(self):
+        """Panggil setelah mengubah edge/bobot agar tabel rute dan GateField dihitung ulang."""
+        self.graph_version += 1
+        self._gate_field = None
+        if isinstance(self.router, RoutingTable):
+            self.router = RoutingTable(self.G, verbose=self.verbose >= 2)
+        self.routes = RouteStore(self.router)
+
+    def close_gate(self, node):
+        """Tutup gate (skenario): tidak dipakai untuk masuk maupun keluar."""
+        self.closed_gates.add(node)
+
+    def open_gate(self, node):
+        self.closed_gates.discard(node)
+
+    def open_gate_nodes(self):
+        return [g for g in self.gate_nodes if g not in self.closed_gates]
 
     def update_environment(self):
         """Update waktu, cuaca, dan hitung keramaian zona."""
-        # Update Jadwal per 10 menit
-        if self.step_minute_counter >= 10:
-            self.step_minute_counter = 0
-            self.current_time_idx = (self.current_time_idx + 1) % len(self.env_data)
-            self.current_env = self.env_data.iloc[self.current_time_idx]
-            self.current_arrival = self.arrival_data.iloc[self.current_time_idx]
-        
-        self.step_minute_counter += 1
-        
-        # Reset hitungan agen di zona (untuk perhitungan kepadatan real-time)
-        for z_id in self.zone_map:
-            self.zone_map[z_id]['current_agents'] = 0
-            
-        # Hitung agen ada di zona mana saja
-        # (Sederhana: Kita cek agen sedang menuju atau berada di zona mana)
-        for agent in self.agents:
-            if agent.target_zone_id and agent.state in ['WALKING', 'ACTIVITY']:
-                if agent.target_zone_id in self.zone_map:
-                    self.zone_map[agent.target_zone_id]['current_agents'] += 1
+        # Step ke-n (mesa menaikkan steps sebelum step) = menit ke-(n - 1) timeline
+        was_raining = self.is_raining
+        self.set_minute(self.steps - 1)
+
+        # Event global: hujan mulai/reda -> bangunkan semua agen yang tidur (taman tutup: close_park)
+        if self.scheduler is not None and self.is_raining != was_raining:
+            self.scheduler.wake_all(self.steps)
+
+        self.occupancy.current_step = self.steps
+        self.grid.current_step = self.steps
+
+        # Keramaian zona tidak lagi dihitung ulang di sini: engine objek memperbarui
+        # counter secara inkremental (lihat ParkAgent.state / target_zone_id),
+        # engine vektor menyetor hasil bincount di akhir step.
+
+    def schedule_ended(self):
+        """True jika menit berikutnya sudah di luar timeline (taman tutup, lihat close_park)."""
+        return self.timeline.seek(self.steps) is None
+
+    def close_park(self):
+        """
+        Timeline habis: taman tutup tanpa menjalankan step lagi (running=False, tanpa
+        kedatangan). Event global: agen yang tidur dibangunkan agar durasinya mutakhir.
+        """
+        self.arrival_rate = 0.0
+        self.running = False
+        if self.scheduler is not None:
+            self.scheduler.wake_all(self.steps)
 
     def spawn_agents(self):
         """Spawn agen berdasarkan arrival profile."""
-        if self.current_env['rain_flag']: return # Gak ada yang datang pas hujan
+        if self.is_raining: return # Gak ada yang datang pas hujan
         
         # Hitung jumlah spawn
-        rate = self.current_arrival['avg_arrivals'] / 10.0
-        num = int(rate)
-        if random.random() < (rate - num): num += 1
-        
-        for _ in range(num):
-            profile = self.agent_profiles.sample(1).iloc[0].to_dict()
-            start_node = random.choice(self.gate_nodes)
-            # Tentukan aktivitas awal dominan dari jadwal
-            dominant_act = self.current_arrival['dominant_activity']
-            
-            a = ParkAgent(f"A_{self.steps}_{random.randint(1000,9999)}", self, start_node, profile, dominant_act)
+        gates = self.open_gate_nodes()
+        if not gates: return # Semua gate ditutup
+
+        # Semua kedatangan menit ini diambil sekaligus: Poisson(avg_arrivals / 10 menit)
+        num = int(self.rng.poisson(self.arrival_rate))
+        if num == 0: return
+
+        period = period_of(self.time_slot) if self.stratify_profiles else None
+        profile_idx = self.profile_pool.sample(num, self.rng, period)
+        start_nodes = [gates[i] for i in self.rng.integers(0, len(gates), size=num)]
+        # Tentukan aktivitas awal dominan dari jadwal
+        dominant_act = self.dominant_activity
+
+        if self.profiler is not None: self.profiler.counts['agents_spawned'] += num
+        if self.kpi is not None: self.kpi.entries([self.node_id_index[g] for g in start_nodes])
+
+        if self.population is not None:
+            self.population.spawn(start_nodes, profile_idx, dominant_act)
+            return
+
+        for p_idx, start_node in zip(profile_idx.tolist(), start_nodes):
+            a = ParkAgent(self, start_node, p_idx, dominant_act)
             self.grid.place_agent(a, start_node)
-            self.agents.add(a)
+            if self.scheduler is not None:
+                self.scheduler.add(a)
+
+    def population_size(self):
+        if self.population is not None:
+            return len(self.population)
+        return len(self.agents)
 
     def step(self):
+        if self.timeline.seek(self.steps - 1) is None:
+            # Menit setelah akhir jadwal: tidak ada agen yang bergerak, step tidak dihitung/di-log
+            self.steps -= 1
+            self.close_park()
+            return
+        prof = self.profiler
+        if prof is not None: prof.start_step(self.steps)
+
         self.update_environment()
+        if prof is not None: prof.lap("environment")
         self.spawn_agents()
-        self.agents.shuffle_do("step")
-        
-        # Bersihkan agen selesai
-        to_remove = [a for a in self.agents if a.state == 'FINISHED']
-        for a in to_remove:
-            self.grid.remove_agent(a)
-            self.agents.remove(a)
-            
+        if prof is not None: prof.lap("spawn")
+
+        if self.population is not None:
+            pop = self.population
+            prev_nodes = pop.node[:pop.size].copy()
+            pop.step(self.is_raining, self.temperature, self.occupancy.counts)
+            self.grid.sync_population(prev_nodes, pop.node[:pop.size], pop.state[:pop.size] != FINISHED)
+            if prof is not None: prof.lap("agents")
+            removed = self.population.compact()
+        elif self.scheduler is not None:
+            # Hanya agen aktif + yang jatuh tempo bangun di step ini (urutan acak seperti shuffle_do)
+            self.scheduler.due(self.steps)
+            batch = self.scheduler.active_agents()
+            self.random.shuffle(batch)
+            for a in batch:
+                a.step()
+            if prof is not None:
+                prof.lap("agents")
+                prof.counts['agents_stepped'] += len(batch)
+
+            to_remove = [a for a in batch if a.state == 'FINISHED']
+            for a in to_remove:
+                self.grid.remove_agent(a)
+                a.remove()
+            removed = len(to_remove)
+        else:
+            self.agents.shuffle_do("step")
+            if prof is not None:
+                prof.lap("agents")
+                prof.counts['agents_stepped'] += len(self.agents)
+
+            # Bersihkan agen selesai
+            to_remove = [a for a in self.agents if a.state == 'FINISHED']
+            for a in to_remove:
+                self.grid.remove_agent(a)
+                a.remove()
+            removed = len(to_remove)
+        if prof is not None:
+            prof.lap("cleanup")
+            prof.counts['agents_removed'] += removed
+
+        if self.population is not None:
+            self.occupancy.set_counts(self.population.zone_counts())
+        elif self.debug_occupancy:
+            self.occupancy.check(self.agents) # Validasi inkremental vs recount penuh
+        self.occupancy.record(self.steps)
+        if self.kpi is not None:
+            self.kpi.record_step(self)
+        if prof is not None: prof.lap("occupancy")
+
         self.datacollector.collect(self)
+        if prof is not None: prof.lap("collect")
+        if self.recorder is not None:
+            self.recorder.record_step(self) # Rekam trajektori (streaming ke disk)
+        if prof is not None: prof.lap("record")
         
-        t = self.current_env['time_slot']
-        rain = "HUJAN 🌧️" if self.current_env['rain_flag'] else "CERAH ☀️"
-        print(f"Step {self.steps} | {t} | {rain} | Pop: {len(self.agents)}")
\ No newline at end of file
+        if self.verbose and self.steps % self.log_interval == 0:
+            self.log_status()
+        if prof is not None:
+            prof.lap("log")
+            prof.end_step()
+
+    # --- Fast-forward ---
+    def idle_steps(self, limit):
+        """
+        Berapa step berikutnya (maks `limit`) yang dijamin tanpa kejadian: tidak ada
+        kedatangan, tidak ada agen yang bergerak/memutuskan, cuaca tetap, taman belum
+        tutup, dan tidak melewati pergantian slot jadwal. Step seperti ini tidak memakai RNG sehingga
+        bisa dilompati dengan skip() tanpa mengubah hasil.
+        Engine objek mode 'step' hanya idle saat taman kosong (shuffle_do memakai RNG).
+        """
+        minute = self.steps # Menit timeline untuk step berikutnya
+        k = min(limit, MINUTES_PER_SLOT - minute % MINUTES_PER_SLOT)
+        if k <= 0:
+            return 0
+        found = self.timeline.seek(minute)
+        if found is None:
+            return 0 # Taman tutup -> event global
+        _, day, m = found
+        rain = bool(day.rain[m])
+        if rain != self.is_raining:
+            return 0 # Hujan mulai/reda -> event global
+        if not rain and self.open_gate_nodes():
+            for i in range(k):
+                if day.arrival_rate[m + i] > 0:
+                    k = i
+                    break
+        if k == 0:
+            return 0
+
+        if self.population is not None:
+            bound = self.population.idle_steps(rain)
+        elif self.scheduler is not None:
+            nxt = self.scheduler.next_wake_step()
+            bound = 0 if self.scheduler.active else (None if nxt is None else max(0, nxt - minute - 1))
+        else:
+            bound = 0 if len(self.agents) else None
+        return k if bound is None else min(k, bound)
+
+    def skip(self, k):
+        """
+        Lompati k step idle (lihat idle_steps). Pembukuan tetap diisi per menit
+        (jadwal, riwayat okupansi, DataCollector, rekaman, log) sehingga output sama
+        dengan step biasa; populasi vektor mengurangi durasi aktivitas sekaligus.
+        """
+        if self.population is not None:
+            self.population.skip(k)
+        for _ in range(k):
+            self.steps += 1
+            self.update_environment()
+            self.occupancy.record(self.steps)
+            if self.kpi is not None:
+                self.kpi.record_step(self)
+            self.datacollector.collect(self)
+            if self.recorder is not None:
+                self.recorder.record_step(self)
+            if self.verbose and self.steps % self.log_interval == 0:
+                self.log_status()
+        if self.profiler is not None:
+            self.profiler.counts['steps_skipped'] += k
+
+    def advance(self, n):
+        """
+        Majukan model n step (berhenti lebih awal jika running=False atau jadwal habis).
+        Dengan fast_forward, rentang idle dilompati lewat skip(). Return jumlah step penuh.
+        """
+        done = full = 0
+        while done < n and self.running:
+            if self.schedule_ended():
+                self.close_park()
+                break
+            k = self.idle_steps(n - done) if self.fast_forward else 0
+            if k:
+                self.skip(k)
+                done += k
+            else:
+                self.step()
+                done += 1
+                full += 1
+        return full
+
+    # --- Checkpoint ---
+    def save_checkpoint(self, path):
+        """Simpan seluruh state dinamis model ke file .npz (lihat src/checkpoint.py)."""
+        from .checkpoint import save_checkpoint
+        return save_checkpoint(self, path)
+
+    @classmethod
+    def from_checkpoint(cls, path, dataset=None, verbose=0, **overrides):
+        """Bangun model dari checkpoint; overrides (rain_schedule, capacity_overrides, ...) = skenario what-if."""
+        from .checkpoint import load_checkpoint
+        return load_checkpoint(path, dataset=dataset, verbose=verbose, **overrides)
+
+    def log_status(self):
+        t = self.time_slot
+        rain = "HUJAN 🌧️" if self.is_raining else "CERAH ☀️"
+        print(f"Step {self.steps} | {t} | {rain} | Pop: {self.population_size()}")
\ No newline at end of file
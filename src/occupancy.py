@@ -0,0 +1,127 @@
+import math
+import numpy as np
+
+
+class ZoneOccupancy:
+    """
+    Penghitung okupansi zona yang diperbarui secara inkremental.
+
+    Counter sebuah zona hanya disentuh saat agen masuk/keluar zona itu
+    (target_zone_id atau state berubah), bukan dihitung ulang tiap menit.
+    Sekaligus menyimpan puncak okupansi (nilai + step) per zona dan
+    riwayat okupansi per step untuk laporan keramaian.
+
+    Jika `capacity` diberikan, counter juga melacak "band" keramaian per zona
+    (rasio okupansi dibagi `levels` tingkat). `band_version` hanya naik saat
+    sebuah zona pindah band, sehingga cache keputusan agen tetap valid
+    selama perubahan okupansi tidak mengubah hasil filter crowd.
+    """
+
+    def __init__(self, zone_map, capacity=None, levels=5):
+        self.zone_map = zone_map
+        self.zone_ids = list(zone_map.keys())
+        self.index = {z: i for i, z in enumerate(self.zone_ids)}
+        n = len(self.zone_ids)
+        self.counts = np.zeros(n, dtype=np.int64)
+        self.peak = np.zeros(n, dtype=np.int64)
+        self.peak_step = np.full(n, -1, dtype=np.int64)
+        self.version = 0 # Naik setiap ada perubahan counter
+        self.capacity = None if capacity is None else np.asarray(capacity, dtype=float)
+        self.levels = levels
+        self.band = np.zeros(n, dtype=np.int64)
+        self.band_version = 0 # Naik hanya saat band keramaian sebuah zona berubah
+        self.current_step = 0
+
+        self._history = np.zeros((0, n), dtype=np.int32)
+        self._history_steps = []
+        self._history_len = 0
+
+    def _band_of(self, i, count):
+        if count <= 0:
+            return 0
+        # Jumlah ambang k/levels (k = 0..levels-1) yang terlampaui rasio count/capacity
+        return min(self.levels, math.ceil(self.levels * count / self.capacity[i]))
+
+    def _update_band(self, i):
+        if self.capacity is None:
+            return
+        b = self._band_of(i, self.counts[i])
+        if b != self.band[i]:
+            self.band[i] = b
+            self.band_version += 1
+
+    # --- Update Inkremental ---
+    def move(self, old_zone, new_zone):
+        """Pindahkan satu agen dari old_zone ke new_zone (None = tidak di zona mana pun)."""
+        if old_zone == new_zone:
+            return
+        if old_zone is not None:
+            i = self.index[old_zone]
+            self.counts[i] -= 1
+            self.zone_map[old_zone]['current_agents'] = int(self.counts[i])
+            self._update_band(i)
+        if new_zone is not None:
+            i = self.index[new_zone]
+            c = self.counts[i] + 1
+            self.counts[i] = c
+            self.zone_map[new_zone]['current_agents'] = int(c)
+            if c > self.peak[i]:
+                self.peak[i] = c
+                self.peak_step[i] = self.current_step
+            self._update_band(i)
+        self.version += 1
+
+    def set_counts(self, counts):
+        """Ganti seluruh counter sekaligus (dipakai engine vektor yang menghitung via bincount)."""
+        counts = np.asarray(counts, dtype=np.int64)
+        if np.array_equal(counts, self.counts):
+            return
+        self.counts[:] = counts
+        for z_id, c in zip(self.zone_ids, counts):
+            self.zone_map[z_id]['current_agents'] = int(c)
+        higher = counts > self.peak
+        self.peak[higher] = counts[higher]
+        self.peak_step[higher] = self.current_step
+        if self.capacity is not None:
+            band = np.where(counts > 0, np.minimum(self.levels, np.ceil(self.levels * counts / self.capacity)), 0)
+            if not np.array_equal(band, self.band):
+                self.band[:] = band
+                self.band_version += 1
+        self.version += 1
+
+    # --- Validasi ---
+    def recount(self, agents):
+        """Hitung ulang penuh dari daftar agen (cara lama, O(agen))."""
+        counts = np.zeros(len(self.zone_ids), dtype=np.int64)
+        for agent in agents:
+            if agent.target_zone_id and agent.state in ['WALKING', 'ACTIVITY']:
+                if agent.target_zone_id in self.index:
+                    counts[self.index[agent.target_zone_id]] += 1
+        return counts
+
+    def check(self, agents):
+        """Mode debug: bandingkan counter inkremental dengan hitung ulang penuh."""
+        expected = self.recount(agents)
+        if not np.array_equal(expected, self.counts):
+            diff = {self.zone_ids[i]: (int(self.counts[i]), int(expected[i]))
+                    for i in np.flatnonzero(expected != self.counts)}
+            raise AssertionError(f"Okupansi zona tidak sinkron (inkremental, recount): {diff}")
+
+    # --- Riwayat & Laporan ---
+    def record(self, step):
+        """Simpan snapshot counter untuk step ini (O(zona), tanpa scan agen)."""
+        if self._history_len == len(self._history):
+            grown = np.zeros((max(64, 2 * len(self._history)), len(self.zone_ids)), dtype=np.int32)
+            grown[:self._history_len] = self._history[:self._history_len]
+            self._history = grown
+        self._history[self._history_len] = self.counts
+        self._history_steps.append(step)
+        self._history_len += 1
+
+    def history(self):
+        """(steps, array [step x zona]) riwayat okupansi."""
+        return list(self._history_steps), self._history[:self._history_len]
+
+    def peaks(self):
+        """Dict zone_id -> (puncak okupansi, step saat puncak)."""
+        return {z: (int(self.peak[i]), int(self.peak_step[i])) for i, z in enumerate(self.zone_ids)}
@@ -0,0 +1,70 @@
+from types import MappingProxyType
+import numpy as np
+
+PERIODS = ['morning', 'noon', 'evening']
+
+
+def period_of(time_slot):
+    """'HH:MM-HH:MM' -> 'morning' (< 10:00), 'noon' (10:00-15:00), atau 'evening'."""
+    hour = int(str(time_slot)[:2])
+    if hour < 10:
+        return 'morning'
+    if hour < 15:
+        return 'noon'
+    return 'evening'
+
+
+class ProfilePool:
+    """
+    Tabel profil pengunjung (survey_preferences) yang sudah dikonversi sekali.
+
+    Setiap kolom disimpan sebagai array bertipe, plus satu record read-only
+    per responden yang dipakai bersama oleh semua agen (tidak di-copy).
+    Nilai crowd_dislike / heat_dislike sudah dinormalisasi ke skala 0-1.
+    Sampling dilakukan per batch (satu panggilan RNG untuk semua kedatangan),
+    opsional distratifikasi menurut pref_visit_* sesuai waktu kunjungan.
+    """
+
+    def __init__(self, profiles_df, age_group_weights=None, crowd_tolerance_shift=0.0):
+        self.size = len(profiles_df)
+        self.columns = {c: profiles_df[c].to_numpy() for c in profiles_df.columns}
+        self.records = [MappingProxyType(r) for r in profiles_df.to_dict('records')]
+
+        # crowd_tolerance_shift > 0 = pengunjung lebih toleran terhadap keramaian
+        self.crowd_dislike = np.clip(self._norm('crowd_dislike') - crowd_tolerance_shift, 0.0, 1.0)
+        self.heat_dislike = self._norm('heat_dislike')
+        # Salinan list float untuk lookup skalar per agen (ParkAgent.crowd_dislike/heat_dislike)
+        self.crowd_values = self.crowd_dislike.tolist()
+        self.heat_values = self.heat_dislike.tolist()
+
+        # Bobot sampling per periode waktu (kumulatif, untuk searchsorted)
+        self._cum_weights = {}
+        for period in PERIODS:
+            col = f'pref_visit_{period}'
+            w = self.columns[col].astype(float) if col in self.columns else np.ones(self.size)
+            # age_group_weights: {periode: {age_group: pengali}}, misal lansia lebih banyak pagi
+            mult = (age_group_weights or {}).get(period)
+            if mult and 'age_group' in self.columns:
+                w = w * np.array([float(mult.get(a, 1.0)) for a in self.columns['age_group']])
+            w = np.clip(w, 0, None)
+            total = w.sum()
+            self._cum_weights[period] = np.cumsum(w / total) if total > 0 else None
+
+    def _norm(self, col, default=3):
+        if col not in self.columns:
+            return np.full(self.size, default / 5.0)
+        return self.columns[col].astype(float) / 5.0 # Skala 0-1
+
+    def __len__(self):
+        return self.size
+
+    def sample(self, n, rng, period=None):
+        """
+        Ambil n indeks profil sekaligus. Jika `period` diberikan ('morning'/'noon'/'evening'),
+        peluang tiap responden sebanding dengan skor pref_visit_<period>.
+        """
+        cum = self._cum_weights.get(period) if period else None
+        if cum is None:
+            return rng.integers(0, self.size, size=n)
+        idx = np.searchsorted(cum, rng.random(n), side='right')
+        return np.minimum(idx, self.size - 1)
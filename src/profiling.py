@@ -0,0 +1,118 @@
+import gc
+import sys
+import time
+from collections import defaultdict
+import pandas as pd
+
+# Urutan fase di ParkModel.step
+PHASES = ["environment", "spawn", "agents", "cleanup", "occupancy", "collect", "record", "log"]
+
+
+def _gc_collections():
+    return sum(s['collections'] for s in gc.get_stats())
+
+
+class StepProfiler:
+    """
+    Instrumentasi opsional ParkModel.step.
+
+    - Timer per fase step (perf_counter, satu lap per fase).
+    - Counter jalur kode agen (keputusan per state, query rute, ukuran kandidat,
+      eliminasi crowd/heat, fallback) lewat `counts[nama] += n`.
+    - Tekanan alokasi per step: selisih blok memori teralokasi (alloc_blocks)
+      dan jumlah koleksi GC yang terpicu (gc_collections).
+    Satu baris per step disimpan untuk table(); summary()/report() meringkas run.
+
+    Tidak aktif = model.profiler None: setiap titik instrumentasi hanya satu cek
+    `is not None`, tanpa pemanggilan fungsi.
+    """
+
+    def __init__(self):
+        self.counts = defaultdict(int) # Counter step berjalan (ditulis langsung oleh agen/engine)
+        self.rows = []
+        self._times = dict.fromkeys(PHASES, 0.0)
+        self._step = None
+        self._t = 0.0
+        self._t_start = 0.0
+        self._model = None
+        self._cache = (0, 0)
+        self._blocks = 0
+        self._gc = 0
+
+    def attach(self, model):
+        self._model = model
+        model.profiler = self
+        return self
+
+    def detach(self):
+        if self._model is not None and self._model.profiler is self:
+            self._model.profiler = None
+        self._model = None
+
+    # --- Timer Fase ---
+    def start_step(self, step):
+        self._step = step
+        self._blocks = sys.getallocatedblocks()
+        self._gc = _gc_collections()
+        self._t = self._t_start = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self._times[phase] += now - self._t
+        self._t = now
+
+    def end_step(self):
+        row = {'step': self._step, 'total_sec': time.perf_counter() - self._t_start,
+               'alloc_blocks': sys.getallocatedblocks() - self._blocks,
+               'gc_collections': _gc_collections() - self._gc}
+        for phase in PHASES:
+            row[f'{phase}_sec'] = self._times[phase]
+            self._times[phase] = 0.0
+        # Hit/miss cache filter zona (selisih dari counter kumulatif ZoneTable)
+        zones = getattr(self._model, 'zone_table', None)
+        if zones is not None:
+            hits, misses = zones.cache_hits, zones.cache_misses
+            row['filter_cache_hits'] = hits - self._cache[0]
+            row['filter_cache_misses'] = misses - self._cache[1]
+            self._cache = (hits, misses)
+        if self._model is not None:
+            row['population'] = self._model.population_size()
+        row.update(self.counts)
+        self.counts.clear()
+        self.rows.append(row)
+
+    # --- Ekspor ---
+    def table(self):
+        """DataFrame satu baris per step (fase *_sec + counter)."""
+        return pd.DataFrame(self.rows).fillna(0)
+
+    def save(self, path):
+        self.table().to_csv(path, index=False)
+
+    def summary(self):
+        """Total & rata-rata per step untuk setiap kolom, plus porsi waktu tiap fase."""
+        df = self.table()
+        if df.empty:
+            return {}
+        total_time = df['total_sec'].sum()
+        result = {'steps': len(df), 'total_sec': total_time, 'phases': {}, 'counters': {}}
+        for phase in PHASES:
+            t = df[f'{phase}_sec'].sum()
+            result['phases'][phase] = {'total_sec': t, 'share': t / total_time if total_time else 0.0}
+        for col in df.columns:
+            if col == 'step' or col.endswith('_sec') or col == 'population':
+                continue
+            result['counters'][col] = {'total': int(df[col].sum()), 'per_step': float(df[col].mean())}
+        return result
+
+    def report(self):
+        s = self.summary()
+        if not s:
+            print("[PROFILE] Belum ada step yang direkam")
+            return
+        print(f"\n[PROFILE] {s['steps']} step, {s['total_sec']:.3f} detik "
+              f"({s['total_sec'] / s['steps'] * 1000:.2f} ms/step)")
+        for phase, v in sorted(s['phases'].items(), key=lambda kv: -kv[1]['total_sec']):
+            print(f"   {phase:12s} {v['total_sec']:8.3f}s  {v['share'] * 100:5.1f}%")
+        for name, v in sorted(s['counters'].items()):
+            print(f"   {name:28s} total {v['total']:10d}  per step {v['per_step']:10.1f}")
@@ -0,0 +1,282 @@
+import json
+import os
+import queue
+import threading
+import numpy as np
+from .engine import STATE_NAMES
+
+# Satu baris = satu agen pada satu step
+TRAJECTORY_DTYPE = np.dtype([
+    ('step', np.int32), ('agent_id', np.int64), ('node', np.int32),
+    ('state', np.int8), ('activity', np.int16), ('target_zone', np.int32),
+])
+# Satu baris = posisi baris trajektori satu step (rows = 0 untuk step tanpa agen)
+STEP_INDEX_DTYPE = np.dtype([('step', np.int32), ('offset', np.int64), ('rows', np.int32)])
+# Satu baris = metrik model pada satu step
+METRICS_DTYPE = np.dtype([
+    ('step', np.int32), ('population', np.int32), ('rain', np.int8), ('temperature', np.float32),
+])
+
+
+class _ChunkStream:
+    """Buffer berukuran tetap; saat penuh, isinya dikirim ke writer lalu buffer dipakai lagi."""
+
+    def __init__(self, recorder, name, dtype, buffer_rows):
+        self.recorder = recorder
+        self.name = name
+        self.buffer = np.empty(buffer_rows, dtype=dtype)
+        self.fill = 0
+        self.chunk_no = 0
+
+    def append(self, rows):
+        start = 0
+        while start < len(rows):
+            take = min(len(rows) - start, len(self.buffer) - self.fill)
+            self.buffer[self.fill:self.fill + take] = rows[start:start + take]
+            self.fill += take
+            start += take
+            if self.fill == len(self.buffer):
+                self.flush()
+
+    def flush(self):
+        if self.fill == 0:
+            return
+        chunk = self.buffer[:self.fill].copy()
+        self.fill = 0
+        self.recorder._submit(self.name, self.chunk_no, chunk)
+        self.chunk_no += 1
+
+
+class TrajectoryRecorder:
+    """
+    Perekam streaming posisi & state agen + metrik model dengan memori terbatas.
+
+    Setiap step, baris (agent_id, node, state, activity, target_zone) ditulis ke
+    buffer berukuran tetap, ditambah satu entri index per step (offset & jumlah
+    baris, termasuk 0) agar step tanpa agen tetap muncul saat replay. Buffer yang penuh ditulis ke disk sebagai chunk
+    kolumnar (.npy, bisa di-memory-map; atau .npz terkompresi) oleh thread
+    background. Antrian writer dibatasi, sehingga memori tidak tumbuh sepanjang run.
+    Sisa buffer & index.json baru ditulis saat close(); pakai sebagai context manager
+    (`with TrajectoryRecorder(dir).attach(model): ...`) agar selalu ditutup.
+    Baca hasilnya dengan RecordingReader.
+    """
+
+    def __init__(self, out_dir, buffer_rows=65536, compress=False, background=True, max_pending=2):
+        self.out_dir = out_dir
+        os.makedirs(out_dir, exist_ok=True)
+        self.compress = compress
+        self.index = {'trajectory': [], 'steps': [], 'metrics': []}
+        self._streams = {
+            'trajectory': _ChunkStream(self, 'trajectory', TRAJECTORY_DTYPE, buffer_rows),
+            'steps': _ChunkStream(self, 'steps', STEP_INDEX_DTYPE, max(1024, buffer_rows // 64)),
+            'metrics': _ChunkStream(self, 'metrics', METRICS_DTYPE, max(1024, buffer_rows // 64)),
+        }
+        self._state_code = {name: i for i, name in enumerate(STATE_NAMES)}
+        self._activity_code = {}
+        self._rows_written = 0 # Offset global baris trajektori berikutnya
+        self._model = None
+        self._error = None
+
+        self._queue = None
+        self._thread = None
+        if background:
+            self._queue = queue.Queue(maxsize=max_pending)
+            self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+            self._thread.start()
+
+    # --- Writer ---
+    def _submit(self, name, chunk_no, chunk):
+        if self._queue is not None:
+            self._queue.put((name, chunk_no, chunk)) # Blok jika writer tertinggal (backpressure)
+        else:
+            self._write(name, chunk_no, chunk)
+
+    def _writer_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as e: # Simpan error, dilaporkan saat close()
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, name, chunk_no, chunk):
+        ext = 'npz' if self.compress else 'npy'
+        filename = f"{name}_{chunk_no:06d}.{ext}"
+        path = os.path.join(self.out_dir, filename)
+        if self.compress:
+            np.savez_compressed(path, data=chunk)
+        else:
+            np.save(path, chunk)
+        self.index[name].append({
+            'file': filename, 'rows': int(len(chunk)),
+            'step_min': int(chunk['step'].min()), 'step_max': int(chunk['step'].max()),
+        })
+
+    # --- Rekam ---
+    def attach(self, model):
+        """Pasang ke model: record_step dipanggil otomatis di akhir setiap ParkModel.step()."""
+        self._model = model
+        model.recorder = self
+        return self
+
+    def _activity(self, name):
+        code = self._activity_code.get(name)
+        if code is None:
+            code = self._activity_code[name] = len(self._activity_code)
+        return code
+
+    def record_step(self, model):
+        step = model.steps
+        pop = model.population
+        if pop is not None:
+            # Engine vektor: salin langsung dari array populasi
+            n = pop.size
+            rows = np.empty(n, dtype=TRAJECTORY_DTYPE)
+            rows['step'] = step
+            rows['agent_id'] = pop.uid[:n]
+            rows['node'] = pop.node[:n]
+            rows['state'] = pop.state[:n]
+            lut = np.array([self._activity(name) for name in pop.activity_names], dtype=np.int16)
+            rows['activity'] = lut[pop.activity[:n]]
+            rows['target_zone'] = pop.target_zone[:n]
+        else:
+            agents = list(model.agents)
+            node_index = model.node_id_index
+            zone_index = model.occupancy.index
+            rows = np.empty(len(agents), dtype=TRAJECTORY_DTYPE)
+            rows['step'] = step
+            for i, a in enumerate(agents):
+                rows[i] = (step, a.unique_id, node_index.get(a.pos, -1), self._state_code.get(a.state, -1),
+                           self._activity(a.current_activity), zone_index.get(a.target_zone_id, -1))
+        self._streams['trajectory'].append(rows)
+        self._streams['steps'].append(np.array([(step, self._rows_written, len(rows))], dtype=STEP_INDEX_DTYPE))
+        self._rows_written += len(rows)
+
+        metrics = np.array([(step, model.population_size(), int(model.is_raining), model.temperature)], dtype=METRICS_DTYPE)
+        self._streams['metrics'].append(metrics)
+
+    def close(self):
+        """Flush sisa buffer, tunggu writer selesai, tulis index.json."""
+        for stream in self._streams.values():
+            stream.flush()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            raise self._error
+
+        meta = {
+            'format': 'npz' if self.compress else 'npy',
+            'state_names': STATE_NAMES,
+            'activity_names': sorted(self._activity_code, key=self._activity_code.get),
+            'index': {k: sorted(v, key=lambda c: c['file']) for k, v in self.index.items()},
+        }
+        meta['index'].setdefault('steps', [])
+        if self._model is not None:
+            meta['node_ids'] = [str(n) for n in self._model.node_ids]
+            meta['zone_ids'] = list(self._model.occupancy.zone_ids)
+        with open(os.path.join(self.out_dir, 'index.json'), 'w') as f:
+            json.dump(meta, f)
+        if self._model is not None and self._model.recorder is self:
+            self._model.recorder = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordingReader:
+    """
+    Pembaca lazy untuk hasil TrajectoryRecorder.
+
+    Hanya chunk yang beririsan dengan jendela waktu yang dibuka; chunk .npy
+    dibuka dengan memory-map sehingga data satu hari penuh tidak pernah dimuat sekaligus.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'index.json')) as f:
+            self.meta = json.load(f)
+        self.state_names = self.meta['state_names']
+        self.activity_names = self.meta['activity_names']
+        self.node_ids = self.meta.get('node_ids', [])
+        self.zone_ids = self.meta.get('zone_ids', [])
+
+    def _load(self, entry, mmap=True):
+        path = os.path.join(self.path, entry['file'])
+        if entry['file'].endswith('.npz'):
+            with np.load(path) as data:
+                return data['data']
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    def iter_chunks(self, start=None, end=None, stream='trajectory', mmap=True):
+        """Iterasi array baris (per chunk) untuk step dalam [start, end]."""
+        for entry in self.meta['index'][stream]:
+            if start is not None and entry['step_max'] < start:
+                continue
+            if end is not None and entry['step_min'] > end:
+                continue
+            data = self._load(entry, mmap)
+            if (start is not None and entry['step_min'] < start) or (end is not None and entry['step_max'] > end):
+                mask = np.ones(len(data), dtype=bool)
+                if start is not None: mask &= data['step'] >= start
+                if end is not None: mask &= data['step'] <= end
+                data = data[mask]
+            yield data
+
+    def step_range(self, stream=None):
+        """Rentang step terekam; default index per step (mencakup step tanpa agen) jika tersedia."""
+        if stream is None:
+            stream = 'steps' if 'steps' in self.meta['index'] else 'trajectory'
+        chunks = self.meta['index'][stream]
+        if not chunks:
+            return None
+        return min(c['step_min'] for c in chunks), max(c['step_max'] for c in chunks)
+
+    def iter_steps(self, start=None, end=None):
+        """
+        Iterasi (step, baris agen pada step itu) secara berurutan, untuk replay.
+        Step tanpa agen menghasilkan array kosong, sehingga jumlah & urutan frame sama
+        dengan run aslinya (rekaman lama tanpa index per step melewati step kosong).
+        """
+        groups = self._iter_groups(start, end)
+        if 'steps' not in self.meta['index']:
+            yield from groups
+            return
+        empty = np.empty(0, dtype=TRAJECTORY_DTYPE)
+        for chunk in self.iter_chunks(start, end, stream='steps', mmap=False):
+            for step, rows in zip(chunk['step'].tolist(), chunk['rows'].tolist()):
+                if rows == 0:
+                    yield step, empty
+                    continue
+                found, part = next(groups)
+                if found != step or len(part) != rows:
+                    raise ValueError(f"Index step {step} tidak cocok dengan baris trajektori (step {found})")
+                yield step, part
+
+    def _iter_groups(self, start=None, end=None):
+        """Baris trajektori dikelompokkan per step (hanya step yang punya baris)."""
+        pending = None
+        for chunk in self.iter_chunks(start, end):
+            if pending is not None:
+                chunk = np.concatenate([pending, chunk])
+            steps = chunk['step']
+            bounds = np.flatnonzero(np.diff(steps)) + 1
+            parts = np.split(chunk, bounds)
+            # Step terakhir bisa berlanjut di chunk berikutnya
+            pending = parts.pop()
+            for part in parts:
+                yield int(part['step'][0]), part
+        if pending is not None and len(pending):
+            yield int(pending['step'][0]), pending
+
+    def metrics(self, start=None, end=None):
+        chunks = list(self.iter_chunks(start, end, stream='metrics', mmap=False))
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=METRICS_DTYPE)
@@ -0,0 +1,243 @@
+import os
+import numpy as np
+from matplotlib.animation import FuncAnimation, FFMpegWriter, PillowWriter
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from .engine import STATE_NAMES
+
+# --- KONFIGURASI WARNA ---
+ZONE_COLORS = {
+    'garden': '#98FB98',       # Pale Green
+    'playground': '#FFD700',   # Gold
+    'fitness_zone': '#87CEEB', # Sky Blue
+    'picnic_area': '#FFB6C1',  # Light Pink
+    'gazebo': '#CD853F',       # Peru (Coklat Kayu)
+    'bench_zone': '#F5DEB3',   # Wheat
+    'public_toilet': '#00CED1',# Dark Turquoise
+    'fountain_zone': '#1E90FF',# Dodger Blue
+    'gate': '#228B22',         # Forest Green
+    'track': '#FF6347',        # Tomato
+    'plaza': '#D3D3D3'         # Grey
+}
+
+FACILITY_STYLE = {
+    'trash_bin': {'c': 'red', 'm': '.', 's': 40},
+    'lamp':      {'c': 'orange', 'm': 'o', 's': 30},
+    'lighting':  {'c': 'orange', 'm': 'o', 's': 30},
+    'tree':      {'c': '#006400', 'm': '^', 's': 120}, # Hijau Tua Segitiga
+    'bench':     {'c': '#8B4513', 'm': '_', 's': 60}
+}
+
+# Kategori warna agen -> RGBA (lookup array, diindeks kode kategori)
+COLOR_NORMAL, COLOR_DECIDING, COLOR_SHELTER, COLOR_LEAVING = range(4)
+AGENT_COLORS = np.array([to_rgba(c) for c in ('blue', 'yellow', 'purple', 'red')])
+
+# Kategori per kode state (STATE_NAMES); shelter_seeking ditimpa belakangan
+STATE_COLOR = np.array([{'DECIDING': COLOR_DECIDING, 'LEAVING': COLOR_LEAVING}.get(s, COLOR_NORMAL)
+                        for s in STATE_NAMES], dtype=np.int8)
+STATE_CODE = {name: i for i, name in enumerate(STATE_NAMES)}
+FINISHED = STATE_CODE['FINISHED']
+
+JITTER_SIZE = 4096   # Tabel offset acak tetap; agen memakai slot id % JITTER_SIZE
+JITTER_RADIUS = 1.5  # Meter
+
+
+def color_codes(state, is_shelter):
+    """Kode kategori warna dari array state + mask shelter_seeking (LEAVING tetap merah)."""
+    codes = STATE_COLOR[state]
+    codes[is_shelter & (state != STATE_CODE['LEAVING'])] = COLOR_SHELTER
+    return codes
+
+
+# ==========================================
+# SUMBER FRAME
+# ==========================================
+def model_frame(model):
+    """Snapshot agen dari model hidup: dict berisi array node (indeks), kode warna, id, dan info teks."""
+    pop = model.population
+    if pop is not None:
+        n = pop.size
+        state = pop.state[:n]
+        shelter = pop.activity_code.get('shelter_seeking', -1)
+        nodes = pop.node[:n].astype(np.intp)
+        codes = color_codes(state, pop.activity[:n] == shelter)
+        ids = pop.uid[:n].astype(np.int64)
+    else:
+        agents = [a for a in model.agents if a.pos is not None]
+        node_index = model.node_id_index
+        nodes = np.fromiter((node_index[a.pos] for a in agents), dtype=np.intp, count=len(agents))
+        state = np.fromiter((STATE_CODE[a.state] for a in agents), dtype=np.int8, count=len(agents))
+        shelter = np.fromiter((a.current_activity == 'shelter_seeking' for a in agents), dtype=bool, count=len(agents))
+        codes = color_codes(state, shelter)
+        ids = np.fromiter((hash(a.unique_id) for a in agents), dtype=np.int64, count=len(agents))
+
+    rain = "HUJAN 🌧️" if model.is_raining else "CERAH ☀️"
+    info = (f"Step: {model.steps}\n"
+            f"Jam: {model.time_slot}\n"
+            f"Cuaca: {rain} (Panas: {model.temperature:g})\n"
+            f"Populasi: {model.population_size()} Orang")
+    return {'nodes': nodes, 'codes': codes, 'ids': ids, 'info': info, 'visible': state != FINISHED}
+
+
+def live_frames(model, frames, steps_per_frame=1):
+    """
+    Majukan model steps_per_frame step per frame (kecepatan simulasi lepas dari frame rate).
+    Berhenti lebih awal saat taman tutup (running=False).
+    """
+    for _ in range(frames):
+        if not model.running:
+            return
+        model.advance(steps_per_frame)
+        yield model_frame(model)
+
+
+def replay_frames(reader, model, steps_per_frame=1, start=None, end=None):
+    """
+    Putar ulang rekaman TrajectoryRecorder (RecordingReader). model hanya dipakai
+    untuk geometri; indeks node rekaman dipetakan ke urutan node model.
+    """
+    index = {str(n): i for i, n in enumerate(model.node_ids)}
+    node_lut = np.array([index.get(n, -1) for n in reader.node_ids], dtype=np.intp)
+    shelter = reader.activity_names.index('shelter_seeking') if 'shelter_seeking' in reader.activity_names else -1
+    metrics = {int(m['step']): m for m in reader.metrics(start, end)}
+
+    for i, (step, rows) in enumerate(reader.iter_steps(start, end)):
+        if i % steps_per_frame:
+            continue
+        state = rows['state'].astype(np.int8)
+        raw = rows['node'].astype(np.intp)
+        nodes = np.where(raw >= 0, node_lut[raw], -1) if len(node_lut) else raw
+        m = metrics.get(step)
+        info = f"Step: {step}\nPopulasi: {len(rows)} Orang"
+        if m is not None:
+            rain = "HUJAN 🌧️" if m['rain'] else "CERAH ☀️"
+            info = f"Step: {step}\nCuaca: {rain} (Panas: {m['temperature']:.2f})\nPopulasi: {m['population']} Orang"
+        yield {'nodes': nodes, 'codes': color_codes(state, rows['activity'] == shelter),
+               'ids': rows['agent_id'], 'info': info, 'visible': (state != FINISHED) & (nodes >= 0)}
+
+
+# ==========================================
+# RENDERER
+# ==========================================
+class ParkRenderer:
+    """
+    Renderer peta taman + agen.
+
+    Layer statis (zona, jalur, fasilitas) digambar sekali. Agen digambar sebagai
+    satu scatter: koordinat diambil dari array node_xy (diindeks nomor node),
+    warna dari lookup array, lalu set_offsets/set_facecolor dipanggil sekali per
+    frame dengan blitting. offline=True memakai canvas Agg (tanpa display) untuk
+    ekspor PNG/GIF/MP4.
+    """
+
+    def __init__(self, model, offline=False, figsize=(13, 10), seed=0):
+        self.model = model
+        self.node_xy = np.array([model.node_xy(n) for n in model.node_ids], dtype=float)
+        self.jitter = np.random.default_rng(seed).uniform(-JITTER_RADIUS, JITTER_RADIUS, (JITTER_SIZE, 2))
+
+        if offline:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.fig = Figure(figsize=figsize)
+            FigureCanvasAgg(self.fig)
+            self.ax = self.fig.add_subplot()
+        else:
+            import matplotlib.pyplot as plt
+            self.fig, self.ax = plt.subplots(figsize=figsize)
+        self.ax.set_title("Simulasi ABM Taman Kota (Design 2.0)")
+        self.ax.set_xlabel("X (Meter)")
+        self.ax.set_ylabel("Y (Meter)")
+        self.ax.set_aspect('equal')
+        self.draw_static()
+
+        self.agent_scatter = self.ax.scatter(np.empty(0), np.empty(0), s=20, zorder=5,
+                                             edgecolors='white', linewidth=0.3)
+        self.info_text = self.ax.text(0.02, 0.98, "", transform=self.ax.transAxes, fontsize=11,
+                                      verticalalignment='top',
+                                      bbox=dict(boxstyle='round', facecolor='white', alpha=0.9))
+
+    # --- Layer Statis ---
+    def draw_static(self):
+        ax = self.ax
+        # LAYER 1: ZONA AREA
+        for z in self.model.zones_list:
+            z_type = z['zone_type']
+            marker = 's' if z.get('shape') == 'rect' else 'o'
+            size = 300
+            # Custom size biar proporsional
+            if z_type == 'gate': size = 150
+            elif z_type in ['playground', 'picnic_area']: size = 600
+            elif z_type == 'public_toilet': size = 200
+            elif z_type == 'gazebo': size = 400
+            ax.scatter(z['x_center_m'], z['y_center_m'], c=ZONE_COLORS.get(z_type, '#D3D3D3'),
+                       s=size, marker=marker, alpha=0.6, edgecolors='none')
+
+        # LAYER 2: JALUR (satu LineCollection untuk semua edge)
+        index = self.model.node_id_index
+        segments = [(self.node_xy[index[u]], self.node_xy[index[v]]) for u, v in self.model.G.edges]
+        ax.add_collection(LineCollection(segments, colors='#cccccc', linewidths=1.5, alpha=0.5))
+
+        # LAYER 3: FASILITAS UMUM (satu scatter per jenis)
+        for f_type in sorted(self.model.facility_index.tags()):
+            coords = np.array([(x, y) for _, x, y in self.model.facility_index.items(f_type)])
+            style = FACILITY_STYLE.get(f_type, {'c': 'black', 'm': 'x', 's': 20})
+            ax.scatter(coords[:, 0], coords[:, 1], c=style['c'], marker=style['m'], s=style['s'], alpha=0.9, zorder=2)
+
+        # Legenda Custom
+        legend_elements = [
+            Line2D([0], [0], marker='o', color='w', markerfacecolor='blue', label='Pengunjung'),
+            Line2D([0], [0], marker='o', color='w', markerfacecolor='yellow', label='Memutuskan'),
+            Line2D([0], [0], marker='o', color='w', markerfacecolor='purple', label='Cari Berteduh'),
+            Line2D([0], [0], marker='o', color='w', markerfacecolor='red', label='Pulang'),
+            Line2D([0], [0], marker='^', color='w', markerfacecolor='#006400', label='Pohon'),
+            Line2D([0], [0], marker='o', color='w', markerfacecolor='orange', label='Lampu'),
+            Line2D([0], [0], marker='s', color='w', markerfacecolor='#00CED1', label='Toilet'),
+            Line2D([0], [0], marker='s', color='w', markerfacecolor='#FFD700', label='Playground'),
+        ]
+        ax.legend(handles=legend_elements, loc='lower right', ncol=2, fontsize=9)
+        ax.autoscale_view()
+
+    # --- Layer Dinamis ---
+    def update(self, frame):
+        visible = frame['visible']
+        nodes = frame['nodes'][visible]
+        offsets = self.node_xy[nodes] + self.jitter[frame['ids'][visible] % JITTER_SIZE]
+        self.agent_scatter.set_offsets(offsets)
+        self.agent_scatter.set_facecolor(AGENT_COLORS[frame['codes'][visible]])
+        self.info_text.set_text(frame['info'])
+        return self.agent_scatter, self.info_text
+
+    def _init(self):
+        self.agent_scatter.set_offsets(np.empty((0, 2)))
+        return self.agent_scatter, self.info_text
+
+    def animate(self, frames, interval=100, total_frames=None):
+        """FuncAnimation dengan blit=True; frames adalah iterator dari live_frames/replay_frames."""
+        self.animation = FuncAnimation(self.fig, self.update, frames=frames, init_func=self._init,
+                                       interval=interval, blit=True, repeat=False,
+                                       save_count=total_frames, cache_frame_data=False)
+        return self.animation
+
+    def export(self, frames, out, fps=10, dpi=100, total_frames=None):
+        """
+        Render tanpa display. out berakhiran .gif/.mp4 -> file animasi,
+        selain itu dianggap folder tujuan PNG per frame. Mengembalikan jumlah frame.
+        """
+        ext = os.path.splitext(out)[1].lower()
+        if ext in ('.gif', '.mp4'):
+            writer = PillowWriter(fps=fps) if ext == '.gif' else FFMpegWriter(fps=fps)
+            count = 0
+            with writer.saving(self.fig, out, dpi):
+                for frame in frames:
+                    self.update(frame)
+                    writer.grab_frame()
+                    count += 1
+            return count
+
+        os.makedirs(out, exist_ok=True)
+        count = 0
+        for count, frame in enumerate(frames, start=1):
+            self.update(frame)
+            self.fig.savefig(os.path.join(out, f"frame_{count:05d}.png"), dpi=dpi)
+        return count
@@ -0,0 +1,274 @@
+import hashlib
+import heapq
+import os
+import tempfile
+import zipfile
+import numpy as np
+import networkx as nx
+
+
+def default_cache_dir():
+    """Folder cache di root project (sejajar dengan folder data/)."""
+    src_directory = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(os.path.dirname(src_directory), ".cache")
+
+
+def graph_signature(G, weight='length'):
+    """Hash isi graf (node + edge + bobot). Dipakai sebagai kunci cache rute."""
+    h = hashlib.sha1()
+    for n in sorted(map(str, G.nodes)):
+        h.update(n.encode())
+        h.update(b";")
+    edges = sorted((str(min(u, v)), str(max(u, v)), float(d.get(weight, 1.0)))
+                   for u, v, d in G.edges(data=True))
+    for u, v, w in edges:
+        h.update(f"{u}|{v}|{w!r};".encode())
+    return h.hexdigest()
+
+
+def next_hop_rows(G, targets, index, weight='length'):
+    """
+    Baris next-hop & jarak menuju sejumlah target: hop[i, u] = indeks node berikutnya
+    dari u menuju targets[i] (-1 jika tidak terjangkau). Satu Dijkstra per target;
+    graf tidak berarah sehingga pohon jalur terpendek dari target = arah menuju target.
+    """
+    n = len(index)
+    dtype = np.int16 if n < np.iinfo(np.int16).max else np.int32
+    hop = np.full((len(targets), n), -1, dtype=dtype)
+    dist = np.full((len(targets), n), np.inf, dtype=np.float32)
+    for t_idx, target in enumerate(targets):
+        # pred[u] = node sebelum u pada pohon jalur terpendek dari target,
+        # yaitu node berikutnya dari u jika berjalan menuju target.
+        pred, d_map = nx.dijkstra_predecessor_and_distance(G, target, weight=weight)
+        row_hop = hop[t_idx]
+        row_dist = dist[t_idx]
+        for node, d in d_map.items():
+            u = index[node]
+            row_dist[u] = d
+            p = pred.get(node)
+            row_hop[u] = index[p[0]] if p else u
+    return hop, dist
+
+
+class RoutingTable:
+    """
+    Tabel rute all-pairs yang dihitung sekali saat model dibuat.
+
+    Disimpan sebagai matriks integer `next_hop[t, u]` = indeks node berikutnya
+    dari u menuju t (-1 jika tidak terjangkau), plus matriks jarak `dist[t, u]`.
+    Karena graf taman tidak berarah, satu Dijkstra dari tiap target sudah
+    memberi next-hop semua node menuju target itu. Rekonstruksi rute = O(panjang rute).
+    """
+
+    _memory_cache = {} # signature -> (next_hop, dist); dipakai ulang antar model dalam satu proses
+
+    def __init__(self, G, weight='length', cache_dir=None, verbose=True):
+        self.weight = weight
+        self.nodes = list(G.nodes)
+        self.index = {n: i for i, n in enumerate(self.nodes)}
+        self.signature = graph_signature(G, weight)
+        self.from_cache = False
+
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        self.cache_path = os.path.join(cache_dir, f"routing_{self.signature[:16]}.npz") if cache_dir else None
+
+        cached = RoutingTable._memory_cache.get(self.signature)
+        if cached is not None:
+            self.next_hop, self.dist = cached
+            self.from_cache = True
+        elif self.cache_path and self._load():
+            self.from_cache = True
+        else:
+            self._build(G)
+            if self.cache_path:
+                self._save()
+        RoutingTable._memory_cache[self.signature] = (self.next_hop, self.dist)
+        if verbose:
+            src = "cache" if self.from_cache else "precompute"
+            print(f"[DEBUG] RoutingTable: {len(self.nodes)} node ({src})")
+
+    # --- Build & Cache ---
+    def _build(self, G):
+        self.next_hop, self.dist = next_hop_rows(G, self.nodes, self.index, self.weight)
+
+    def _load(self):
+        if not os.path.exists(self.cache_path):
+            return False
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as data:
+                if list(data['nodes']) != [str(n) for n in self.nodes]:
+                    return False
+                self.next_hop = data['next_hop']
+                self.dist = data['dist']
+            return True
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            return False # Cache rusak/terpotong dianggap miss dan ditimpa oleh _save
+
+    def _save(self):
+        tmp_path = None
+        try:
+            directory = os.path.dirname(self.cache_path)
+            os.makedirs(directory, exist_ok=True)
+            # File sementara unik per penulis: worker paralel tidak menimpa file yang sama
+            with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp.npz", delete=False) as f:
+                tmp_path = f.name
+                np.savez(f, nodes=np.array([str(n) for n in self.nodes]),
+                         next_hop=self.next_hop, dist=self.dist)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            # Cache bersifat opsional
+
+    # --- Query ---
+    def distance(self, start, end):
+        """Jarak terpendek (meter). inf jika tidak terhubung."""
+        return float(self.dist[self.index[end], self.index[start]])
+
+    def path_indices(self, s, t):
+        """Rute dalam bentuk indeks node [s, ..., t], atau None jika tidak terjangkau."""
+        row = self.next_hop[t]
+        if row[s] < 0:
+            return None
+        route = [s]
+        cur = s
+        while cur != t:
+            cur = int(row[cur])
+            route.append(cur)
+        return route
+
+    def path(self, start, end):
+        """Sama seperti nx.shortest_path: list node dari start sampai end (None jika putus)."""
+        idx = self.path_indices(self.index[start], self.index[end])
+        if idx is None:
+            return None
+        nodes = self.nodes
+        return [nodes[i] for i in idx]
+
+
+class RouteStore:
+    """
+    Rute bersama per pasangan (start, end) sebagai tuple read-only.
+
+    Banyak agen menuju zona yang sama dari node yang sama memegang objek rute
+    yang sama (agen hanya menyimpan kursor), sehingga tidak ada alokasi list
+    per keputusan. Rute gagal (None) ikut di-cache. Store dikosongkan jika
+    melebihi max_routes agar memori tetap terbatas di graf besar.
+    """
+
+    def __init__(self, router, max_routes=200_000):
+        self.router = router
+        self.max_routes = max_routes
+        self._routes = {}
+
+    def __len__(self):
+        return len(self._routes)
+
+    def path(self, start, end):
+        key = (start, end)
+        try:
+            return self._routes[key]
+        except KeyError:
+            pass
+        route = self.router.path(start, end)
+        if route is not None:
+            route = tuple(route)
+        if len(self._routes) >= self.max_routes:
+            self._routes.clear()
+        self._routes[key] = route
+        return route
+
+
+class NetworkXRouter:
+    """Router referensi (Dijkstra per panggilan). Dipakai untuk benchmark & validasi."""
+
+    def __init__(self, G, weight='length'):
+        self.G = G
+        self.weight = weight
+
+    def distance(self, start, end):
+        try:
+            return nx.shortest_path_length(self.G, start, end, weight=self.weight)
+        except nx.NetworkXNoPath:
+            return float('inf')
+
+    def path(self, start, end):
+        try:
+            return nx.shortest_path(self.G, start, end, weight=self.weight)
+        except nx.NetworkXNoPath:
+            return None
+
+
+class GateField:
+    """
+    Medan jarak multi-sumber dari semua gate yang terbuka (satu kali Dijkstra).
+
+    Untuk setiap node disimpan: gate terdekat, jarak ke gate itu, dan next-hop
+    menuju gate tersebut. Mencari jalan pulang jadi lookup O(1) + jalan mengikuti medan.
+    """
+
+    def __init__(self, G, gate_nodes, closed_gates=(), weight='length'):
+        self.nodes = list(G.nodes)
+        self.index = {n: i for i, n in enumerate(self.nodes)}
+        self.open_gates = [g for g in dict.fromkeys(gate_nodes) if g not in set(closed_gates) and g in self.index]
+
+        n = len(self.nodes)
+        self.nearest_gate = np.full(n, -1, dtype=np.int32)
+        self.dist = np.full(n, np.inf, dtype=np.float64)
+        self.next_hop = np.full(n, -1, dtype=np.int32)
+        self._routes = {} # node -> tuple rute pulang (dipakai bersama antar agen)
+
+        # Dijkstra multi-sumber: semua gate terbuka masuk antrian dengan jarak 0
+        heap = []
+        for g in self.open_gates:
+            gi = self.index[g]
+            self.dist[gi] = 0.0
+            self.nearest_gate[gi] = gi
+            self.next_hop[gi] = gi
+            heap.append((0.0, gi))
+        heapq.heapify(heap)
+
+        adj = [[] for _ in range(n)]
+        for u, v, d in G.edges(data=True):
+            w = float(d.get(weight, 1.0))
+            ui, vi = self.index[u], self.index[v]
+            adj[ui].append((vi, w))
+            adj[vi].append((ui, w))
+
+        dist = self.dist
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for v, w in adj[u]:
+                nd = d + w
+                if nd < dist[v]:
+                    dist[v] = nd
+                    self.nearest_gate[v] = self.nearest_gate[u]
+                    self.next_hop[v] = u
+                    heapq.heappush(heap, (nd, v))
+
+    def nearest(self, node):
+        """(gate terdekat, jarak). (None, inf) jika tidak ada gate yang terjangkau."""
+        i = self.index[node]
+        g = self.nearest_gate[i]
+        if g < 0:
+            return None, float('inf')
+        return self.nodes[g], float(self.dist[i])
+
+    def path(self, node):
+        """Rute (node, ..., gate) mengikuti next-hop medan (tuple bersama), atau None jika terputus."""
+        route = self._routes.get(node)
+        if route is not None:
+            return route
+        i = self.index[node]
+        if self.nearest_gate[i] < 0:
+            return None
+        nodes, hop = self.nodes, self.next_hop
+        route = [node]
+        while hop[i] != i:
+            i = hop[i]
+            route.append(nodes[i])
+        route = self._routes[node] = tuple(route)
+        return route
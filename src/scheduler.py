@@ -0,0 +1,74 @@
+import heapq
+import itertools
+
+
+class EventScheduler:
+    """
+    Scheduler berbasis event (heap dengan kunci step bangun).
+
+    Agen yang sedang "diam" (ACTIVITY dengan sisa durasi panjang, atau berteduh
+    menunggu hujan reda) didaftarkan tidur sampai event berikutnya dan tidak
+    di-step tiap menit. Agen lain (DECIDING, WALKING, LEAVING) tetap aktif.
+    Event global (hujan mulai/reda, taman tutup) membangunkan agen secara massal.
+    """
+
+    def __init__(self):
+        self.active = {}      # agen aktif (dict sebagai ordered set)
+        self.sleeping = {}    # agen -> token tidur terakhir (untuk lazy delete di heap)
+        self._heap = []       # (step bangun, token, agen)
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self.active) + len(self.sleeping)
+
+    def add(self, agent):
+        """Daftarkan agen baru sebagai aktif."""
+        self.active[agent] = None
+
+    def remove(self, agent):
+        self.active.pop(agent, None)
+        self.sleeping.pop(agent, None)
+
+    def sleep(self, agent, wake_step=None):
+        """
+        Tidurkan agen sampai `wake_step` (None = sampai dibangunkan event global).
+        Agen tidak akan di-step sampai saat itu.
+        """
+        token = next(self._counter)
+        self.active.pop(agent, None)
+        self.sleeping[agent] = token
+        if wake_step is not None:
+            heapq.heappush(self._heap, (wake_step, token, agent))
+
+    def _wake(self, agent, step):
+        del self.sleeping[agent]
+        self.active[agent] = None
+        agent.wake_up(step)
+
+    def due(self, step):
+        """Bangunkan semua agen yang jadwal bangunnya <= step. Return jumlah agen yang bangun."""
+        heap = self._heap
+        woken = 0
+        while heap and heap[0][0] <= step:
+            _, token, agent = heapq.heappop(heap)
+            if self.sleeping.get(agent) == token: # Abaikan entri basi
+                self._wake(agent, step)
+                woken += 1
+        return woken
+
+    def wake_all(self, step, predicate=None):
+        """Event global: bangunkan semua agen tidur (atau yang memenuhi predicate)."""
+        targets = [a for a in self.sleeping if predicate is None or predicate(a)]
+        for agent in targets:
+            self._wake(agent, step)
+        return len(targets)
+
+    def next_wake_step(self):
+        """Step bangun terdekat di heap (None jika tidak ada)."""
+        heap = self._heap
+        while heap and self.sleeping.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def active_agents(self):
+        return list(self.active)
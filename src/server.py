@@ -0,0 +1,477 @@
+import asyncio
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+from collections import deque
+import numpy as np
+from .engine import STATE_NAMES
+
+# --- Format Frame Biner (little-endian) ---
+# Header 32 byte, lalu array berurutan (offset tetap kelipatan 4 untuk typed array JS):
+#   ids u4[changed] | nodes i4[changed] | removed u4[removed] | zones i4[n_zones] | states u1[changed]
+# kind 0 = delta (hanya agen yang node/state-nya berubah + id yang hilang),
+# kind 1 = keyframe (seluruh agen; dipakai saat klien baru masuk atau tertinggal).
+FRAME_MAGIC = b"PKF1"
+FRAME_HEADER = struct.Struct("<4sBBxxIIIIIf") # magic, kind, rain, step, changed, removed, n_zones, populasi, suhu
+KIND_DELTA = 0
+KIND_KEY = 1
+STATE_CODE = {name: i for i, name in enumerate(STATE_NAMES)}
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+CLIENT_QUEUE = 32 # Delta tertunda per klien sebelum di-resync dengan keyframe
+SEND_BUFFER = 64 * 1024 # Batas buffer kirim per koneksi: klien lambat cepat terdeteksi lewat drain()
+
+
+def agent_arrays(model):
+    """(ids u4, nodes i4, states u1) seluruh agen aktif, diurutkan menurut id."""
+    pop = model.population
+    if pop is not None:
+        n = pop.size
+        ids = pop.uid[:n].astype(np.uint32)
+        nodes = pop.node[:n].astype(np.int32)
+        states = pop.state[:n].astype(np.uint8)
+    else:
+        agents = [a for a in model.agents if a.pos is not None]
+        node_index = model.node_id_index
+        ids = np.fromiter((a.unique_id for a in agents), dtype=np.uint32, count=len(agents))
+        nodes = np.fromiter((node_index[a.pos] for a in agents), dtype=np.int32, count=len(agents))
+        states = np.fromiter((STATE_CODE[a.state] for a in agents), dtype=np.uint8, count=len(agents))
+    if len(ids) > 1 and np.any(ids[1:] < ids[:-1]):
+        order = np.argsort(ids, kind='stable')
+        ids, nodes, states = ids[order], nodes[order], states[order]
+    return ids, nodes, states
+
+
+class FrameEncoder:
+    """
+    Encoder delta per step. Menyimpan snapshot step sebelumnya (array terurut per id)
+    sehingga delta = agen baru / pindah node / ganti state, plus id yang hilang.
+    """
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.uint32)
+        self.nodes = np.empty(0, dtype=np.int32)
+        self.states = np.empty(0, dtype=np.uint8)
+
+    def encode(self, model, info):
+        """Frame delta step sekarang (bytes); snapshot penuh disimpan untuk keyframe."""
+        ids, nodes, states = agent_arrays(model)
+        prev_ids = self.ids
+        if len(prev_ids):
+            pos = np.minimum(np.searchsorted(prev_ids, ids), len(prev_ids) - 1)
+            known = prev_ids[pos] == ids
+            changed = ~known | (self.nodes[pos] != nodes) | (self.states[pos] != states)
+            removed = prev_ids[~np.isin(prev_ids, ids, assume_unique=True)]
+        else:
+            changed = np.ones(len(ids), dtype=bool)
+            removed = prev_ids
+        self.ids, self.nodes, self.states = ids, nodes, states
+        return pack_frame(KIND_DELTA, info, ids[changed], nodes[changed], states[changed], removed)
+
+
+class StepInfo:
+    """Potongan state lingkungan satu step (aman dibaca thread lain setelah step selesai)."""
+
+    __slots__ = ('steps', 'is_raining', 'temperature', 'zone_counts', 'population')
+
+    def __init__(self, model):
+        self.steps = model.steps
+        self.is_raining = model.is_raining
+        self.temperature = model.temperature
+        self.zone_counts = np.asarray(model.occupancy.counts, dtype=np.int32).copy()
+        self.population = model.population_size()
+
+
+def pack_frame(kind, info, ids, nodes, states, removed):
+    header = FRAME_HEADER.pack(FRAME_MAGIC, kind, int(info.is_raining), info.steps, len(ids), len(removed),
+                               len(info.zone_counts), info.population, info.temperature)
+    return b"".join((header, ids.astype('<u4').tobytes(), nodes.astype('<i4').tobytes(),
+                     removed.astype('<u4').tobytes(), info.zone_counts.astype('<i4').tobytes(),
+                     states.astype(np.uint8).tobytes()))
+
+
+def unpack_frame(data):
+    """Kebalikan pack_frame -> dict (untuk klien Python & validasi)."""
+    magic, kind, rain, step, c, r, z, population, temp = FRAME_HEADER.unpack_from(data)
+    if magic != FRAME_MAGIC:
+        raise ValueError("Bukan frame PKF1")
+    off = FRAME_HEADER.size
+    out = {'kind': kind, 'rain': bool(rain), 'step': step, 'population': population, 'temperature': temp}
+    for name, dtype, count in (('ids', '<u4', c), ('nodes', '<i4', c), ('removed', '<u4', r),
+                               ('zones', '<i4', z), ('states', 'u1', c)):
+        out[name] = np.frombuffer(data, dtype=dtype, count=count, offset=off)
+        off += out[name].nbytes
+    return out
+
+
+# ==========================================
+# HUB & KLIEN
+# ==========================================
+class _Client:
+    """Antrian frame satu penonton. Jika penuh, delta dibuang dan klien di-resync (keyframe)."""
+
+    def __init__(self):
+        self.queue = deque()
+        self.need_key = True
+        self.event = asyncio.Event()
+        self.dropped = 0
+
+    def push(self, frame):
+        if self.need_key:
+            self.event.set()
+            return
+        if len(self.queue) >= CLIENT_QUEUE:
+            self.dropped += len(self.queue)
+            self.queue.clear()
+            self.need_key = True
+        else:
+            self.queue.append(frame)
+        self.event.set()
+
+
+class LiveHub:
+    """
+    Penghubung thread simulasi dan event loop. publish() dipanggil di loop
+    (lewat call_soon_threadsafe) sehingga snapshot keyframe & antrian klien
+    selalu konsisten: keyframe step s selalu diikuti delta step s+1.
+    """
+
+    def __init__(self):
+        self.clients = set()
+        self.info = None
+        self.last_snapshot = None
+        self.frames = 0
+        self.closed = False
+
+    def publish(self, info, delta, snapshot):
+        self.info = info
+        self.last_snapshot = snapshot
+        self.frames += 1
+        for client in self.clients:
+            client.push(delta)
+
+    def close(self):
+        """Akhiri semua stream klien: antrian yang tersisa dikirim dulu, lalu stream ditutup."""
+        self.closed = True
+        for client in self.clients:
+            client.event.set()
+
+    def finish(self):
+        """Simulasi selesai: kirim keyframe state akhir ke semua klien, lalu tutup stream."""
+        if self.closed:
+            return
+        frame = self.keyframe()
+        if frame is not None:
+            for client in self.clients:
+                if not client.need_key: # Klien yang menunggu resync sudah akan menerima keyframe ini
+                    client.queue.append(frame)
+        self.close()
+
+    def keyframe(self):
+        if self.info is None:
+            return None
+        ids, nodes, states = self.last_snapshot
+        return pack_frame(KIND_KEY, self.info, ids, nodes, states, np.empty(0, dtype=np.uint32))
+
+    async def frames_for(self, client):
+        """
+        Generator frame untuk satu klien (keyframe dulu, lalu delta berurutan).
+        Setelah close(), frame yang masih antri dihabiskan lalu generator berakhir.
+        """
+        while True:
+            if not self.closed:
+                await client.event.wait()
+            client.event.clear()
+            if client.need_key:
+                frame = self.keyframe()
+                if frame is None:
+                    if self.closed:
+                        return
+                    continue
+                client.need_key = False
+                client.queue.clear()
+                yield frame
+            while client.queue:
+                yield client.queue.popleft()
+            if self.closed:
+                return
+
+
+# ==========================================
+# SERVER
+# ==========================================
+class LiveServer:
+    """
+    Server asyncio lokal di sekitar ParkModel.
+
+    Simulasi berjalan di thread sendiri (`steps_per_sec` = batas kecepatan,
+    None = secepatnya) dan tidak pernah menunggu penonton. Setiap step
+    dikodekan sekali menjadi frame delta biner lalu dibagikan ke semua klien:
+      GET /        viewer HTML (canvas)
+      GET /meta    geometri node/edge, zona, nama state, format frame (JSON)
+      GET /ws      WebSocket, satu pesan biner per frame
+      GET /stream  HTTP chunked, frame diawali panjang u4
+    Klien lambat kehilangan delta lama dan menerima keyframe terbaru.
+
+    Saat simulasi selesai (model.running False atau `steps` tercapai) semua klien
+    menerima keyframe state akhir lalu stream ditutup (chunk penutup / frame close
+    WebSocket). Server kemudian berhenti, kecuali linger=True: server tetap melayani
+    / dan /meta, dan klien baru menerima keyframe akhir lalu langsung ditutup.
+    """
+
+    def __init__(self, model, host="127.0.0.1", port=8765, steps=None, steps_per_sec=None, linger=False):
+        self.model = model
+        self.host = host
+        self.port = port
+        self.steps = steps
+        self.steps_per_sec = steps_per_sec
+        self.linger = linger
+        self.hub = LiveHub()
+        self._stop = threading.Event()
+        self._thread = None
+        self._loop = None
+        self._handlers = set()
+        self._meta = json.dumps(self._build_meta()).encode()
+
+    def _build_meta(self):
+        model = self.model
+        index = model.node_id_index
+        return {
+            'nodes': [[str(n), *map(float, model.node_xy(n))] for n in model.node_ids],
+            'edges': [[index[u], index[v]] for u, v in model.G.edges],
+            'zones': [str(z) for z in model.occupancy.zone_ids],
+            'states': STATE_NAMES,
+            'frame': {'magic': FRAME_MAGIC.decode(), 'header_bytes': FRAME_HEADER.size,
+                      'layout': ['ids:u4', 'nodes:i4', 'removed:u4', 'zones:i4', 'states:u1']},
+        }
+
+    # --- Thread Simulasi ---
+    def _simulate(self):
+        model, encoder = self.model, FrameEncoder()
+        interval = 1.0 / self.steps_per_sec if self.steps_per_sec else 0.0
+        next_t = time.perf_counter()
+        done = 0
+        while not self._stop.is_set() and model.running and (self.steps is None or done < self.steps):
+            model.step()
+            if not model.running:
+                break # Jadwal habis: step tidak dijalankan (close_park), tidak ada frame baru
+            done += 1
+            info = StepInfo(model)
+            delta = encoder.encode(model, info)
+            self._loop.call_soon_threadsafe(self.hub.publish, info, delta,
+                                            (encoder.ids, encoder.nodes, encoder.states))
+            if interval:
+                next_t += interval
+                wait = next_t - time.perf_counter()
+                if wait > 0:
+                    self._stop.wait(wait)
+                else:
+                    next_t = time.perf_counter()
+        self._loop.call_soon_threadsafe(self._finish)
+
+    def _finish(self):
+        """Di event loop setelah thread simulasi selesai: frame akhir + tutup stream."""
+        self.hub.finish()
+        if not self.linger:
+            self.stop()
+
+    # --- HTTP / WebSocket ---
+    async def _handle(self, reader, writer):
+        self._handlers.add(asyncio.current_task())
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        writer.transport.set_write_buffer_limits(high=SEND_BUFFER)
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            self._handlers.discard(asyncio.current_task())
+            return
+        lines = request.decode('latin-1').split("\r\n")
+        parts = lines[0].split()
+        path = parts[1].split('?')[0] if len(parts) > 1 else "/"
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                headers[key.strip().lower()] = value.strip()
+        try:
+            if path == "/ws" and headers.get('upgrade', '').lower() == 'websocket':
+                await self._serve_websocket(reader, writer, headers)
+            elif path == "/stream":
+                await self._serve_stream(writer)
+            elif path == "/meta":
+                await self._respond(writer, "200 OK", "application/json", self._meta)
+            elif path in ("/", "/index.html"):
+                await self._respond(writer, "200 OK", "text/html; charset=utf-8", VIEWER_HTML.encode())
+            else:
+                await self._respond(writer, "404 Not Found", "text/plain", b"not found")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            self._handlers.discard(asyncio.current_task())
+
+    async def _respond(self, writer, status, content_type, body):
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    async def _serve_stream(self, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/octet-stream\r\n"
+                     b"Transfer-Encoding: chunked\r\nCache-Control: no-cache\r\n\r\n")
+        client = self._join()
+        try:
+            async for frame in self.hub.frames_for(client):
+                payload = struct.pack("<I", len(frame)) + frame
+                writer.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+                await writer.drain()
+            writer.write(b"0\r\n\r\n") # Chunk penutup: transfer selesai, bukan terpotong
+            await writer.drain()
+        finally:
+            self.hub.clients.discard(client)
+
+    async def _serve_websocket(self, reader, writer, headers):
+        key = headers.get('sec-websocket-key', '').encode()
+        accept = base64.b64encode(hashlib.sha1(key + WS_GUID).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        await writer.drain()
+        client = self._join()
+        closed = asyncio.ensure_future(_ws_read_until_close(reader))
+        try:
+            async for frame in self.hub.frames_for(client):
+                if closed.done():
+                    break
+                writer.write(_ws_header(len(frame)) + frame)
+                await writer.drain()
+            # Frame close (1000 membalas close klien, 1001 server berhenti)
+            writer.write(_ws_close_frame(1000 if closed.done() else 1001))
+            await writer.drain()
+        finally:
+            self.hub.clients.discard(client)
+            closed.cancel()
+
+    def _join(self):
+        client = _Client()
+        self.hub.clients.add(client)
+        client.event.set() # Keyframe pertama segera dikirim jika simulasi sudah berjalan
+        return client
+
+    # --- Siklus Hidup ---
+    async def serve(self):
+        """
+        Jalankan server + thread simulasi sampai stop() dipanggil, task dibatalkan, atau
+        simulasi selesai (kecuali linger=True).
+        """
+        self._loop = asyncio.get_running_loop()
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self._thread = threading.Thread(target=self._simulate, name="park-sim", daemon=True)
+        self._thread.start()
+        try:
+            async with server:
+                while not self._stop.is_set():
+                    await asyncio.sleep(0.2)
+        finally:
+            self._stop.set()
+            self._thread.join()
+            self.hub.close()
+            if self._handlers:
+                await asyncio.wait(self._handlers, timeout=1.0)
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            self.stop()
+
+
+def _ws_header(length):
+    """Header frame WebSocket biner server -> klien (FIN + opcode 0x2, tanpa mask)."""
+    if length < 126:
+        return struct.pack("!BB", 0x82, length)
+    if length < 1 << 16:
+        return struct.pack("!BBH", 0x82, 126, length)
+    return struct.pack("!BBQ", 0x82, 127, length)
+
+
+def _ws_close_frame(code):
+    """Frame close WebSocket server -> klien (FIN + opcode 0x8) dengan kode status."""
+    return struct.pack("!BBH", 0x88, 2, code)
+
+
+async def _ws_read_until_close(reader):
+    """Baca (dan abaikan) pesan klien sampai frame close / koneksi putus."""
+    try:
+        while True:
+            b1, b2 = await reader.readexactly(2)
+            length = b2 & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await reader.readexactly(8))[0]
+            await reader.readexactly(length + (4 if b2 & 0x80 else 0))
+            if b1 & 0x0F == 0x8:
+                return
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return
+
+
+VIEWER_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Park ABM Live</title>
+<style>body{margin:0;background:#f4f4f0;font:13px sans-serif}#info{position:fixed;top:8px;left:8px}</style>
+</head><body><div id="info">menghubungkan...</div><canvas id="c"></canvas>
+<script>
+const COLORS = ['#1f4fd1', '#1f4fd1', '#1f4fd1', '#d12f2f', '#999'];
+const cv = document.getElementById('c'), ctx = cv.getContext('2d'), info = document.getElementById('info');
+const agents = new Map(); let meta, xy, scale, frame = {};
+function fit() {
+  cv.width = innerWidth; cv.height = innerHeight;
+  const xs = meta.nodes.map(n => n[1]), ys = meta.nodes.map(n => n[2]);
+  const minX = Math.min(...xs), minY = Math.min(...ys);
+  scale = Math.min(cv.width / (Math.max(...xs) - minX + 1), cv.height / (Math.max(...ys) - minY + 1)) * 0.9;
+  xy = meta.nodes.map(n => [(n[1] - minX) * scale + 20, (n[2] - minY) * scale + 20]);
+}
+function apply(buf) {
+  const h = new DataView(buf), kind = h.getUint8(4), c = h.getUint32(12, true), r = h.getUint32(16, true), z = h.getUint32(20, true);
+  let off = 32;
+  const ids = new Uint32Array(buf, off, c); off += 4 * c;
+  const nodes = new Int32Array(buf, off, c); off += 4 * c;
+  const removed = new Uint32Array(buf, off, r); off += 4 * r + 4 * z;
+  const states = new Uint8Array(buf, off, c);
+  if (kind === 1) agents.clear();
+  for (const id of removed) agents.delete(id);
+  for (let i = 0; i < c; i++) agents.set(ids[i], [nodes[i], states[i]]);
+  frame = {step: h.getUint32(8, true), rain: h.getUint8(5), pop: h.getUint32(24, true), temp: h.getFloat32(28, true)};
+}
+function draw() {
+  ctx.clearRect(0, 0, cv.width, cv.height);
+  ctx.strokeStyle = '#ccc'; ctx.beginPath();
+  for (const [u, v] of meta.edges) { ctx.moveTo(...xy[u]); ctx.lineTo(...xy[v]); }
+  ctx.stroke();
+  for (const [id, [node, state]] of agents) {
+    const j = (id * 2654435761 % 1000) / 1000 * 6 - 3, k = (id * 40503 % 1000) / 1000 * 6 - 3;
+    ctx.fillStyle = COLORS[state] || '#000';
+    ctx.fillRect(xy[node][0] + j, xy[node][1] + k, 3, 3);
+  }
+  info.textContent = `step ${frame.step} | ${frame.rain ? 'HUJAN' : 'CERAH'} | suhu ${(frame.temp || 0).toFixed(2)} | pop ${frame.pop}`;
+  requestAnimationFrame(draw);
+}
+fetch('meta').then(r => r.json()).then(m => {
+  meta = m; fit(); onresize = fit;
+  const ws = new WebSocket(location.href.replace(/^http/, 'ws').replace(/\\/?$/, '/ws'));
+  ws.binaryType = 'arraybuffer';
+  ws.onmessage = e => apply(e.data);
+  requestAnimationFrame(draw);
+});
+</script></body></html>
+"""
@@ -0,0 +1,502 @@
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+from .engine import (DECIDING, WALKING, ACTIVITY, LEAVING, FINISHED, DRAW_DWELL, DRAW_GO_HOME, DRAW_PICK,
+                     agent_seed_key, agent_uniform)
+from .model import ParkModel
+from .routing import next_hop_rows
+from .zones import crowd_allowed
+
+# Satu record per pengunjung; dikirim apa adanya saat agen pindah region
+AGENT_DTYPE = np.dtype([
+    ('uid', np.int64), ('state', np.int8), ('node', np.int32), ('target_node', np.int32),
+    ('target_zone', np.int32), ('dwell', np.int32), ('activity', np.int16), ('profile', np.int32),
+])
+
+# --- Partisi Graf ---
+def partition_nodes(xy, n_regions):
+    """
+    Recursive coordinate bisection: node dibelah berulang pada sumbu terpanjang
+    sampai ada n_regions region dengan jumlah node (hampir) sama. Return region per node.
+    """
+    xy = np.asarray(xy, dtype=np.float64)
+    region = np.zeros(len(xy), dtype=np.int32)
+
+    def split(idx, k, first):
+        if k == 1 or len(idx) == 0:
+            region[idx] = first
+            return
+        k_left = k // 2
+        pts = xy[idx]
+        axis = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+        order = idx[np.argsort(pts[:, axis], kind='stable')]
+        cut = len(order) * k_left // k
+        split(order[:cut], k_left, first)
+        split(order[cut:], k - k_left, first + k_left)
+
+    split(np.arange(len(xy)), max(1, int(n_regions)), 0)
+    return region
+
+
+# --- Kernel Region ---
+class RegionPopulation:
+    """
+    Populasi satu region: agen (array AGENT_DTYPE) yang sedang berada di node region ini.
+
+    Aturan per step sama dengan VectorPopulation berkeacakan per agen (agent_rng=True:
+    hop next-hop, hitung mundur aktivitas, panik hujan, pulang 30%, keputusan filter
+    crowd/heat + amenities + random), tetapi tabel rute hanya berisi kolom node region
+    ini menuju node target (nav node zona & gate). Agen yang selesai melangkah ke node
+    region lain dikeluarkan dan diserahkan lewat koordinator di barrier step.
+    """
+
+    def __init__(self, region, region_of, local_nodes, targets, hop, nearest_gate, zones, closed_gates,
+                 activity_rules, profile_crowd, profile_heat, seed_key):
+        self.region = region
+        self.region_of = region_of
+        self.local_nodes = local_nodes
+        self.col = np.full(len(region_of), -1, dtype=np.int32) # Indeks node global -> kolom lokal
+        self.col[local_nodes] = np.arange(len(local_nodes), dtype=np.int32)
+        self.row_of = np.full(len(region_of), -1, dtype=np.int32) # Node target -> baris tabel hop
+        self.row_of[targets] = np.arange(len(targets), dtype=np.int32)
+        self.hop = hop
+        self.nearest_gate = nearest_gate
+        self.zones = zones
+        self.closed = set(closed_gates)
+        self.activity_rules = activity_rules
+        self.profile_crowd = profile_crowd
+        self.profile_heat = profile_heat
+        self.seed_key = seed_key
+        self.agents = np.empty(0, dtype=AGENT_DTYPE)
+
+        self.activity_names = []
+        self.activity_code = {}
+        self._base_dwell = np.empty(0, dtype=np.int32)
+        self._cand = []
+
+    def code_of(self, name):
+        code = self.activity_code.get(name)
+        if code is None:
+            code = len(self.activity_names)
+            self.activity_names.append(name)
+            self.activity_code[name] = code
+            dwell = int(self.activity_rules.get(name, {}).get('base_dwell_min', 15))
+            self._base_dwell = np.append(self._base_dwell, dwell)
+            # Kandidat per kode (tanpa & dengan gate tertutup) dihitung sekali
+            self._cand.append((len(self.zones.candidates(name)), self.zones.candidates(name, self.closed)))
+        return code
+
+    def sync_activities(self, names):
+        for name in names[len(self.activity_names):]:
+            self.code_of(name)
+
+    def set_gates(self, closed_gates, nearest_gate):
+        """Gate dibuka/ditutup: ganti gate terdekat (indeks node global) & kandidat zona."""
+        self.closed = set(closed_gates)
+        self.nearest_gate = nearest_gate[self.local_nodes]
+        self._cand = [(n, self.zones.candidates(name, self.closed))
+                      for name, (n, _) in zip(self.activity_names, self._cand)]
+
+    def __len__(self):
+        return len(self.agents)
+
+    # --- Step ---
+    def step(self, step, is_raining, temperature, zone_counts, incoming):
+        """
+        Satu step region. Return (bincount zona lokal, populasi, {region tujuan: agen keluar}).
+        Hitungan & populasi mencakup agen yang keluar (masih hidup, hanya pindah region).
+        """
+        if len(incoming):
+            self.agents = np.concatenate([self.agents, incoming])
+        a = self.agents
+        n_zones = len(self.zones.zone_ids)
+        if len(a) == 0:
+            return np.zeros(n_zones, dtype=np.int64), 0, {}
+        st, node, target, tz = a['state'], a['node'], a['target_node'], a['target_zone']
+        dwell, act, uid = a['dwell'], a['activity'], a['uid']
+
+        deciding = st == DECIDING
+        moving = (st == WALKING) | (st == LEAVING)
+        in_activity = st == ACTIVITY
+
+        # 1. WALKING/LEAVING: maju satu hop, atau sampai tujuan
+        arrived = moving & (node == target)
+        idx = np.flatnonzero(moving & ~arrived)
+        node[idx] = self.hop[self.row_of[target[idx]], self.col[node[idx]]]
+
+        arrive_zone = np.flatnonzero(arrived & (tz >= 0))
+        st[arrive_zone] = ACTIVITY
+        offset = np.floor(agent_uniform(self.seed_key, uid[arrive_zone], step, DRAW_DWELL) * 11).astype(np.int32) - 5
+        dwell[arrive_zone] = self._base_dwell[act[arrive_zone]] + offset
+        st[arrived & (tz < 0)] = FINISHED
+
+        # 2. ACTIVITY
+        shelter_code = self.activity_code['shelter_seeking']
+        panic = np.zeros(len(a), dtype=bool)
+        if is_raining:
+            open_zone = np.ones(len(a), dtype=bool)
+            has_zone = tz >= 0
+            open_zone[has_zone] = ~self.zones.is_shelter[tz[has_zone]]
+            panic = in_activity & (act != shelter_code) & has_zone & open_zone
+        ticking = in_activity & ~panic
+        busy = ticking & (dwell > 0)
+        dwell[busy] -= 1
+
+        done = np.flatnonzero(ticking & ~busy)
+        if is_raining:
+            done = done[act[done] != shelter_code]
+        if len(done):
+            go = agent_uniform(self.seed_key, uid[done], step, DRAW_GO_HOME) < 0.3
+            self._go_home(done[go])
+            st[done[~go]] = DECIDING
+
+        # 3. Keputusan
+        need = np.flatnonzero(deciding | panic)
+        if len(need):
+            self._decide(need, step, is_raining, temperature, zone_counts)
+
+        # 4. Buang FINISHED, hitung okupansi, pisahkan agen yang pindah region
+        a = a[a['state'] != FINISHED]
+        st, tz = a['state'], a['target_zone']
+        mask = ((st == WALKING) | (st == ACTIVITY)) & (tz >= 0)
+        counts = np.bincount(tz[mask], minlength=n_zones)
+        dest = self.region_of[a['node']]
+        leaving = dest != self.region
+        outgoing = {}
+        if leaving.any():
+            out = a[leaving]
+            out_dest = dest[leaving]
+            for r in np.unique(out_dest).tolist():
+                outgoing[r] = out[out_dest == r]
+            a = a[~leaving]
+        self.agents = a
+        return counts, len(a) + sum(len(v) for v in outgoing.values()), outgoing
+
+    def _go_home(self, idx):
+        if len(idx) == 0:
+            return
+        a = self.agents
+        gate = self.nearest_gate[self.col[a['node'][idx]]]
+        ok = gate >= 0
+        a['activity'][idx] = self.activity_code['leaving']
+        a['target_zone'][idx] = -1
+        a['target_node'][idx[ok]] = gate[ok]
+        a['state'][idx[ok]] = LEAVING
+        a['state'][idx[~ok]] = FINISHED
+
+    def _decide(self, idx, step, is_raining, temperature, zone_counts):
+        a = self.agents
+        act = a['activity']
+        if is_raining:
+            act[idx] = self.activity_code['shelter_seeking']
+
+        zones = self.zones
+        walking = self.activity_code['walking']
+        shelter = self.activity_code['shelter_seeking']
+
+        for code in np.unique(act[idx]):
+            if code != shelter and self._cand[code][0] == 0:
+                act[idx[act[idx] == code]] = walking
+
+        for code in np.unique(act[idx]):
+            group = idx[act[idx] == code]
+            cand = self._cand[code][1]
+            if len(cand) == 0:
+                self._go_home(group)
+                continue
+
+            profile = a['profile'][group]
+            ok = np.ones((len(group), len(cand)), dtype=bool)
+            if not is_raining:
+                ok &= crowd_allowed(zone_counts[cand][None, :], zones.capacity[cand][None, :],
+                                    self.profile_crowd[profile][:, None])
+                if temperature > 0.7:
+                    hates_heat = self.profile_heat[profile] > 0.6
+                    ok &= ~(hates_heat[:, None] & zones.is_hot[cand][None, :])
+            ok[~ok.any(axis=1)] = True
+
+            noise = agent_uniform(self.seed_key, a['uid'][group][:, None], step, DRAW_PICK, cand[None, :])
+            score = zones.amenities[cand][None, :] + noise
+            score[~ok] = -np.inf
+            pick = cand[np.argmax(score, axis=1)]
+
+            nav = zones.nav_idx[pick]
+            node = a['node'][group]
+            # Rute gagal -> tetap WALKING dan "sampai" di node saat ini pada step berikutnya
+            unreachable = self.hop[self.row_of[nav], self.col[node]] < 0
+            a['target_zone'][group] = pick
+            a['target_node'][group] = np.where(unreachable, node, nav)
+            a['state'][group] = WALKING
+
+
+# --- Worker ---
+def _step_regions(regions, msg):
+    """Jalankan satu pesan 'step' untuk semua region milik worker -> {region: balasan}."""
+    _, step, rain, temperature, counts, activities, gates, incoming = msg
+    replies = {}
+    for r, region in regions.items():
+        region.sync_activities(activities)
+        if gates is not None:
+            region.set_gates(*gates)
+        replies[r] = region.step(step, rain, temperature, counts, incoming.get(r, ()))
+    return replies
+
+
+def _worker_main(conn, regions):
+    """Loop proses worker: satu atau lebih RegionPopulation, satu pesan per step."""
+    regions = {r.region: r for r in regions}
+    while True:
+        msg = conn.recv()
+        kind = msg[0]
+        if kind == 'step':
+            conn.send(_step_regions(regions, msg))
+        elif kind == 'agents':
+            conn.send({r: region.agents for r, region in regions.items()})
+        else:
+            conn.close()
+            return
+
+
+class _InlineWorker:
+    """Worker tanpa proses (processes=0): protokol pesan yang sama, dijalankan di proses ini."""
+
+    def __init__(self, regions):
+        self.regions = {r.region: r for r in regions}
+        self._reply = None
+
+    def send(self, msg):
+        if msg[0] == 'step':
+            self._reply = _step_regions(self.regions, msg)
+        elif msg[0] == 'agents':
+            self._reply = {r: region.agents for r, region in self.regions.items()}
+
+    def recv(self):
+        return self._reply
+
+
+class _ShardedPopulation:
+    """
+    Pengganti model.population di koordinator: spawn_agents() menyetor kedatangan ke
+    sini (bukan ke engine), lalu ShardedSimulation membagikannya ke region gate masing-masing.
+    Ukuran populasi & okupansi diisi dari jumlah balasan region di akhir step.
+    """
+
+    def __init__(self):
+        self.pending = []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def spawn(self, gate_nodes, profile_idx, activity_name):
+        if len(profile_idx):
+            self.pending.append((gate_nodes, profile_idx, activity_name))
+
+
+# --- Koordinator ---
+class ShardedSimulation:
+    """
+    Simulasi multi-proses: graf taman dipartisi menjadi region (partition_nodes), tiap
+    region disimulasikan worker sendiri dengan agen & okupansi lokalnya.
+
+    Koordinator memegang ParkModel ringan (tanpa engine agen) untuk timeline lingkungan,
+    kedatangan (RNG model, sama dengan engine vektor), okupansi global, DataCollector & log.
+    Per step: koordinator memajukan lingkungan + spawn, mengirim ke tiap worker satu pesan
+    (cuaca, hitungan zona global step sebelumnya, gate terdekat baru jika gate dibuka/ditutup
+    lewat sim.model.close_gate/open_gate, agen baru + agen serah-terima), lalu menunggu semua
+    balasan (barrier) dan menjumlahkan okupansi. Agen yang hop-nya menyeberang ke region lain
+    dikumpulkan per region tujuan dan dikirim sekaligus di step berikutnya.
+
+    Keacakan agen diambil dari agent_uniform, sehingga untuk seed yang sama hasilnya identik
+    dengan ParkModel(engine='vector', agent_rng=True, seed=seed) untuk jumlah region dan proses
+    berapa pun. Engine vektor default (agent_rng=False, aliran model.rng bersama) hanya setara
+    secara statistik. Perubahan edge/bobot graf setelah konstruksi tidak diteruskan ke worker.
+    """
+
+    def __init__(self, n_regions=2, processes=None, seed=None, dataset=None, data_dir="data",
+                 verbose=0, log_interval=1, **model_kwargs):
+        self.model = model = ParkModel(data_dir=data_dir, dataset=dataset, seed=seed, routing="networkx",
+                                       verbose=verbose, log_interval=log_interval, **model_kwargs)
+        model.population = self.population = _ShardedPopulation()
+        self.seed_key = agent_seed_key(seed)
+        self.next_uid = 1
+        self.handoffs = 0
+
+        # Kode aktivitas bersama (urutan sama dengan VectorPopulation)
+        self.activity_names = []
+        self.activity_code = {}
+        for name in ['walking', 'shelter_seeking', 'leaving', *model.activity_rules.keys()]:
+            self._code_of(name)
+
+        # Partisi & tabel rute menuju target saja (nav node zona, termasuk gate)
+        node_ids = model.node_ids
+        index = model.node_id_index
+        xy = np.array([model.node_xy(n) for n in node_ids], dtype=np.float64)
+        self.n_regions = max(1, int(n_regions))
+        self.region_of = partition_nodes(xy, self.n_regions)
+        zones = model.zone_table
+        zones.nav_idx = np.array([index[n] for n in zones.nav_node], dtype=np.int32)
+        targets = np.unique(zones.nav_idx)
+        hop, _ = next_hop_rows(model.G, [node_ids[t] for t in targets], index)
+        nearest_gate = model.gate_field.nearest_gate
+
+        regions = []
+        for r in range(self.n_regions):
+            local = np.flatnonzero(self.region_of == r)
+            regions.append(RegionPopulation(
+                r, self.region_of, local, targets, np.ascontiguousarray(hop[:, local]).astype(np.int32),
+                nearest_gate[local], zones, model.closed_gates, model.activity_rules,
+                model.profile_pool.crowd_dislike, model.profile_pool.heat_dislike, self.seed_key))
+        del hop
+
+        # Region dibagi round-robin ke worker; processes=0 -> semua region di proses ini.
+        # Default: satu worker per CPU, tanpa proses jika hanya ada satu CPU (IPC tanpa paralelisme)
+        if processes is None:
+            cpus = mp.cpu_count() or 1
+            processes = min(self.n_regions, cpus) if cpus > 1 else 0
+        self.processes = max(0, min(int(processes), self.n_regions))
+        self._procs = []
+        if self.processes == 0:
+            self._workers = [_InlineWorker(regions)]
+        else:
+            self._workers = []
+            # mesa mengganti start method global ke 'spawn' (impor ulang + pickle tabel hop per
+            # worker); fork mewarisi region langsung dari koordinator jika platform mendukung
+            ctx = mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else None)
+            for w in range(self.processes):
+                parent, child = ctx.Pipe()
+                proc = ctx.Process(target=_worker_main, args=(child, regions[w::self.processes]), daemon=True)
+                proc.start()
+                child.close()
+                self._workers.append(parent)
+                self._procs.append(proc)
+        self._worker_of = np.arange(self.n_regions) % max(1, self.processes)
+        self._incoming = {} # region -> list array agen untuk step berikutnya
+        self._closed_gates = frozenset(model.closed_gates) # Penutupan gate yang sudah dikirim ke worker
+        self._sent_names = 0
+        self.history = []
+
+    def _code_of(self, name):
+        code = self.activity_code.get(name)
+        if code is None:
+            code = self.activity_code[name] = len(self.activity_names)
+            self.activity_names.append(name)
+        return code
+
+    @property
+    def steps(self):
+        return self.model.steps
+
+    @property
+    def running(self):
+        return self.model.running
+
+    # --- Step ---
+    def _spawned(self):
+        """Kedatangan menit ini -> record AGENT_DTYPE per region gate."""
+        index = self.model.node_id_index
+        for gate_nodes, profile_idx, activity_name in self.population.pending:
+            n = len(profile_idx)
+            new = np.zeros(n, dtype=AGENT_DTYPE)
+            new['uid'] = np.arange(self.next_uid, self.next_uid + n)
+            new['state'] = DECIDING
+            new['node'] = [index[g] for g in gate_nodes]
+            new['target_node'] = -1
+            new['target_zone'] = -1
+            new['activity'] = self._code_of(activity_name)
+            new['profile'] = profile_idx
+            self.next_uid += n
+            dest = self.region_of[new['node']]
+            for r in np.unique(dest).tolist():
+                self._incoming.setdefault(r, []).append(new[dest == r])
+        self.population.pending.clear()
+
+    def step(self):
+        m = self.model
+        if m.schedule_ended():
+            m.close_park() # Jadwal habis: taman tutup tanpa step tambahan
+            return
+        m.steps += 1
+        m.update_environment()
+        m.spawn_agents()
+        self._spawned()
+
+        incoming = {r: np.concatenate(parts) for r, parts in self._incoming.items()}
+        self._incoming = {}
+        names = self.activity_names if len(self.activity_names) != self._sent_names else ()
+        self._sent_names = len(self.activity_names)
+        gates = None
+        if self._closed_gates != m.closed_gates:
+            self._closed_gates = frozenset(m.closed_gates)
+            gates = (sorted(self._closed_gates), m.gate_field.nearest_gate)
+
+        # Kirim ke semua worker dulu (paralel), baru tunggu balasan (barrier)
+        counts = m.occupancy.counts
+        for w, conn in enumerate(self._workers):
+            mine = {r: v for r, v in incoming.items() if self._worker_of[r] == w}
+            conn.send(('step', m.steps, m.is_raining, m.temperature, counts, names, gates, mine))
+
+        total = np.zeros(len(m.occupancy.zone_ids), dtype=np.int64)
+        population = handoffs = 0
+        for conn in self._workers:
+            for r, (local_counts, size, outgoing) in conn.recv().items():
+                total += local_counts
+                population += size
+                for dest, agents in outgoing.items():
+                    self._incoming.setdefault(dest, []).append(agents)
+                    handoffs += len(agents)
+        self.handoffs += handoffs
+        self.population.size = population
+
+        m.occupancy.set_counts(total)
+        m.occupancy.record(m.steps)
+        m.datacollector.collect(m)
+        self.history.append((m.steps, population, handoffs))
+        if m.verbose and m.steps % m.log_interval == 0:
+            m.log_status()
+
+    def advance(self, n):
+        """Majukan n step (berhenti lebih awal jika running=False atau jadwal habis). Return jumlah step."""
+        done = 0
+        while done < n and self.model.running:
+            self.step()
+            if not self.model.running:
+                break
+            done += 1
+        return done
+
+    # --- Hasil ---
+    def results(self):
+        """DataFrame per step: Populasi/Hujan/Suhu (DataCollector) + serah-terima antar region."""
+        df = self.model.datacollector.get_model_vars_dataframe().reset_index(drop=True)
+        hist = pd.DataFrame(self.history, columns=['step', 'population', 'handoffs'])
+        return pd.concat([hist[['step', 'handoffs']], df], axis=1)
+
+    def agents(self):
+        """Seluruh agen hidup (AGENT_DTYPE, urut uid) dari semua region + yang sedang transit."""
+        for conn in self._workers:
+            conn.send(('agents',))
+        parts = [a for conn in self._workers for a in conn.recv().values()]
+        parts += [a for chunk in self._incoming.values() for a in chunk]
+        agents = np.concatenate(parts) if parts else np.empty(0, dtype=AGENT_DTYPE)
+        return agents[np.argsort(agents['uid'], kind='stable')]
+
+    def region_sizes(self):
+        """Jumlah node per region."""
+        return np.bincount(self.region_of, minlength=self.n_regions)
+
+    def close(self):
+        for conn in self._workers:
+            if self._procs:
+                conn.send(('stop',))
+                conn.close()
+        for proc in self._procs:
+            proc.join()
+        self._procs = []
+        self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
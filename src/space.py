@@ -0,0 +1,346 @@
+import math
+from collections import defaultdict
+import numpy as np
+from mesa.space import NetworkGrid
+
+
+class SpatialIndex:
+    """
+    Indeks spasial grid-hash seragam untuk titik 2D (koordinat meter).
+
+    Setiap titik disimpan di sel berukuran `cell_size`, sehingga query
+    nearest-k, radius, dan bounding-box hanya memeriksa sel di sekitar query
+    (bukan seluruh titik). Titik boleh punya `tag` (misal facility_type / zone_type)
+    agar query bisa dibatasi ke satu jenis objek.
+    """
+
+    def __init__(self, cell_size=10.0):
+        self.cell_size = float(cell_size)
+        self.points = {}    # key -> (x, y, tag)
+        self._layers = {None: defaultdict(list)}  # tag -> {(cx, cy): [key, ...]}
+        self._bounds = None # (min_cx, min_cy, max_cx, max_cy) sel terisi
+
+    @classmethod
+    def from_points(cls, items, cell_size=None):
+        """
+        Bangun indeks dari iterable (key, x, y) atau (key, x, y, tag).
+        Jika cell_size kosong, dipilih otomatis ~ sqrt(luas / jumlah titik).
+        """
+        items = list(items)
+        if cell_size is None:
+            cell_size = 10.0
+            if len(items) > 1:
+                xs = [it[1] for it in items]; ys = [it[2] for it in items]
+                area = max(max(xs) - min(xs), 1.0) * max(max(ys) - min(ys), 1.0)
+                cell_size = max(math.sqrt(area / len(items)), 1.0)
+        index = cls(cell_size)
+        for it in items:
+            index.insert(*it)
+        return index
+
+    def __len__(self):
+        return len(self.points)
+
+    def __contains__(self, key):
+        return key in self.points
+
+    def tags(self):
+        return [t for t in self._layers if t is not None]
+
+    def items(self, tag=None):
+        """Iterasi (key, x, y) untuk semua titik (atau satu tag)."""
+        for key, (x, y, t) in self.points.items():
+            if tag is None or t == tag:
+                yield key, x, y
+
+    # --- Update ---
+    def _cell(self, x, y):
+        return (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+
+    def insert(self, key, x, y, tag=None):
+        if key in self.points:
+            self.remove(key)
+        cell = self._cell(x, y)
+        self.points[key] = (x, y, tag)
+        self._layers[None][cell].append(key)
+        if tag is not None:
+            self._layers.setdefault(tag, defaultdict(list))[cell].append(key)
+
+        if self._bounds is None:
+            self._bounds = (cell[0], cell[1], cell[0], cell[1])
+        else:
+            b = self._bounds
+            self._bounds = (min(b[0], cell[0]), min(b[1], cell[1]),
+                            max(b[2], cell[0]), max(b[3], cell[1]))
+
+    def remove(self, key):
+        x, y, tag = self.points.pop(key)
+        cell = self._cell(x, y)
+        for layer_tag in (None, tag) if tag is not None else (None,):
+            layer = self._layers[layer_tag]
+            layer[cell].remove(key)
+            if not layer[cell]:
+                del layer[cell]
+
+    def move(self, key, x, y):
+        """Pindahkan titik (untuk objek dinamis seperti agen)."""
+        tag = self.points[key][2]
+        old_cell = self._cell(*self.points[key][:2])
+        if old_cell == self._cell(x, y):
+            self.points[key] = (x, y, tag)
+        else:
+            self.insert(key, x, y, tag)
+
+    # --- Query ---
+    def _cell_range(self, xmin, ymin, xmax, ymax):
+        """Rentang sel yang menutupi kotak, dipotong ke batas sel yang terisi."""
+        b = self._bounds
+        c0 = self._cell(xmin, ymin)
+        c1 = self._cell(xmax, ymax)
+        return (range(max(c0[0], b[0]), min(c1[0], b[2]) + 1),
+                range(max(c0[1], b[1]), min(c1[1], b[3]) + 1))
+
+    def _ring(self, layer, cx, cy, r):
+        """Isi sel-sel pada cincin Chebyshev ke-r di sekitar (cx, cy)."""
+        if r == 0:
+            yield from layer.get((cx, cy), ())
+            return
+        for dx in range(-r, r + 1):
+            yield from layer.get((cx + dx, cy - r), ())
+            yield from layer.get((cx + dx, cy + r), ())
+        for dy in range(-r + 1, r):
+            yield from layer.get((cx - r, cy + dy), ())
+            yield from layer.get((cx + r, cy + dy), ())
+
+    def nearest(self, x, y, k=1, tag=None):
+        """k titik terdekat -> list (key, jarak) terurut dari yang paling dekat."""
+        layer = self._layers.get(tag)
+        if not layer or self._bounds is None:
+            return []
+        cx, cy = self._cell(x, y)
+        b = self._bounds
+        max_r = max(abs(cx - b[0]), abs(cx - b[2]), abs(cy - b[1]), abs(cy - b[3]))
+
+        found = []
+        points = self.points
+        for r in range(max_r + 1):
+            for key in self._ring(layer, cx, cy, r):
+                px, py, _ = points[key]
+                found.append((math.hypot(px - x, py - y), key))
+            # Semua titik di cincin > r berjarak minimal r * cell_size dari query
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] <= r * self.cell_size:
+                    break
+        found.sort()
+        return [(key, d) for d, key in found[:k]]
+
+    def nearest_key(self, x, y, tag=None):
+        res = self.nearest(x, y, 1, tag)
+        return res[0][0] if res else None
+
+    def within_radius(self, x, y, radius, tag=None):
+        """Semua titik dalam radius (meter) -> list (key, jarak)."""
+        layer = self._layers.get(tag)
+        if not layer:
+            return []
+        xs, ys = self._cell_range(x - radius, y - radius, x + radius, y + radius)
+        result = []
+        points = self.points
+        for cx in xs:
+            for cy in ys:
+                for key in layer.get((cx, cy), ()):
+                    px, py, _ = points[key]
+                    d = math.hypot(px - x, py - y)
+                    if d <= radius:
+                        result.append((key, d))
+        return result
+
+    def in_bbox(self, xmin, ymin, xmax, ymax, tag=None):
+        """Semua key yang berada di dalam kotak [xmin, xmax] x [ymin, ymax]."""
+        layer = self._layers.get(tag)
+        if not layer:
+            return []
+        xs, ys = self._cell_range(xmin, ymin, xmax, ymax)
+        result = []
+        points = self.points
+        for cx in xs:
+            for cy in ys:
+                for key in layer.get((cx, cy), ()):
+                    px, py, _ = points[key]
+                    if xmin <= px <= xmax and ymin <= py <= ymax:
+                        result.append(key)
+        return result
+
+
+class OccupancyGrid(NetworkGrid):
+    """
+    NetworkGrid + counter okupansi live per node dan per edge.
+
+    Counter hanya disentuh oleh place_agent / remove_agent / move_agent, sehingga
+    query kepadatan node/edge O(1) tanpa scan agen. Edge menghitung lintasan
+    (agen yang berpindah lewat edge itu) pada step berjalan, plus total kumulatif.
+
+    Heatmap "agen-menit" per node diakumulasi secara lazy: saat counter sebuah node
+    berubah, nilai lamanya dikalikan jumlah step sejak perubahan terakhir. Tidak
+    ada kerja O(node) per step. open_window()/window() memberi heatmap jendela waktu.
+    Counter disimpan sebagai list Python (cepat untuk update skalar di engine objek);
+    engine vektor mengisinya sebagai array lewat sync_population().
+    """
+
+    DENSE_EDGE_LOOKUP = 4_000_000 # Batas n*n untuk matriks lookup edge (engine vektor)
+
+    def __init__(self, g):
+        super().__init__(g)
+        self.node_ids = list(g.nodes)
+        self.index = {n: i for i, n in enumerate(self.node_ids)}
+        self.edges = [(u, v) for u, v in g.edges]
+        self.edge_index = {}
+        for e, (u, v) in enumerate(self.edges):
+            self.edge_index[(u, v)] = e
+            self.edge_index[(v, u)] = e
+        n, m = len(self.node_ids), len(self.edges)
+        # Kunci edge terurut (i * n + j) untuk lookup vektor (engine populasi array)
+        ij = np.array([(self.index[u], self.index[v]) for u, v in self.edges], dtype=np.int64).reshape(-1, 2)
+        keys = np.concatenate([ij[:, 0] * n + ij[:, 1], ij[:, 1] * n + ij[:, 0]])
+        order = np.argsort(keys)
+        self._edge_keys = keys[order]
+        self._edge_ids = np.concatenate([np.arange(m), np.arange(m)])[order]
+        # Graf kecil: matriks [u, v] -> id edge (lookup langsung); graf besar pakai searchsorted
+        self._edge_matrix = None
+        if n * n <= self.DENSE_EDGE_LOOKUP:
+            self._edge_matrix = np.full((n, n), -1, dtype=np.int32)
+            self._edge_matrix[ij[:, 0], ij[:, 1]] = np.arange(m)
+            self._edge_matrix[ij[:, 1], ij[:, 0]] = np.arange(m)
+
+        self.current_step = 0
+        self._node_count = [0] * n   # Agen di node saat ini
+        self._node_since = [0] * n   # Step perubahan terakhir counter node
+        self._node_minutes = [0] * n # Agen-menit sampai sebelum _node_since
+        self._edge_count = [0] * m   # Lintasan edge pada _edge_step
+        self._edge_step = [-1] * m
+        self._edge_flow = [0] * m    # Total lintasan kumulatif
+        self._windows = {}
+
+    # --- Update (hanya lewat operasi grid) ---
+    def _add(self, i, delta):
+        t = self.current_step
+        self._node_minutes[i] += self._node_count[i] * (t - self._node_since[i])
+        self._node_since[i] = t
+        self._node_count[i] += delta
+
+    def place_agent(self, agent, node_id):
+        super().place_agent(agent, node_id)
+        self._add(self.index[node_id], 1)
+
+    def remove_agent(self, agent):
+        self._add(self.index[agent.pos], -1)
+        super().remove_agent(agent)
+
+    def move_agent(self, agent, node_id):
+        old = agent.pos
+        self.G.nodes[old]["agent"].remove(agent)
+        self.G.nodes[node_id]["agent"].append(agent)
+        agent.pos = node_id
+        self._add(self.index[old], -1)
+        self._add(self.index[node_id], 1)
+        e = self.edge_index.get((old, node_id))
+        if e is not None:
+            if self._edge_step[e] != self.current_step:
+                self._edge_step[e] = self.current_step
+                self._edge_count[e] = 0
+            self._edge_count[e] += 1
+            self._edge_flow[e] += 1
+
+    def sync_population(self, prev_nodes, nodes, alive):
+        """
+        Engine vektor (agen tidak ada di grid): set counter dari array posisi.
+        prev_nodes/nodes = indeks node sebelum/sesudah step, alive = mask agen belum FINISHED.
+        """
+        t = self.current_step
+        count = np.asarray(self._node_count, dtype=np.int64)
+        self._node_minutes = np.asarray(self._node_minutes, dtype=np.int64) + \
+            count * (t - np.asarray(self._node_since, dtype=np.int64))
+        self._node_since = np.full(len(self.node_ids), t, dtype=np.int64)
+        self._node_count = np.bincount(nodes[alive], minlength=len(self.node_ids)).astype(np.int64)
+
+        moved = np.flatnonzero(prev_nodes != nodes)
+        traversed = np.zeros(len(self.edges), dtype=np.int64)
+        if self._edge_matrix is not None:
+            ids = self._edge_matrix[prev_nodes[moved], nodes[moved]]
+            traversed = np.bincount(ids[ids >= 0], minlength=len(self.edges))
+        elif len(self._edge_keys):
+            keys = prev_nodes[moved].astype(np.int64) * len(self.node_ids) + nodes[moved]
+            pos = np.minimum(np.searchsorted(self._edge_keys, keys), len(self._edge_keys) - 1)
+            found = self._edge_keys[pos] == keys
+            traversed = np.bincount(self._edge_ids[pos[found]], minlength=len(self.edges))
+        self._edge_count = traversed
+        self._edge_step = np.full(len(self.edges), t, dtype=np.int64)
+        self._edge_flow = np.asarray(self._edge_flow, dtype=np.int64) + traversed
+
+    # --- Query O(1) ---
+    def density(self, node_id):
+        """Jumlah agen di sebuah node saat ini."""
+        return int(self._node_count[self.index[node_id]])
+
+    def edge_density(self, u, v):
+        """Jumlah agen yang melintasi edge (u, v) pada step berjalan."""
+        e = self.edge_index[(u, v)]
+        return int(self._edge_count[e]) if self._edge_step[e] == self.current_step else 0
+
+    def node_counts(self):
+        """Array okupansi per node (urutan self.node_ids)."""
+        return np.array(self._node_count, dtype=np.int64)
+
+    def edge_counts(self):
+        """Array lintasan per edge pada step berjalan (urutan self.edges)."""
+        step = np.asarray(self._edge_step)
+        return np.where(step == self.current_step, np.asarray(self._edge_count, dtype=np.int64), 0)
+
+    # --- Hotspot & Heatmap ---
+    def hotspots(self, k=10, kind="node", values=None):
+        """
+        Top-k node (kind='node') atau edge (kind='edge') -> list (id, nilai), terbesar dulu.
+        values default = okupansi saat ini; bisa diisi array heatmap (misal window()['node']).
+        """
+        if values is None:
+            values = self.node_counts() if kind == "node" else self.edge_counts()
+        labels = self.node_ids if kind == "node" else self.edges
+        k = min(k, len(values))
+        if k <= 0:
+            return []
+        top = np.argpartition(-values, k - 1)[:k]
+        top = top[np.argsort(-values[top], kind="stable")]
+        return [(labels[i], values[i].item()) for i in top if values[i] > 0]
+
+    def heatmap(self):
+        """
+        Heatmap kumulatif sampai akhir step berjalan: {'node': agen-menit per node,
+        'edge': total lintasan per edge, 'step': current_step}.
+        """
+        count = np.asarray(self._node_count, dtype=np.int64)
+        since = np.asarray(self._node_since, dtype=np.int64)
+        minutes = np.asarray(self._node_minutes, dtype=np.int64) + count * (self.current_step - since + 1)
+        return {'node': minutes, 'edge': np.array(self._edge_flow, dtype=np.int64), 'step': self.current_step}
+
+    def open_window(self, name="default"):
+        """Mulai jendela heatmap (misal 'siang'); baca hasilnya dengan window(name)."""
+        self._windows[name] = self.heatmap()
+
+    def window(self, name="default"):
+        """Heatmap sejak open_window(name): {'node': agen-menit, 'edge': lintasan, 'steps': n}."""
+        start, now = self._windows[name], self.heatmap()
+        return {'node': now['node'] - start['node'], 'edge': now['edge'] - start['edge'],
+                'steps': now['step'] - start['step']}
+
+    # --- Checkpoint ---
+    def get_state(self):
+        return {name: np.asarray(getattr(self, f'_{name}'), dtype=np.int64) for name in self.STATE_FIELDS}
+
+    def set_state(self, state, current_step):
+        self.current_step = current_step
+        for name in self.STATE_FIELDS:
+            values = np.asarray(state[name], dtype=np.int64)
+            setattr(self, f'_{name}', values.tolist() if isinstance(getattr(self, f'_{name}'), list) else values)
+
+    STATE_FIELDS = ('node_count', 'node_since', 'node_minutes', 'edge_count', 'edge_step', 'edge_flow')
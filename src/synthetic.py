@@ -0,0 +1,238 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+PX_PER_M = 6.25 # Skala peta asli: 1 px = 0.16 m
+
+# Template tipe zona: (kode, nama, shape, lebar_m, tinggi_m, facility_type, quantity, kapasitas/unit, kapasitas zona)
+ZONE_TYPES = {
+    'gazebo':        ('Z01', 'Gazebo', 'rect', 8.16, 8.16, 'GazeboSeating', 1, 15, 15),
+    'garden':        ('Z02', 'Garden', 'rect', 16.0, 16.0, 'Bench', 2, 3, 20),
+    'fitness_zone':  ('Z03', 'Fitness', 'rect', 32.0, 16.0, 'FitnessEquipment', 10, 1, 15),
+    'picnic_area':   ('Z04', 'Picnic-Area', 'rect', 14.9, 24.0, 'PicnicTable', 9, 4, 36),
+    'playground':    ('Z05', 'Playground', 'rect', 11.0, 16.0, 'Swingset', 4, 3, 15),
+    'bench_zone':    ('Z06', 'Bench', 'rect', 8.0, 2.4, 'Bench', 3, 3, 9),
+    'gate':          ('Z07', 'Gate', 'rect', 4.8, 4.8, 'GateEntryExit', 1, 15, 15),
+    'fountain_zone': ('Z08', 'Fountain', 'circle', 32.0, 32.0, 'FountainPlaza', 1, 80, 120),
+    'public_toilet': ('Z09', 'Public-Toilet', 'rect', 5.28, 2.88, 'PublicToilet', 2, 4, 8),
+}
+
+# Komposisi zona default (jumlah per 100 node, mendekati taman asli tanpa gate)
+DEFAULT_ZONE_MIX = {
+    'bench_zone': 11.0, 'public_toilet': 2.5, 'playground': 1.6, 'garden': 1.6,
+    'gazebo': 1.6, 'picnic_area': 0.8, 'fitness_zone': 0.8, 'fountain_zone': 0.8,
+}
+
+# Fasilitas umum per 100 node
+DEFAULT_FACILITY_MIX = {'tree': 30.0, 'lighting': 26.0, 'trash_bin': 7.0}
+FACILITY_SIZE_M = {'tree': 3.2, 'lighting': 0.8, 'trash_bin': 0.8}
+
+LIKERT_COLUMNS = [
+    'pref_visit_morning', 'pref_visit_noon', 'pref_visit_evening', 'crowd_dislike', 'heat_dislike',
+    'interest_play', 'interest_jogging', 'interest_relax', 'interest_photo', 'interest_fitness',
+    'importance_kursi', 'importance_toilet', 'importance_foodstall',
+]
+
+
+def _px(values_m):
+    return np.round(np.asarray(values_m) * PX_PER_M, 3)
+
+
+# ==========================================
+# GRAF JALUR
+# ==========================================
+def generate_network(n_nodes, spacing=15.0, loop_fraction=0.15, rng=None):
+    """
+    Graf jalur sintetis: grid ter-jitter ~n_nodes node, spanning tree acak
+    (selalu terhubung) + sebagian edge grid lain sebagai loop.
+    Return (nodes_df, edges_df) dengan skema path_nodes.csv / path_edges.csv.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    side = int(np.ceil(np.sqrt(n_nodes)))
+    ij = np.array([(i, j) for i in range(side) for j in range(side)])[:n_nodes]
+    xy = ij * spacing + rng.uniform(-0.3, 0.3, (n_nodes, 2)) * spacing + spacing
+
+    cell = {(int(i), int(j)): k for k, (i, j) in enumerate(ij)}
+    cand = [(k, cell[(i + di, j + dj)]) for k, (i, j) in enumerate(ij)
+            for di, dj in ((1, 0), (0, 1)) if (i + di, j + dj) in cell]
+    cand = np.array(cand, dtype=np.int64).reshape(-1, 2)
+    order = rng.permutation(len(cand))
+
+    # Kruskal dengan bobot acak -> spanning tree acak
+    parent = np.arange(n_nodes)
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    chosen = np.zeros(len(cand), dtype=bool)
+    for e in order:
+        ra, rb = find(cand[e, 0]), find(cand[e, 1])
+        if ra != rb:
+            parent[ra] = rb
+            chosen[e] = True
+    rest = np.flatnonzero(~chosen)
+    chosen[rest[rng.random(len(rest)) < loop_fraction]] = True
+    edges = cand[chosen]
+
+    width = max(3, len(str(n_nodes)))
+    node_ids = np.array([f"N{k + 1:0{width}d}" for k in range(n_nodes)])
+    nodes_df = pd.DataFrame({'node_id': node_ids, 'x_px': _px(xy[:, 0]), 'y_px': _px(xy[:, 1]),
+                             'x_m': xy[:, 0], 'y_m': xy[:, 1]})
+    length = np.hypot(*(xy[edges[:, 0]] - xy[edges[:, 1]]).T)
+    ewidth = max(4, len(str(len(edges))))
+    edges_df = pd.DataFrame({
+        'edge_id': [f"E{k + 1:0{ewidth}d}" for k in range(len(edges))], 'path_id': 'Paths',
+        'from_node': node_ids[edges[:, 0]], 'to_node': node_ids[edges[:, 1]],
+        'edge_type': 'inner_path', 'length_m': length,
+    })
+    return nodes_df, edges_df
+
+
+# ==========================================
+# ZONA & FASILITAS
+# ==========================================
+def generate_zones(nodes_df, n_gates=5, zone_mix=None, rng=None):
+    """Zona diletakkan di dekat node acak (gate di node tepi). Return (zone_config, park_facilities)."""
+    rng = rng if rng is not None else np.random.default_rng()
+    mix = DEFAULT_ZONE_MIX if zone_mix is None else zone_mix
+    n = len(nodes_df)
+    xy = nodes_df[['x_m', 'y_m']].to_numpy()
+
+    # Gate: node terluar (jarak terjauh dari pusat), tersebar merata berdasarkan sudut
+    center = xy.mean(axis=0)
+    rel = xy - center
+    angle = np.arctan2(rel[:, 1], rel[:, 0])
+    radius = np.hypot(rel[:, 0], rel[:, 1])
+    gate_nodes = []
+    for b in range(n_gates):
+        lo = -np.pi + 2 * np.pi * b / n_gates
+        in_sector = np.flatnonzero((angle >= lo) & (angle < lo + 2 * np.pi / n_gates))
+        if len(in_sector):
+            gate_nodes.append(int(in_sector[np.argmax(radius[in_sector])]))
+
+    counts = {'gate': len(gate_nodes)}
+    for z_type, per_100 in mix.items():
+        expected = per_100 * n / 100.0
+        counts[z_type] = max(1, int(rng.poisson(expected))) if expected > 0 else 0
+
+    rows, facilities = [], []
+    for z_type, count in counts.items():
+        code, title, shape, w, h, f_type, qty, cap_unit, zone_cap = ZONE_TYPES[z_type]
+        width = max(2, len(str(count)))
+        anchors = gate_nodes if z_type == 'gate' else rng.integers(0, n, size=count)
+        for k, node in enumerate(anchors):
+            x, y = xy[node] + (0 if z_type == 'gate' else rng.uniform(-3, 3, 2))
+            zone_id = f"{code}_{title}_{k + 1:0{width}d}"
+            rows.append({
+                'zone_id': zone_id, 'zone_type': z_type, 'shape': shape,
+                'x_center_px': x * PX_PER_M, 'y_center_px': y * PX_PER_M, 'x_center_m': x, 'y_center_m': y,
+                'width_px': w * PX_PER_M, 'height_px': h * PX_PER_M, 'width_m': w, 'height_m': h,
+                'rotation_deg': round(float(rng.uniform(-180, 180)), 2),
+            })
+            facilities.append({
+                'zone_id': zone_id, 'zone_type': z_type, 'facility_type': f_type, 'quantity': qty,
+                'capacity_per_unit': cap_unit, 'total_capacity': qty * cap_unit, 'zone_max_capacity': zone_cap,
+            })
+    return pd.DataFrame(rows), pd.DataFrame(facilities)
+
+
+def generate_facilities(nodes_df, facility_mix=None, rng=None):
+    """Fasilitas umum (pohon, lampu, tong sampah) di sekitar node acak (skema general_facilities.csv)."""
+    rng = rng if rng is not None else np.random.default_rng()
+    mix = DEFAULT_FACILITY_MIX if facility_mix is None else facility_mix
+    xy = nodes_df[['x_m', 'y_m']].to_numpy()
+    frames = []
+    for k, (f_type, per_100) in enumerate(mix.items()):
+        count = int(rng.poisson(per_100 * len(xy) / 100.0))
+        pos = xy[rng.integers(0, len(xy), size=count)] + rng.uniform(-6, 6, (count, 2))
+        size = FACILITY_SIZE_M.get(f_type, 0.8)
+        title = f_type.replace('_', '-').title()
+        frames.append(pd.DataFrame({
+            'facility_id': [f"F{k + 1:02d}_{title}_{i + 1:02d}" for i in range(count)],
+            'facility_type': f_type, 'shape': 'circle',
+            'x_center_px': _px(pos[:, 0]), 'y_center_px': _px(pos[:, 1]),
+            'x_center_m': pos[:, 0], 'y_center_m': pos[:, 1],
+            'size1_px': size * PX_PER_M, 'size2_px': size * PX_PER_M, 'size1_m': size, 'size2_m': size,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+# ==========================================
+# POPULASI & JADWAL
+# ==========================================
+def generate_profiles(template, n_profiles, age_group_weights=None, likert=None, rng=None):
+    """
+    Responden sintetis dengan bootstrap dari survei template (korelasi antar kolom tetap).
+    - age_group_weights: {age_group: bobot} untuk mengubah komposisi usia
+    - likert: {kolom: [p1..p5]} untuk mengganti distribusi satu kolom skala 1-5
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    weights = np.ones(len(template))
+    if age_group_weights:
+        groups = template['age_group']
+        share = groups.value_counts(normalize=True)
+        weights = groups.map(lambda g: age_group_weights.get(g, 0.0) / share[g]).to_numpy(dtype=float)
+    idx = rng.choice(len(template), size=n_profiles, p=weights / weights.sum())
+    df = template.iloc[idx].reset_index(drop=True)
+    for col, probs in (likert or {}).items():
+        probs = np.asarray(probs, dtype=float)
+        df[col] = rng.choice(np.arange(1, len(probs) + 1), size=n_profiles, p=probs / probs.sum())
+    width = max(5, len(str(n_profiles)))
+    df['respondent_id'] = [f"R{i + 1:0{width}d}" for i in range(n_profiles)]
+    return df
+
+
+def generate_schedules(arrival_template, env_template, arrival_scale=1.0, rain_prob=None, rng=None):
+    """Jadwal kedatangan (avg_arrivals x arrival_scale) dan cuaca; rain_prob -> hujan acak per slot."""
+    rng = rng if rng is not None else np.random.default_rng()
+    arrival = arrival_template.copy()
+    arrival['avg_arrivals'] = np.round(arrival['avg_arrivals'] * arrival_scale).astype(int)
+    env = env_template.copy()
+    if rain_prob is not None:
+        env['rain_flag'] = rng.random(len(env)) < rain_prob
+    return arrival, env
+
+
+# ==========================================
+# DATASET LENGKAP
+# ==========================================
+def generate_park(out_dir, n_nodes=1000, n_gates=5, zone_mix=None, facility_mix=None,
+                  n_profiles=1000, age_group_weights=None, likert=None, arrival_scale=1.0,
+                  rain_prob=None, spacing=15.0, loop_fraction=0.15, seed=0, template_dir=None):
+    """
+    Tulis dataset taman sintetis dengan skema persis yang dibaca DataLoader ke out_dir.
+    Jadwal, profil aktivitas, dan survei template diambil dari folder data/ bawaan.
+    Hasilnya bisa langsung dipakai: ParkModel(data_dir=out_dir).
+    """
+    rng = np.random.default_rng(seed)
+    if template_dir is None:
+        template_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+    os.makedirs(out_dir, exist_ok=True)
+
+    nodes, edges = generate_network(n_nodes, spacing, loop_fraction, rng)
+    zones, park_facilities = generate_zones(nodes, n_gates, zone_mix, rng)
+    facilities = generate_facilities(nodes, facility_mix, rng)
+    profiles = generate_profiles(pd.read_csv(os.path.join(template_dir, "survey_preferences_1000.csv")),
+                                 n_profiles, age_group_weights, likert, rng)
+    arrival, env = generate_schedules(pd.read_csv(os.path.join(template_dir, "arrival_profile_weekend_counts.csv")),
+                                      pd.read_csv(os.path.join(template_dir, "env_schedule_weekend.csv")),
+                                      arrival_scale, rain_prob, rng)
+
+    nodes.to_csv(os.path.join(out_dir, "path_nodes.csv"), index=False)
+    edges.to_csv(os.path.join(out_dir, "path_edges.csv"), index=False)
+    zones.to_csv(os.path.join(out_dir, "zone_config.csv"), index=False)
+    park_facilities.to_csv(os.path.join(out_dir, "park_facilities.csv"), index=False)
+    facilities.to_csv(os.path.join(out_dir, "general_facilities.csv"), index=False)
+    # Nama file survei tetap sama agar DataLoader tidak perlu diubah
+    profiles.to_csv(os.path.join(out_dir, "survey_preferences_1000.csv"), index=False)
+    arrival.to_csv(os.path.join(out_dir, "arrival_profile_weekend_counts.csv"), index=False)
+    env.to_csv(os.path.join(out_dir, "env_schedule_weekend.csv"), index=False)
+    shutil.copy(os.path.join(template_dir, "activity_usage_profile.csv"), out_dir)
+
+    return {'nodes': len(nodes), 'edges': len(edges), 'zones': len(zones),
+            'gates': int((zones['zone_type'] == 'gate').sum()), 'facilities': len(facilities),
+            'profiles': len(profiles)}
@@ -0,0 +1,110 @@
+import numpy as np
+
+MINUTES_PER_SLOT = 10 # Satu baris jadwal = slot 10 menit, 1 step = 1 menit
+
+
+class DaySchedule:
+    """
+    Jadwal satu hari (env_schedule + arrival_profile) yang dikompilasi sekali
+    menjadi array per menit bertipe: rain (bool), temperature & light (float64),
+    arrival_rate (kedatangan per menit = avg_arrivals / 10), activity (kode
+    aktivitas dominan) dan slot (indeks baris jadwal).
+
+    interpolate=True: suhu, cahaya dan laju kedatangan diinterpolasi linear
+    dari awal slot ke awal slot berikutnya (slot terakhir konstan). Hujan dan
+    aktivitas dominan tetap per slot.
+    """
+
+    def __init__(self, env, arrival, code_of, interpolate=False, name=None):
+        if len(env) == 0 or len(env) != len(arrival):
+            raise ValueError(f"Jadwal '{name}' kosong atau panjang env/arrival berbeda")
+        self.name = name
+        self.time_slots = [str(t) for t in env['time_slot'].tolist()]
+        n = len(self.time_slots)
+        self.n_slots = n
+        self.minutes = n * MINUTES_PER_SLOT
+
+        self.slot = np.repeat(np.arange(n, dtype=np.int32), MINUTES_PER_SLOT)
+        self.rain = np.repeat(env['rain_flag'].to_numpy(dtype=bool), MINUTES_PER_SLOT)
+        codes = np.array([code_of(a) for a in arrival['dominant_activity'].tolist()], dtype=np.int16)
+        self.activity = np.repeat(codes, MINUTES_PER_SLOT)
+        self.avg_arrivals = arrival['avg_arrivals'].to_numpy(dtype=np.float64)
+
+        self.temperature = self._expand(env['temperature_index'].to_numpy(dtype=np.float64), interpolate)
+        self.light = self._expand(env['light_index'].to_numpy(dtype=np.float64), interpolate)
+        self.arrival_rate = self._expand(self.avg_arrivals / 10.0, interpolate)
+
+    @staticmethod
+    def _expand(values, interpolate):
+        per_minute = np.repeat(values, MINUTES_PER_SLOT)
+        if interpolate and len(values) > 1:
+            frac = np.tile(np.arange(MINUTES_PER_SLOT) / MINUTES_PER_SLOT, len(values))
+            nxt = np.repeat(np.append(values[1:], values[-1]), MINUTES_PER_SLOT)
+            per_minute = per_minute + (nxt - per_minute) * frac
+        return per_minute
+
+
+class Timeline:
+    """
+    Rangkaian jadwal harian untuk run multi-hari / multi-minggu.
+
+    days: daftar kunci jadwal (misal ['weekday'] * 5 + ['weekend'] * 2).
+    source(kunci) -> (env_df, arrival_df) dipanggil malas saat hari itu pertama
+    kali dicapai; hasil kompilasi di-cache per kunci sehingga lima 'weekday'
+    hanya dikompilasi sekali. Default-nya timeline habis setelah hari terakhir
+    (seek mengembalikan None); repeat=True mengulang daftar hari tanpa akhir.
+
+    Kode aktivitas dominan dibagi semua hari (activity_names[kode] -> nama).
+    """
+
+    def __init__(self, days, source, interpolate=False, repeat=False):
+        if not days:
+            raise ValueError("Timeline membutuhkan minimal satu hari jadwal")
+        self.days = list(days)
+        self.source = source
+        self.interpolate = interpolate
+        self.repeat = repeat
+        self.activity_names = []
+        self._activity_code = {}
+        self._compiled = {}
+        # Kursor: (nomor hari sejak awal run, menit awal hari itu)
+        self._cursor = (0, 0)
+
+    def code_of(self, name):
+        code = self._activity_code.get(name)
+        if code is None:
+            code = self._activity_code[name] = len(self.activity_names)
+            self.activity_names.append(name)
+        return code
+
+    def day(self, key):
+        """DaySchedule untuk satu kunci (dikompilasi saat pertama diminta)."""
+        schedule = self._compiled.get(key)
+        if schedule is None:
+            env, arrival = self.source(key)
+            schedule = DaySchedule(env, arrival, self.code_of, self.interpolate, name=key)
+            self._compiled[key] = schedule
+        return schedule
+
+    def max_slots(self):
+        """Jumlah slot terbanyak di antara semua hari (memuat semua jadwal unik)."""
+        return max(self.day(key).n_slots for key in dict.fromkeys(self.days))
+
+    def seek(self, minute):
+        """
+        Menit ke-`minute` sejak awal run -> (nomor hari, DaySchedule, menit dalam hari),
+        atau None jika timeline sudah habis (repeat=False). Kursor disimpan sehingga
+        pemanggilan berurutan tidak perlu menelusuri ulang dari hari pertama.
+        """
+        day_no, start = self._cursor
+        if minute < start:
+            day_no, start = 0, 0
+        while True:
+            if day_no >= len(self.days) and not self.repeat:
+                return None
+            schedule = self.day(self.days[day_no % len(self.days)])
+            if minute < start + schedule.minutes:
+                self._cursor = (day_no, start)
+                return day_no, schedule, minute - start
+            start += schedule.minutes
+            day_no += 1
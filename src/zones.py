@@ -0,0 +1,146 @@
+import numpy as np
+
+SHELTER_TYPES = ['gazebo', 'public_toilet']          # Zona aman saat hujan
+SHELTER_SEEKING_TYPES = ['gazebo', 'public_toilet', 'gate']
+HOT_ZONE_TYPES = ['track', 'plaza', 'playground']    # Zona terbuka (tanpa peneduh)
+CROWD_LEVELS = 5 # crowd_dislike survei berskala 1-5 -> toleransi kelipatan 0.2
+
+
+def crowd_allowed(counts, capacity, crowd_dislike):
+    """
+    Mask zona yang keramaiannya masih dalam toleransi agen: min(count / capacity, 1)
+    <= 1 - crowd_dislike (di-broadcast, misal agen x kandidat).
+
+    crowd_dislike kelipatan 1/CROWD_LEVELS (level k) diuji di ruang integer,
+    count * CROWD_LEVELS <= (CROWD_LEVELS - k) * capacity, yaitu perbandingan yang
+    sama dengan band ZoneOccupancy (ceil(levels * count / capacity) <= levels - k).
+    Perbandingan float 0.2 <= 1.0 - 0.8 (= 0.19999999999999996) tidak dipakai di
+    batas band, sehingga hasil ZoneTable.filter ter-cache sama dengan hitung ulang.
+    Nilai di luar kelipatan (misal setelah crowd_tolerance_shift) memakai rasio float.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    crowd_dislike = np.asarray(crowd_dislike, dtype=np.float64)
+    level = crowd_dislike * CROWD_LEVELS
+    k = np.rint(level)
+    on_grid = np.abs(level - k) < 1e-9
+    exact = (k <= 0) | (counts * CROWD_LEVELS <= (CROWD_LEVELS - k) * capacity)
+    ratio = np.minimum(counts / capacity, 1.0) <= (1.0 - crowd_dislike)
+    return np.where(on_grid, exact, ratio)
+
+
+class ZoneTable:
+    """
+    Atribut zona dalam bentuk array + indeks aktivitas -> zona.
+
+    Dibangun sekali saat model dibuat, sehingga make_decision tidak perlu
+    memindai zone_map. Filter crowd/heat dan pemilihan akhir dijalankan
+    sebagai satu operasi vektor atas kandidat. Hasil filter per
+    (aktivitas, toleransi crowd, benci panas) di-cache dan otomatis
+    dibuang saat band keramaian zona atau cuaca berubah. verify_cache=True
+    (ParkModel debug_occupancy) membandingkan setiap hit cache dengan hitung ulang.
+    """
+
+    def __init__(self, zone_map, node_index=None):
+        zones = list(zone_map.values())
+        self.zone_ids = [z['zone_id'] for z in zones]
+        self.index = {z: i for i, z in enumerate(self.zone_ids)}
+        self.zones = zones
+        self.zone_type = [z['zone_type'] for z in zones]
+        self.nav_node = [z['nav_node'] for z in zones]
+        if node_index is not None:
+            self.nav_idx = np.array([node_index[n] for n in self.nav_node], dtype=np.int32)
+        self.capacity = np.array([float(z.get('zone_max_capacity', 20)) for z in zones])
+        self.amenities = np.array([float(z.get('amenities_score', 0.5)) for z in zones])
+        self.is_hot = np.array([t in HOT_ZONE_TYPES for t in self.zone_type])
+        self.is_shelter = np.array([t in SHELTER_TYPES for t in self.zone_type])
+
+        # Indeks aktivitas -> indeks zona
+        self._by_activity = {}
+        for i, z in enumerate(zones):
+            for act in z.get('supported_activities', []):
+                self._by_activity.setdefault(act, []).append(i)
+        self._by_activity = {a: np.array(idx, dtype=np.int32) for a, idx in self._by_activity.items()}
+        self._empty = np.empty(0, dtype=np.int32)
+        self.shelter_seeking = np.array(
+            [i for i, t in enumerate(self.zone_type) if t in SHELTER_SEEKING_TYPES], dtype=np.int32)
+
+        self._cache = {}
+        self._cache_key = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.verify_cache = False
+
+    def candidates(self, activity, closed_nodes=()):
+        """Indeks zona kandidat untuk sebuah aktivitas ('shelter_seeking' = set shelter)."""
+        if activity == 'shelter_seeking':
+            if closed_nodes:
+                return np.array([i for i in self.shelter_seeking
+                                 if self.nav_node[i] not in closed_nodes], dtype=np.int32)
+            return self.shelter_seeking
+        return self._by_activity.get(activity, self._empty)
+
+    def allowed_mask(self, cand, counts, crowd_dislike, heat_dislike, is_raining, temperature):
+        """Mask kandidat yang lolos penalti crowd & heat (Tahap 3 make_decision)."""
+        if is_raining:
+            # Hujan/shelter: darurat, abaikan keramaian & panas
+            return np.ones(len(cand), dtype=bool)
+        ok = crowd_allowed(counts[cand], self.capacity[cand], crowd_dislike)
+        if temperature > 0.7 and heat_dislike > 0.6:
+            ok &= ~self.is_hot[cand]
+        return ok
+
+    def elimination_masks(self, cand, counts, crowd_dislike, heat_dislike, is_raining, temperature):
+        """(mask tereliminasi crowd, mask tereliminasi heat) per kandidat - untuk profiling & KPI."""
+        if is_raining or len(cand) == 0:
+            none = np.zeros(len(cand), dtype=bool)
+            return none, none
+        crowd = ~crowd_allowed(counts[cand], self.capacity[cand], crowd_dislike)
+        heat = self.is_hot[cand] if temperature > 0.7 and heat_dislike > 0.6 else np.zeros(len(cand), dtype=bool)
+        return crowd, heat
+
+    def filter(self, activity, cand, occupancy, crowd_dislike, heat_dislike, is_raining, temperature,
+               closed_nodes=()):
+        """
+        Kandidat final setelah eliminasi. Jika semua tereliminasi, kandidat awal dipakai.
+        Hasil di-cache per step selama band keramaian & cuaca tidak berubah.
+        """
+        key = (occupancy.band_version, bool(is_raining), temperature > 0.7, frozenset(closed_nodes))
+        if key != self._cache_key:
+            self._cache.clear()
+            self._cache_key = key
+
+        level = crowd_dislike * CROWD_LEVELS
+        cacheable = abs(level - round(level)) < 1e-9
+        entry = (activity, round(level), heat_dislike > 0.6)
+        if cacheable:
+            hit = self._cache.get(entry)
+            if hit is not None:
+                self.cache_hits += 1
+                if self.verify_cache:
+                    self._check_hit(hit, activity, cand, occupancy, crowd_dislike, heat_dislike,
+                                    is_raining, temperature)
+                return hit
+        self.cache_misses += 1
+
+        final = self._final(cand, occupancy, crowd_dislike, heat_dislike, is_raining, temperature)
+        if cacheable:
+            self._cache[entry] = final
+        return final
+
+    def _final(self, cand, occupancy, crowd_dislike, heat_dislike, is_raining, temperature):
+        ok = self.allowed_mask(cand, occupancy.counts, crowd_dislike, heat_dislike, is_raining, temperature)
+        return cand[ok] if ok.any() else cand
+
+    def _check_hit(self, hit, activity, cand, occupancy, crowd_dislike, heat_dislike, is_raining, temperature):
+        """Mode debug: hasil cache harus sama dengan hitung ulang (terutama di batas band keramaian)."""
+        fresh = self._final(cand, occupancy, crowd_dislike, heat_dislike, is_raining, temperature)
+        if not np.array_equal(hit, fresh):
+            cached = [self.zone_ids[i] for i in hit]
+            expected = [self.zone_ids[i] for i in fresh]
+            raise AssertionError(f"Cache filter zona '{activity}' (crowd_dislike={crowd_dislike}) "
+                                 f"tidak sinkron (cache, hitung ulang): {cached}, {expected}")
+
+    def pick(self, final, rng):
+        """Pilih zona: amenities_score + random (weighted random pick), satu operasi vektor."""
+        score = self.amenities[final] + rng.random(len(final))
+        return int(final[np.argmax(score)])